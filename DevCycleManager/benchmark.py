@@ -0,0 +1,749 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import importlib
+import statistics
+import subprocess
+import tracemalloc
+import http.client
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, List, Any, Dict, Tuple
+
+# --- Constants & Configuration ---
+# Bumped whenever the results layout changes; `compare` refuses files of another version
+RESULTS_VERSION = 1
+
+# Defaults for `run`: synthetic MemoryBank size, timed and warm-up calls per case, concurrent callers
+DEFAULT_FEATURES = 300
+DEFAULT_REQUESTS = 200
+DEFAULT_WARMUP = 20
+DEFAULT_CONCURRENCY = 1
+DEFAULT_SEED = 1
+
+# Calls per case traced with tracemalloc (tracing slows calls down, so it is a separate pass)
+ALLOCATION_SAMPLES = 25
+
+# `compare`: relative change counted as a regression, and latency deltas too small to matter
+DEFAULT_THRESHOLD = 0.10
+MIN_LATENCY_DELTA_MS = 0.05
+
+TRANSPORTS = ("dispatch", "asgi", "http")
+
+# `startup`: cold starts measured per run, servers it can start, and how long to wait for one
+DEFAULT_STARTUP_RUNS = 5
+STARTUP_SERVERS = {
+    "serve": ["serve.py"],
+    "uvicorn": ["-m", "uvicorn", "main:app"],
+}
+STARTUP_TIMEOUT = 120.0
+
+# Background refreshes, snapshots and optional integrations are off, so every run does the same work
+BENCHMARK_ENVIRONMENT = {
+    "PROMPTS_RELOAD_INTERVAL": "0",
+    "DEVCYCLE_MEMORY_BANK_REFRESH_INTERVAL": "0",
+    "DEVCYCLE_SEARCH_REFRESH_INTERVAL": "0",
+    "DEVCYCLE_LESSONS_REFRESH_INTERVAL": "0",
+    "DEVCYCLE_GIT_REFRESH_INTERVAL": "0",
+    "DEVCYCLE_SEARCH_SNAPSHOT": "",
+    "DEVCYCLE_GIT_INDEX_SNAPSHOT": "",
+}
+
+# Commits in the generated project repository that verify-commits checks the phase tables against
+GIT_COMMITS = 60
+
+# Compared metrics: (path in a case result, True if higher is better)
+COMPARED_METRICS = (
+    ("latency_ms.p50", False),
+    ("latency_ms.p95", False),
+    ("latency_ms.p99", False),
+    ("throughput_rps", True),
+    ("response_bytes", False),
+    ("peak_alloc_bytes", False),
+)
+
+STATES = ("01_SUBMITTED", "02_READY_TO_DEVELOP", "03_IN_PROGRESS", "04_COMPLETED")
+PHASE_NAMES = ("Planning Analysis", "Data Layer", "Business Logic", "Service Layer", "User Interface", "Integration Tests", "Documentation")
+WORDS = (
+    "authentication token refresh session cache repository validation payment invoice report export "
+    "notification schedule search index filter permission audit migration sync offline retry queue"
+).split()
+
+
+class Case:
+    """One benchmarked JSON-RPC call: a name for the results file and the request params."""
+
+    def __init__(self, name: str, method: str, params: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.method = method
+        self.params = params
+
+    def body(self, request_id: int) -> bytes:
+        payload: Dict[str, Any] = {"jsonrpc": "2.0", "method": self.method, "id": request_id}
+        if self.params is not None:
+            payload["params"] = self.params
+        return json.dumps(payload).encode("utf-8")
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def build_git_repository(root: Path, commits: int) -> List[str]:
+    """
+    A repository of empty commits with fixed authors and dates, so the hashes
+    are the same on every run; returns the abbreviated hashes. Empty when git
+    is not installed (verify-commits then reports that it is disabled).
+    """
+    environment = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": "Benchmark", "GIT_AUTHOR_EMAIL": "benchmark@example.com",
+        "GIT_COMMITTER_NAME": "Benchmark", "GIT_COMMITTER_EMAIL": "benchmark@example.com",
+    }
+    try:
+        root.mkdir(parents=True)
+        subprocess.run(["git", "init", "-q", "-b", "main"], cwd=str(root), env=environment, check=True)
+        for number in range(commits):
+            environment["GIT_AUTHOR_DATE"] = environment["GIT_COMMITTER_DATE"] = f"2024-01-15T10:{number // 60:02d}:{number % 60:02d}Z"
+            subprocess.run(["git", "commit", "-q", "--allow-empty", "-m", f"feat: benchmark commit {number}"], cwd=str(root), env=environment, check=True)
+        log = subprocess.run(["git", "log", "--format=%h", "--abbrev=7"], cwd=str(root), capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return []
+    return log.stdout.split()
+
+
+def build_memory_bank(root: Path, features: int, seed: int = DEFAULT_SEED, commits: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Writes a deterministic MemoryBank: epics with Features Breakdown tables,
+    features in every state with FeatureTasks.md and phase files (tasks,
+    Git Commits tables, checkpoints, reviews), LessonsLearned and
+    CodeGuidelines. Completed tasks cite hashes from `commits` when given.
+    Returns the IDs the workload calls tools with.
+    """
+    rng = random.Random(seed)
+    epics = max(1, features // 20)
+    by_epic: Dict[int, List[Tuple[str, str, List[str]]]] = {}
+    fixture: Dict[str, str] = {}
+    for number in range(1, features + 1):
+        item_id = f"FEAT-{number:03d}"
+        state = STATES[number % len(STATES)] if number > 4 else STATES[number - 1]
+        epic = 1 + number % epics
+        dependencies = [f"FEAT-{dependency:03d}" for dependency in sorted({rng.randint(1, number - 1) for _ in range(rng.randint(0, 2))})] if number > 1 else []
+        title = sentence(rng, 3).title()
+        by_epic.setdefault(epic, []).append((item_id, title, dependencies))
+        folder = root / "Features" / state / f"{item_id}-{title.lower().replace(' ', '-')}"
+        (folder / "Phases").mkdir(parents=True)
+        fixture.setdefault(state, item_id)
+        (folder / "FeatureDescription.md").write_text(
+            f"# Feature: {title}\n\n**Feature ID**: {item_id}\n**Status**: {state[3:]}\n**Parent Epic**: EPIC-{epic:03d}\n\n"
+            f"## Overview\n\n{sentence(rng, 60)}\n\n## Dependencies\n\n" + "".join(f"- {dependency}\n" for dependency in dependencies or ["None"]),
+            encoding="utf-8",
+        )
+        if state == "01_SUBMITTED":
+            continue
+        done = {"02_READY_TO_DEVELOP": 0, "03_IN_PROGRESS": 2, "04_COMPLETED": len(PHASE_NAMES)}[state]
+        rows = []
+        for phase, name in enumerate(PHASE_NAMES, start=1):
+            status = "COMPLETED" if phase <= done else ("IN_PROGRESS" if phase == done + 1 and state == "03_IN_PROGRESS" else "PENDING")
+            slug = name.lower().replace(" ", "-")
+            rows.append(f"| {phase} | {name} | {rng.randint(2, 12)}h | {rng.randint(1, 4)}h | {status} | - | - | [Link](Phases/phase-{phase}-{slug}.md) |")
+            tasks = []
+            phase_commits = []
+            for task in range(1, 4):
+                commit = (rng.choice(commits) if commits else f"{rng.getrandbits(28):07x}") if status == "COMPLETED" else "-"
+                if commit != "-":
+                    phase_commits.append(f"| {len(phase_commits) + 1} | {commit} | feat: {sentence(rng, 3)} | Task {phase}.{task} | 2024-01-15 |")
+                tasks.append(
+                    f"### Task {phase}.{task}: {sentence(rng, 3).title()}\n\n**Status**: `[{'COMPLETED' if status == 'COMPLETED' else 'PENDING'}]`\n\n"
+                    f"{sentence(rng, 40)}\n\n**Git Commits:**\n| Commit Hash | Message | Date |\n|-------------|---------|------|\n"
+                    f"| {commit} | feat: {sentence(rng, 3)} | 2024-01-15 |\n"
+                )
+            (folder / "Phases" / f"phase-{phase}-{slug}.md").write_text(
+                f"# Phase {phase}: {name}\n\n**Status**: {status}\n\n---\n\n## Tasks\n\n" + "\n---\n\n".join(tasks)
+                + f"\n## Phase Checkpoint: {name} Complete\n\n**Status**: {'COMPLETE' if status == 'COMPLETED' else 'NOT STARTED'}\n\n"
+                + "### Git Commits (Phase Summary)\n\n| # | Commit Hash | Message | Task | Date |\n|---|-------------|---------|------|------|\n"
+                + "".join(f"{row}\n" for row in phase_commits or ["| - | - | - | - | - |"])
+                + f"\n**Total Commits in Phase**: {len(phase_commits)}\n\n#### Code Review History\n\n| # | Date | Status | Report | Notes |\n|---|------|--------|--------|-------|\n"
+                + ("| 1 | 2024-01-15 | APPROVED | review-1.md | - |\n" if status == "COMPLETED" else "| - | - | NOT_STARTED | - | - |\n"),
+                encoding="utf-8",
+            )
+        (folder / "FeatureTasks.md").write_text(
+            f"# Feature Tasks: {item_id} - {title}\n\n**Feature ID**: {item_id}\n**Status**: {state[3:]}\n\n## Phase Summary\n\n"
+            "| Phase | Name | Est. Man/Hour | Est. AI/Hour | Status | Actual Man | Actual AI | Details |\n"
+            "|-------|------|---------------|--------------|--------|------------|-----------|---------|\n" + "\n".join(rows) + "\n",
+            encoding="utf-8",
+        )
+        if done:
+            lessons = root / "LessonsLearned" / item_id
+            lessons.mkdir(parents=True, exist_ok=True)
+            for phase in range(1, min(done, len(PHASE_NAMES)) + 1):
+                (lessons / f"Phase-{phase}-{PHASE_NAMES[phase - 1].replace(' ', '-')}.md").write_text(
+                    f"# Lessons Learned: Phase {phase} - {PHASE_NAMES[phase - 1]}\n\n**Tags**: {rng.choice(WORDS)}, {rng.choice(WORDS)}\n\n"
+                    f"## Challenges Encountered\n\n- {sentence(rng, 15)}\n- {sentence(rng, 15)}\n\n## Recommendations\n\n- {sentence(rng, 15)}\n",
+                    encoding="utf-8",
+                )
+
+    for epic, members in by_epic.items():
+        folder = root / "Features" / "00_EPICS" / f"EPIC-{epic:03d}-epic-{epic}"
+        folder.mkdir(parents=True)
+        (folder / "EpicDescription.md").write_text(
+            f"# EPIC-{epic:03d}: Epic {epic}\n\n**Status**: IN_PROGRESS\n\n## Overview\n\n{sentence(rng, 80)}\n\n## Features Breakdown\n\n"
+            "| Feature ID | Title | Status | Dependencies | Priority |\n|---|---|---|---|---|\n"
+            + "".join(f"| {item_id} | {title} | - | {', '.join(dependencies) or 'None'} | P{rng.randint(1, 3)} |\n" for item_id, title, dependencies in members),
+            encoding="utf-8",
+        )
+    for folder in ("CodeGuidelines", "Architecture", "Overview"):
+        (root / folder).mkdir(parents=True, exist_ok=True)
+        for number in range(1, 6):
+            (root / folder / f"{folder.lower()}-{number}.md").write_text(
+                f"# {folder} {number}\n\n" + "".join(f"## {sentence(rng, 2).title()}\n\n{sentence(rng, 120)}\n\n" for _ in range(6)),
+                encoding="utf-8",
+            )
+    fixture["epic"] = "EPIC-001"
+    return fixture
+
+
+def build_workload(tools: List[Dict[str, Any]], fixture: Dict[str, str], template_hash: Optional[str], template_uri: Optional[str]) -> List[Case]:
+    """
+    A case per protocol method and per tool in `tools/list`, with arguments
+    that hit the indexed MemoryBank, plus the template-reference and
+    relevant-sections variants of `continue-implementation`.
+    """
+    in_progress = fixture["03_IN_PROGRESS"]
+    samples: Dict[str, Any] = {
+        "feature_id": in_progress,
+        "epic_id": fixture["epic"],
+        "phase_number": 2,
+        "description": "Let users export invoices as PDF and CSV from the billing page",
+        "title": "Invoice export",
+        "file_path": "{memory_bank}/Features/01_SUBMITTED/",
+        "procedure": "continue-implementation",
+        "query": "authentication token refresh",
+        "external_id": "JIRA-123",
+    }
+    # Per-tool overrides where the in-progress feature is not the realistic target
+    overrides: Dict[str, Dict[str, Any]] = {
+        "design-feature": {"feature_id": fixture["01_SUBMITTED"]},
+        "refine-feature": {"feature_id": fixture["01_SUBMITTED"]},
+        "start-feature": {"feature_id": fixture["02_READY_TO_DEVELOP"]},
+        "complete-feature": {"feature_id": fixture["04_COMPLETED"]},
+        "get-procedure-section": {"section_ids": ["error-recovery"], "arguments": {"feature_id": in_progress}},
+        "list-features": {"state": "in_progress", "limit": 50},
+        "metadata-store": {"action": "status"},
+    }
+    cases = [Case("initialize", "initialize"), Case("tools/list", "tools/list"), Case("resources/list", "resources/list")]
+    if template_uri is not None:
+        cases.append(Case("resources/read", "resources/read", {"uri": template_uri}))
+    for tool in tools:
+        schema = tool["inputSchema"]
+        arguments = {name: samples[name] for name in schema.get("required", []) if name in samples}
+        arguments.update(overrides.get(tool["name"], {}))
+        cases.append(Case(f"tools/call {tool['name']}", "tools/call", {"name": tool["name"], "input": arguments}))
+    implementation = {"name": "continue-implementation", "input": {"feature_id": in_progress}}
+    if template_hash is not None:
+        cases.append(Case("tools/call continue-implementation (knownTemplateHash)", "tools/call", {**implementation, "knownTemplateHash": template_hash}))
+    cases.append(Case("tools/call continue-implementation (sectionDelivery=relevant, compact)", "tools/call", {**implementation, "sectionDelivery": "relevant", "responseMode": "compact"}))
+    return cases
+
+
+class DispatchTransport:
+    """Calls the server's JSON-RPC dispatch directly: no ASGI, middleware or HTTP."""
+
+    name = "dispatch"
+
+    def __init__(self, server: Any):
+        self.server = server
+
+    async def call(self, body: bytes) -> Tuple[int, bytes]:
+        request = self.server.JsonRpcRequest.model_validate_json(body)
+        response = await self.server.dispatch_observed(request, {})
+        return response.status_code, response.body
+
+    def close(self) -> None:
+        pass
+
+
+class ASGITransport:
+    """Drives `app` through the ASGI interface in-process: routing, validation and middleware included."""
+
+    name = "asgi"
+
+    def __init__(self, server: Any, accept_encoding: str = ""):
+        self.app = server.app
+        self.headers = [(b"content-type", b"application/json")]
+        if accept_encoding:
+            self.headers.append((b"accept-encoding", accept_encoding.encode("latin-1")))
+
+    async def call(self, body: bytes) -> Tuple[int, bytes]:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+            "path": "/", "raw_path": b"/", "root_path": "", "query_string": b"",
+            "headers": self.headers + [(b"content-length", str(len(body)).encode("latin-1"))],
+            "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 8000),
+        }
+        received = False
+        status_code = 0
+        chunks: List[bytes] = []
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal received
+            if received:
+                await asyncio.Event().wait()
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status_code, b"".join(chunks)
+
+    def close(self) -> None:
+        pass
+
+
+class HTTPTransport:
+    """Real HTTP against a uvicorn subprocess, one keep-alive connection per client thread."""
+
+    name = "http"
+
+    def __init__(self, environment: Dict[str, str], concurrency: int, accept_encoding: str = "", startup_timeout: float = 60.0):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.port = probe.getsockname()[1]
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(self.port), "--log-level", "warning"],
+            cwd=str(Path(__file__).parent), env={**os.environ, **environment},
+        )
+        self.headers = {"Content-Type": "application/json"}
+        if accept_encoding:
+            self.headers["Accept-Encoding"] = accept_encoding
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="benchmark-http")
+        self._local = threading.local()
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+                # Measured calls start once the indexes are built, as with the in-process transports
+                connection.request("GET", "/ready")
+                if connection.getresponse().status == 200:
+                    connection.close()
+                    break
+            except OSError:
+                pass
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                self.close()
+                raise RuntimeError(f"uvicorn did not start on port {self.port}")
+            time.sleep(0.2)
+
+    def _post(self, body: bytes) -> Tuple[int, bytes]:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+        connection.request("POST", "/", body=body, headers=self.headers)
+        response = connection.getresponse()
+        return response.status, response.read()
+
+    async def call(self, body: bytes) -> Tuple[int, bytes]:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._post, body)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+
+def is_error(status_code: int, body: bytes) -> bool:
+    """HTTP failures, JSON-RPC errors and failed tool calls; bodies are not parsed, so timing stays cheap."""
+    return status_code >= 400 or b'"error":{"code"' in body[:200] or b'"tool_call_success":false' in body or b'"isError":true' in body
+
+
+async def run_case(transport: Any, case: Case, requests: int, warmup: int, concurrency: int, trace_allocations: bool) -> Dict[str, Any]:
+    for request_id in range(warmup):
+        await transport.call(case.body(request_id))
+
+    latencies: List[float] = []
+    sizes: List[int] = []
+    errors = 0
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(request_id: int) -> None:
+        nonlocal errors
+        async with slots:
+            body = case.body(request_id)
+            started = time.perf_counter()
+            status_code, response = await transport.call(body)
+            latencies.append((time.perf_counter() - started) * 1000)
+            sizes.append(len(response))
+            if is_error(status_code, response):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(request_id) for request_id in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    result: Dict[str, Any] = {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "mean": round(statistics.fmean(ordered), 4),
+            "p50": round(percentile(ordered, 0.50), 4),
+            "p95": round(percentile(ordered, 0.95), 4),
+            "p99": round(percentile(ordered, 0.99), 4),
+            "max": round(ordered[-1], 4),
+        },
+        "response_bytes": round(statistics.fmean(sizes)),
+    }
+    if trace_allocations:
+        # Peak bytes allocated while serving one call, over a few sequential traced calls
+        peaks: List[int] = []
+        tracemalloc.start()
+        try:
+            for request_id in range(ALLOCATION_SAMPLES):
+                body = case.body(request_id)
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                await transport.call(body)
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        finally:
+            tracemalloc.stop()
+        result["peak_alloc_bytes"] = int(statistics.median(peaks))
+    return result
+
+
+def prepare_environment(arguments: argparse.Namespace, scratch: str) -> Tuple[Dict[str, str], Optional[Dict[str, str]]]:
+    """Server environment for a run, and the fixture IDs when the MemoryBank is generated."""
+    environment = {**BENCHMARK_ENVIRONMENT, "DEVCYCLE_METADATA_DB": str(Path(scratch) / "metadata.db")}
+    if arguments.memory_bank:
+        environment["DEVCYCLE_MEMORY_BANK_DIR"] = arguments.memory_bank
+        environment["DEVCYCLE_GIT_REPO_DIR"] = arguments.git_repo or ""
+        return environment, None
+    memory_bank = Path(scratch) / "MemoryBank"
+    repository = Path(scratch) / "repository"
+    commits = build_git_repository(repository, GIT_COMMITS)
+    fixture = build_memory_bank(memory_bank, arguments.features, arguments.seed, commits)
+    environment["DEVCYCLE_MEMORY_BANK_DIR"] = str(memory_bank)
+    environment["DEVCYCLE_GIT_REPO_DIR"] = str(repository) if commits else ""
+    return environment, fixture
+
+
+def run_meta(arguments: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "features": arguments.features if not arguments.memory_bank else None,
+        "memory_bank": arguments.memory_bank,
+        "seed": arguments.seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+async def run_benchmark(arguments: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="devcycle-benchmark-") as scratch:
+        environment, fixture = prepare_environment(arguments, scratch)
+        os.environ.update(environment)
+        sys.path.insert(0, str(Path(__file__).parent))
+        started = time.perf_counter()
+        server = importlib.import_module("main")
+        startup = time.perf_counter() - started
+        started = time.perf_counter()
+        server.WARMUP.run_sync()
+        warm_up = time.perf_counter() - started
+
+        if fixture is None:
+            # An existing MemoryBank: pick the first indexed item of each state
+            fixture = {"epic": next((entry.id for entry in server.FEATURE_INDEX.entries() if entry.kind == "epic"), "EPIC-001")}
+            for state in STATES:
+                entries, _ = server.FEATURE_INDEX.query(state=state, kind="feature", limit=1)
+                fixture[state] = entries[0].id if entries else "FEAT-001"
+        template = server.PROMPT_TEMPLATES.get(server.TOOLS.get("continue-implementation").template)
+        cases = build_workload(server.TOOLS.definitions(), fixture, template.hash if template else None, template.uri if template else None)
+        if arguments.cases:
+            pattern = re.compile(arguments.cases)
+            cases = [case for case in cases if pattern.search(case.name)]
+
+        if arguments.transport == "dispatch":
+            transport: Any = DispatchTransport(server)
+        elif arguments.transport == "asgi":
+            transport = ASGITransport(server, arguments.accept_encoding)
+        else:
+            transport = HTTPTransport(environment, arguments.concurrency, arguments.accept_encoding)
+        results: Dict[str, Any] = {}
+        try:
+            for case in cases:
+                results[case.name] = await run_case(
+                    transport, case, arguments.requests, arguments.warmup, arguments.concurrency,
+                    trace_allocations=arguments.transport != "http" and not arguments.no_allocations,
+                )
+                if not arguments.quiet:
+                    latency = results[case.name]["latency_ms"]
+                    print(f"{case.name:<72} p50 {latency['p50']:>9.3f} ms  p99 {latency['p99']:>9.3f} ms  {results[case.name]['throughput_rps']:>9.1f} rps")
+        finally:
+            transport.close()
+
+    return {
+        "version": RESULTS_VERSION,
+        "meta": {
+            "transport": arguments.transport,
+            "requests": arguments.requests,
+            "warmup": arguments.warmup,
+            "concurrency": arguments.concurrency,
+            "accept_encoding": arguments.accept_encoding,
+            "indexed_items": len(server.FEATURE_INDEX),
+            "import_seconds": round(startup, 3),
+            "warmup_seconds": round(warm_up, 3),
+            **run_meta(arguments),
+        },
+        "cases": results,
+    }
+
+
+def post_json(port: int, path: str, body: Optional[bytes] = None, timeout: float = 60.0) -> int:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        connection.request("POST" if body is not None else "GET", path, body=body, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+
+def measure_startup(server: List[str], environment: Dict[str, str], tool_calls: Dict[str, Case]) -> Dict[str, float]:
+    """
+    Seconds from spawning a fresh server process to: its first `initialize`
+    response (polled every few milliseconds), the response to each of
+    `tool_calls` (phase name -> call, sent one after the other), and `/ready`
+    answering 200. Also times a bare interpreter start and `import main` in
+    separate processes.
+    """
+    cwd = str(Path(__file__).parent)
+    env = {**os.environ, **environment}
+    phases: Dict[str, float] = {}
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], cwd=cwd, env=env, check=True)
+    phases["python startup"] = time.perf_counter() - started
+    imported = subprocess.run(
+        [sys.executable, "-c", "import time; started = time.perf_counter(); import main; print(time.perf_counter() - started)"],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True,
+    )
+    phases["import main"] = float(imported.stdout.strip().splitlines()[-1])
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, *server, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"], cwd=cwd, env=env)
+    try:
+        deadline = started + STARTUP_TIMEOUT
+        initialize = Case("initialize", "initialize").body(1)
+        while True:
+            try:
+                if post_json(port, "/", initialize) == 200:
+                    phases["first initialize"] = time.perf_counter() - started
+                    break
+            except OSError:
+                pass
+            if process.poll() is not None or time.perf_counter() > deadline:
+                raise RuntimeError("the server did not answer initialize")
+            time.sleep(0.005)
+        for number, (phase, case) in enumerate(tool_calls.items(), start=2):
+            if post_json(port, "/", case.body(number)) == 200:
+                phases[phase] = time.perf_counter() - started
+        while time.perf_counter() < deadline:
+            status = post_json(port, "/ready")
+            if status == 404:
+                break
+            if status == 200:
+                phases["ready"] = time.perf_counter() - started
+                break
+            # Coarser than the initialize probe: every call takes event-loop time from the warm-up
+            time.sleep(0.05)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return phases
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(Path(__file__).parent), capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def metric(case: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = case
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Every compared metric of the cases present in both files, and the subset
+    that got worse by more than `threshold` (relative). Latency deltas below
+    MIN_LATENCY_DELTA_MS are never regressions.
+    """
+    rows: List[Dict[str, Any]] = []
+    regressions: List[Dict[str, Any]] = []
+    for name, current_case in current["cases"].items():
+        baseline_case = baseline["cases"].get(name)
+        if baseline_case is None:
+            continue
+        for path, higher_is_better in COMPARED_METRICS:
+            before, after = metric(baseline_case, path), metric(current_case, path)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            row = {"case": name, "metric": path, "baseline": before, "current": after, "change": round(change, 4)}
+            rows.append(row)
+            if worse > threshold and not (path.startswith("latency_ms.") and abs(after - before) < MIN_LATENCY_DELTA_MS):
+                regressions.append(row)
+    return rows, regressions
+
+
+def command_run(arguments: argparse.Namespace) -> int:
+    results = asyncio.run(run_benchmark(arguments))
+    output = Path(arguments.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    errors = sum(case["errors"] for case in results["cases"].values())
+    print(f"{len(results['cases'])} case(s), {errors} error response(s); results written to {output}")
+    return 0
+
+
+def command_compare(arguments: argparse.Namespace) -> int:
+    baseline = json.loads(Path(arguments.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(arguments.current).read_text(encoding="utf-8"))
+    if baseline.get("version") != RESULTS_VERSION or current.get("version") != RESULTS_VERSION:
+        print(f"Results files must both be version {RESULTS_VERSION}.")
+        return 2
+    for key in ("transport", "concurrency", "accept_encoding", "features"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"Warning: {key} differs ({baseline['meta'].get(key)} vs {current['meta'].get(key)}); the comparison may not be meaningful.")
+    rows, regressions = compare_results(baseline, current, arguments.threshold)
+    shown = regressions if not arguments.verbose else rows
+    for row in shown:
+        flag = "REGRESSION" if row in regressions else ""
+        print(f"{row['case']:<72} {row['metric']:<16} {row['baseline']:>12} -> {row['current']:>12} ({row['change']:+.1%}) {flag}")
+    print(f"{len(regressions)} regression(s) beyond {arguments.threshold:.0%} across {len(rows)} compared metric(s).")
+    return 1 if regressions else 0
+
+
+def command_startup(arguments: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory(prefix="devcycle-benchmark-") as scratch:
+        environment, fixture = prepare_environment(arguments, scratch)
+        feature_id = fixture["03_IN_PROGRESS"] if fixture else arguments.feature_id
+        # A call reading only the feature index, then a procedure reading every index
+        tool_calls = {
+            "first feature-status": Case("tools/call feature-status", "tools/call", {"name": "feature-status", "input": {"feature_id": feature_id}}),
+            "first tools/call": Case("tools/call continue-implementation", "tools/call", {"name": "continue-implementation", "input": {"feature_id": feature_id}}),
+        }
+        runs: Dict[str, List[float]] = {}
+        for run in range(arguments.runs):
+            for phase, seconds in measure_startup(STARTUP_SERVERS[arguments.server], environment, tool_calls).items():
+                runs.setdefault(phase, []).append(seconds * 1000)
+            if not arguments.quiet:
+                print(f"run {run + 1}: " + ", ".join(f"{phase} {values[-1]:.0f} ms" for phase, values in runs.items()))
+
+    cases: Dict[str, Any] = {}
+    for phase, values in runs.items():
+        ordered = sorted(values)
+        cases[f"startup: {phase}"] = {
+            "requests": len(ordered),
+            "errors": arguments.runs - len(ordered),
+            "latency_ms": {
+                "mean": round(statistics.fmean(ordered), 2),
+                "p50": round(percentile(ordered, 0.50), 2),
+                "p95": round(percentile(ordered, 0.95), 2),
+                "p99": round(percentile(ordered, 0.99), 2),
+                "max": round(ordered[-1], 2),
+            },
+        }
+    results = {"version": RESULTS_VERSION, "meta": {"transport": f"startup:{arguments.server}", "runs": arguments.runs, **run_meta(arguments)}, "cases": cases}
+    output = Path(arguments.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    for name, case in cases.items():
+        print(f"{name:<32} p50 {case['latency_ms']['p50']:>9.1f} ms  max {case['latency_ms']['max']:>9.1f} ms")
+    print(f"{arguments.runs} cold start(s); results written to {output}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the DevCycleManager JSON-RPC server and compare results against a baseline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run every case and write a results file")
+    run.add_argument("--transport", choices=TRANSPORTS, default="asgi", help="dispatch (handler only), asgi (in-process app) or http (uvicorn subprocess)")
+    run.add_argument("--output", default="benchmark-results.json")
+    run.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="Timed calls per case")
+    run.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="Untimed calls per case before timing")
+    run.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Calls in flight at once")
+    run.add_argument("--features", type=int, default=DEFAULT_FEATURES, help="Features in the generated MemoryBank")
+    run.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed of the generated MemoryBank")
+    run.add_argument("--memory-bank", help="Benchmark against an existing MemoryBank instead of a generated one")
+    run.add_argument("--git-repo", help="Project repository for verify-commits when --memory-bank is given")
+    run.add_argument("--accept-encoding", default="", help="Accept-Encoding sent by the asgi/http transports (e.g. gzip)")
+    run.add_argument("--cases", help="Only run cases whose name matches this regular expression")
+    run.add_argument("--no-allocations", action="store_true", help="Skip the tracemalloc pass")
+    run.add_argument("--quiet", action="store_true")
+    run.set_defaults(handler=command_run)
+
+    startup = commands.add_parser("startup", help="Time cold starts: import, first initialize, first tools/call, readiness")
+    startup.add_argument("--server", choices=sorted(STARTUP_SERVERS), default="serve", help="serve (serve.py, as in the image) or uvicorn (main:app)")
+    startup.add_argument("--runs", type=int, default=DEFAULT_STARTUP_RUNS, help="Fresh server processes started")
+    startup.add_argument("--output", default="benchmark-startup.json")
+    startup.add_argument("--features", type=int, default=DEFAULT_FEATURES, help="Features in the generated MemoryBank")
+    startup.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed of the generated MemoryBank")
+    startup.add_argument("--memory-bank", help="Start against an existing MemoryBank instead of a generated one")
+    startup.add_argument("--git-repo", help="Project repository for verify-commits when --memory-bank is given")
+    startup.add_argument("--feature-id", default="FEAT-001", help="Feature of the first tools/call when --memory-bank is given")
+    startup.add_argument("--quiet", action="store_true")
+    startup.set_defaults(handler=command_startup)
+
+    compare = commands.add_parser("compare", help="Compare two results files; exits 1 on regressions")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Relative change counted as a regression (default 0.10)")
+    compare.add_argument("--verbose", action="store_true", help="Show every compared metric, not only regressions")
+    compare.set_defaults(handler=command_compare)
+
+    arguments = parser.parse_args()
+    return arguments.handler(arguments)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
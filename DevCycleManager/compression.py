@@ -0,0 +1,293 @@
+import os
+import gzip
+import zlib
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Tuple, Callable
+
+# Optional codecs: used only when the packages are installed
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# --- Constants & Configuration ---
+# Responses smaller than this many bytes are sent uncompressed
+MINIMUM_SIZE = int(os.environ.get("DEVCYCLE_COMPRESSION_MIN_SIZE", "1024"))
+
+# Server preference order; an empty value disables compression
+PREFERRED_ENCODINGS = [
+    encoding.strip()
+    for encoding in os.environ.get("DEVCYCLE_COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+    if encoding.strip()
+]
+
+GZIP_LEVEL = int(os.environ.get("DEVCYCLE_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("DEVCYCLE_BROTLI_QUALITY", "5"))
+ZSTD_LEVEL = int(os.environ.get("DEVCYCLE_ZSTD_LEVEL", "3"))
+
+# Number of compressed bodies kept, keyed by content digest and encoding
+CACHE_SIZE = int(os.environ.get("DEVCYCLE_COMPRESSION_CACHE_SIZE", "256"))
+
+
+def _compress_gzip(body: bytes) -> bytes:
+    # mtime=0 keeps output deterministic, so identical bodies compress identically
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+def _compress_brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+def _compress_zstd(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+
+CODECS: Dict[str, Callable[[bytes], bytes]] = {"gzip": _compress_gzip}
+if brotli is not None:
+    CODECS["br"] = _compress_brotli
+if zstandard is not None:
+    CODECS["zstd"] = _compress_zstd
+
+
+# Framed compression of `static prefix + short tail`: the prefix is compressed once into an
+# unfinished stream ending on a block boundary (the head); each response appends the tail as
+# a final uncompressed block, so the stream is a standard single-member one for any decoder.
+
+# Longest tail framed this way (deflate stored blocks hold at most 65535 bytes)
+MAX_FRAMED_TAIL = 65535
+
+def _gzip_head(prefix: bytes) -> bytes:
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(prefix) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+def _gzip_tail(prefix: bytes, tail: bytes) -> bytes:
+    # Final stored block (BFINAL=1, BTYPE=00; the sync flush left the stream byte-aligned), then CRC32 and ISIZE
+    return (
+        b"\x01" + struct.pack("<HH", len(tail), len(tail) ^ 0xFFFF) + tail
+        + struct.pack("<II", zlib.crc32(tail, zlib.crc32(prefix)), (len(prefix) + len(tail)) & 0xFFFFFFFF)
+    )
+
+def _brotli_head(prefix: bytes) -> bytes:
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    return compressor.process(prefix) + compressor.flush()
+
+def _brotli_tail(prefix: bytes, tail: bytes) -> bytes:
+    # Uncompressed meta-block (ISLAST=0, MNIBBLES=4, MLEN-1, ISUNCOMPRESSED=1, padded to a byte), then ISLAST+ISLASTEMPTY
+    return (((len(tail) - 1) << 3) | (1 << 19)).to_bytes(3, "little") + tail + b"\x03"
+
+def _zstd_head(prefix: bytes) -> bytes:
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    return compressor.compress(prefix) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+def _zstd_tail(prefix: bytes, tail: bytes) -> bytes:
+    # Last raw block: Last_Block=1, Block_Type=0 (raw), Block_Size
+    return (1 | (len(tail) << 3)).to_bytes(3, "little") + tail
+
+FRAMED_CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes, bytes], bytes]]] = {"gzip": (_gzip_head, _gzip_tail)}
+if brotli is not None:
+    FRAMED_CODECS["br"] = (_brotli_head, _brotli_tail)
+if zstandard is not None:
+    FRAMED_CODECS["zstd"] = (_zstd_head, _zstd_tail)
+
+
+def available_encodings() -> List[str]:
+    """Encodings that are both preferred by configuration and installed."""
+    return [encoding for encoding in PREFERRED_ENCODINGS if encoding in CODECS]
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Picks the best encoding from an Accept-Encoding header.
+    Highest client q-value wins; ties go to the server preference order.
+    """
+    if not accept_encoding:
+        return None
+
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        parts = item.strip().split(";")
+        name = parts[0].strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for parameter in parts[1:]:
+            key, _, value = parameter.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+
+    best: Optional[Tuple[float, int, str]] = None
+    for rank, encoding in enumerate(available_encodings()):
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality <= 0:
+            continue
+        candidate = (quality, -rank, encoding)
+        if best is None or candidate > best:
+            best = candidate
+    return best[2] if best else None
+
+
+class CompressionCache:
+    """
+    Small LRU of compressed bodies keyed by (sha1 of body, encoding), so
+    repeated identical tool results are compressed once; hashing is far
+    cheaper than recompressing. Bodies starting with a registered static
+    prefix (`initialize`, `tools/list`, whose only per-request part is the
+    trailing id) are compressed once per prefix and encoding whatever the id,
+    with the id framed on as a final uncompressed block.
+    Also keeps running byte totals before and after compression.
+    """
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._entries: "OrderedDict[Tuple[bytes, str], bytes]" = OrderedDict()
+        self._prefixes: List[bytes] = []
+        self._heads: Dict[Tuple[int, str], bytes] = {}
+        self._lock = threading.Lock()
+
+    def register_prefix(self, prefix: bytes) -> None:
+        """Declares a static body prefix; bodies are then `prefix + tail` with a short per-request tail."""
+        with self._lock:
+            if prefix not in self._prefixes:
+                self._prefixes.append(prefix)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        for index, prefix in enumerate(self._prefixes):
+            if encoding in FRAMED_CODECS and body.startswith(prefix) and 0 < len(body) - len(prefix) <= MAX_FRAMED_TAIL:
+                return self._compress_framed(index, prefix, body, encoding)
+
+        key = (hashlib.sha1(body).digest(), encoding)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.bytes_in += len(body)
+                self.bytes_out += len(cached)
+                return cached
+
+        compressed = CODECS[encoding](body)
+        with self._lock:
+            self.misses += 1
+            self.bytes_in += len(body)
+            self.bytes_out += len(compressed)
+            if self.size > 0:
+                self._entries[key] = compressed
+                if len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+        return compressed
+
+    def _compress_framed(self, index: int, prefix: bytes, body: bytes, encoding: str) -> bytes:
+        make_head, make_tail = FRAMED_CODECS[encoding]
+        head = self._heads.get((index, encoding))
+        hit = head is not None
+        if head is None:
+            head = self._heads[(index, encoding)] = make_head(prefix)
+        compressed = head + make_tail(prefix, body[len(prefix):])
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.bytes_in += len(body)
+            self.bytes_out += len(compressed)
+        return compressed
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses on the JSON-RPC endpoint.
+    Bodies below `minimum_size`, already-encoded responses and bodiless
+    statuses (204/304) pass through untouched. `on_response` is called with
+    the encoding (`identity` when passed through), body size and sent size
+    of every buffered response.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = MINIMUM_SIZE,
+        paths: Tuple[str, ...] = ("/",),
+        cache: Optional[CompressionCache] = None,
+        on_response: Optional[Callable[[str, int, int], None]] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.paths = paths
+        self.cache = cache if cache is not None else CompressionCache()
+        self.on_response = on_response
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = None
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        chunks: List[bytes] = []
+
+        async def buffered_send(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            await self._send_response(send, start_message, b"".join(chunks), encoding)
+
+        await self.app(scope, receive, buffered_send)
+
+    async def _send_response(self, send, start_message, body: bytes, encoding: str) -> None:
+        headers = [(key, value) for key, value in start_message.get("headers", [])]
+        already_encoded = any(key == b"content-encoding" for key, _ in headers)
+
+        if start_message["status"] in (204, 304) or already_encoded or len(body) < self.minimum_size:
+            if self.on_response is not None:
+                self.on_response("identity", len(body), len(body))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        compressed = self.cache.compress(body, encoding)
+        if self.on_response is not None:
+            self.on_response(encoding, len(body), len(compressed))
+
+        # The encoded representation differs byte-wise, so strong validators become weak
+        headers = [
+            (key, b"W/" + value if key == b"etag" and not value.startswith(b"W/") else value)
+            for key, value in headers
+            if key != b"content-length"
+        ]
+        headers.append((b"content-encoding", encoding.encode("latin-1")))
+        headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+        headers.append((b"vary", b"Accept-Encoding"))
+        await send({**start_message, "headers": headers})
+        await send({"type": "http.response.body", "body": compressed})
@@ -0,0 +1,211 @@
+import os
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, List, Any, Dict, Tuple
+
+from memory_bank import CLIENT_ROOT, FeatureEntry, FeatureIndex
+from search_index import SearchIndex
+
+# --- Constants & Configuration ---
+# Own-folder documents read first, in this order; everything else in the folder follows
+PRIMARY_DOCUMENTS = (
+    "FeatureDescription.md",
+    "FeatureTasks.md",
+    "planning-analysis-report.md",
+)
+
+# Documents of dependency features worth reading (the rest of their folder is implementation history)
+DEPENDENCY_DOCUMENTS = ("FeatureDescription.md", "planning-analysis-report.md", "feature-completion-report.md")
+
+# Search-ranked folders: (MemoryBank sub-folder, role, number of files)
+SEARCHED_FOLDERS = (
+    ("CodeGuidelines/", "guideline", 4),
+    ("LessonsLearned/", "lesson", 4),
+)
+
+# Sections considered per searched folder before grouping them by file
+SEARCH_DEPTH = 20
+
+# Packs kept in memory (least recently built are dropped first)
+MAX_CACHED_PACKS = int(os.environ.get("DEVCYCLE_CONTEXT_PACK_CACHE_SIZE", "256"))
+
+
+class FileHashCache:
+    """
+    Content hashes keyed by (path, mtime_ns, size), so unchanged files are
+    hashed once however many packs list them.
+    """
+
+    def __init__(self):
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, mtime_ns: int, size: int) -> Optional[str]:
+        key = str(path)
+        known = self._hashes.get(key)
+        if known is not None and known[0] == mtime_ns and known[1] == size:
+            return known[2]
+        try:
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self._hashes[key] = (mtime_ns, size, digest)
+        return digest
+
+
+class ContextPackBuilder:
+    """
+    Computes the minimal, ranked set of MemoryBank files a procedure needs for
+    one feature: its own folder, its parent epic, its dependencies, and the
+    CodeGuidelines and LessonsLearned files that best match it (BM25).
+    Each entry carries the file's size and content hash. Packs are cached
+    per feature and rebuilt when either index changes or when any file in the
+    pack (or the feature folder listing) changes on disk.
+    Building stats and may hash files, so callers run it off the event loop.
+    """
+
+    def __init__(self, root: Path, feature_index: FeatureIndex, search_index: SearchIndex):
+        self.root = Path(root)
+        self.feature_index = feature_index
+        self.search_index = search_index
+        self.hashes = FileHashCache()
+        # feature id -> (index generations, {relative path: (mtime_ns, size)}, pack)
+        self._packs: Dict[str, Tuple[Tuple[int, int], Dict[str, Tuple[int, int]], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def build(self, feature_id: str) -> Optional[Dict[str, Any]]:
+        """The context pack for `feature_id`, or None if the feature is not indexed."""
+        entry = self.feature_index.get(feature_id)
+        if entry is None:
+            return None
+        generations = (self.feature_index.generation, self.search_index.generation)
+        cached = self._packs.get(entry.id)
+        if cached is not None and cached[0] == generations and self._unchanged(cached[1]):
+            self.hits += 1
+            return cached[2]
+
+        self.misses += 1
+        candidates = self._collect(entry)
+        stamps: Dict[str, Tuple[int, int]] = {}
+        files: List[Dict[str, Any]] = []
+        for path, role, reason, sections in candidates:
+            stamp = self._stat(path)
+            if stamp is None:
+                continue
+            stamps[path] = stamp
+            item: Dict[str, Any] = {
+                "rank": len(files) + 1,
+                "path": f"{CLIENT_ROOT}/{path}",
+                "role": role,
+                "reason": reason,
+                "size": stamp[1],
+                "hash": self.hashes.get(self.root / path, *stamp),
+            }
+            if sections:
+                item["sections"] = sections
+            files.append(item)
+        # Folder listings too: a new file in the feature folder must invalidate the pack
+        for directory in self._own_directories(entry):
+            stamp = self._stat(directory)
+            if stamp is not None:
+                stamps[directory] = stamp
+
+        pack = {
+            "feature_id": entry.id,
+            "feature_path": entry.client_path,
+            "files": files,
+            "total_size": sum(item["size"] for item in files),
+            "pack_hash": hashlib.sha256("".join(f"{item['path']}:{item['hash']}\n" for item in files).encode("utf-8")).hexdigest()[:16],
+        }
+        with self._lock:
+            self._packs.pop(entry.id, None)
+            self._packs[entry.id] = (generations, stamps, pack)
+            while len(self._packs) > MAX_CACHED_PACKS:
+                del self._packs[next(iter(self._packs))]
+        return pack
+
+    def _collect(self, entry: FeatureEntry) -> List[Tuple[str, str, str, Optional[List[Dict[str, Any]]]]]:
+        """Candidate (relative path, role, reason, matching sections) in rank order."""
+        candidates: List[Tuple[str, str, str, Optional[List[Dict[str, Any]]]]] = []
+        seen = set()
+
+        def add(path: str, role: str, reason: str, sections: Optional[List[Dict[str, Any]]] = None) -> None:
+            if path not in seen:
+                seen.add(path)
+                candidates.append((path, role, reason, sections))
+
+        own = self._list_files(entry.path)
+        current = entry.current_phase
+        for name in PRIMARY_DOCUMENTS:
+            if name in own:
+                add(entry.path + name, "feature", "Feature document")
+        if current is not None and current.file in own:
+            add(entry.path + current.file, "feature", f"Current phase ({current.number})")
+        for name in sorted(own):
+            add(entry.path + name, "feature", "Feature folder")
+        lessons = f"LessonsLearned/{entry.id}/"
+        for name in self._list_files(lessons):
+            add(lessons + name, "feature", "Lessons learned from earlier phases of this feature")
+
+        epic = self.feature_index.get(entry.parent_epic or "")
+        dependencies = list(entry.dependencies)
+        if epic is not None:
+            add(epic.path + "EpicDescription.md", "epic", f"Parent epic {epic.id}")
+            for row in epic.breakdown:
+                if row["feature_id"].upper() == entry.id:
+                    dependencies.extend(row["dependencies"])
+        for dependency_id in dict.fromkeys(dependencies):
+            dependency = self.feature_index.get(dependency_id)
+            if dependency is None or dependency.id == entry.id:
+                continue
+            for name in DEPENDENCY_DOCUMENTS:
+                # Missing documents are skipped when the pack is stat'ed
+                add(dependency.path + name, "dependency", f"Dependency {dependency.id} ({dependency.state})")
+
+        query = " ".join([entry.id, entry.title] + ([epic.title] if epic is not None else []))
+        for folder, role, count in SEARCHED_FOLDERS:
+            by_file: Dict[str, List[Dict[str, Any]]] = {}
+            for hit in self.search_index.search(query, limit=SEARCH_DEPTH, path_prefix=folder, exclude_prefix=lessons):
+                path = hit["path"][len(CLIENT_ROOT) + 1:]
+                if path in by_file or len(by_file) < count:
+                    by_file.setdefault(path, []).append({"section_id": hit["section_id"], "title": hit["title"], "line": hit["line"], "score": hit["score"]})
+            for path, sections in by_file.items():
+                add(path, role, f"Matches '{entry.title or entry.id}'", sections)
+        return candidates
+
+    def _own_directories(self, entry: FeatureEntry) -> List[str]:
+        directories = []
+        for relative in (entry.path, f"LessonsLearned/{entry.id}/"):
+            for directory, subdirectories, _ in os.walk(self.root / relative):
+                subdirectories[:] = [name for name in subdirectories if not name.startswith(".")]
+                directories.append(os.path.relpath(directory, self.root).replace(os.sep, "/"))
+        return directories
+
+    def _list_files(self, relative: str) -> List[str]:
+        """Files under `relative` (recursively, hidden entries skipped), relative to it."""
+        base = self.root / relative
+        files = []
+        for directory, subdirectories, names in os.walk(base):
+            subdirectories[:] = sorted(name for name in subdirectories if not name.startswith("."))
+            for name in sorted(names):
+                if not name.startswith("."):
+                    files.append(os.path.relpath(os.path.join(directory, name), base).replace(os.sep, "/"))
+        return files
+
+    def _stat(self, path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.root / path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _unchanged(self, stamps: Dict[str, Tuple[int, int]]) -> bool:
+        return all(self._stat(path) == stamp for path, stamp in stamps.items())
+
+    def stats(self) -> Dict[str, int]:
+        return {"cached": len(self._packs), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,272 @@
+import heapq
+import threading
+from typing import Optional, List, Any, Dict, Tuple
+
+from memory_bank import FeatureEntry, FeatureIndex
+
+# --- Constants & Configuration ---
+# Features in these states are not candidates for "next ready"
+NOT_STARTABLE_STATES = ("00_EPICS", "03_IN_PROGRESS", "04_COMPLETED", "05_CANCELLED")
+
+# Preferred start order among ready features: refined before merely submitted
+READY_STATE_ORDER = {"02_READY_TO_DEVELOP": 0, "01_SUBMITTED": 1}
+
+# Breakdown priorities sort as written (P0 < P1 < P2); unknown priorities sort last
+UNKNOWN_PRIORITY = "P9"
+
+
+class GraphNode:
+    """
+    A feature in a dependency graph with its (deduplicated) prerequisites.
+    `external` nodes are prerequisites outside the analysed scope.
+    """
+
+    def __init__(self, id: str, entry: Optional[FeatureEntry], priority: str = UNKNOWN_PRIORITY, external: bool = False):
+        self.id = id
+        self.entry = entry
+        self.priority = priority
+        self.external = external
+        self.depends_on: List[str] = []
+
+    @property
+    def done(self) -> bool:
+        return self.entry is not None and self.entry.done
+
+    @property
+    def cancelled(self) -> bool:
+        return self.entry is not None and self.entry.state == "05_CANCELLED"
+
+    def describe(self) -> Dict[str, Any]:
+        described: Dict[str, Any] = {"id": self.id}
+        if self.entry is None:
+            described["state"] = None
+            described["missing"] = True
+        else:
+            described["title"] = self.entry.title
+            described["state"] = self.entry.state
+            described["status"] = self.entry.status
+            if self.entry.phases:
+                described["remaining_hours"] = self.entry.remaining_hours
+        if self.priority != UNKNOWN_PRIORITY:
+            described["priority"] = self.priority
+        if self.external:
+            described["external"] = True
+        described["depends_on"] = list(self.depends_on)
+        return described
+
+
+def id_sort_key(item_id: str) -> Tuple[int, str]:
+    _, _, number = item_id.partition("-")
+    return (int(number) if number.isdigit() else 0), item_id
+
+
+class DependencyGraph:
+    """
+    Feature dependency graph built from the MemoryBank index: edges come from
+    each epic's Features Breakdown `Dependencies` column and each feature's
+    Dependencies section. Answers topological order, critical path, cycles
+    and "next ready feature" per epic (or for all features).
+    Results are cached per scope together with the index entries they were
+    computed from; index entries are replaced whenever their documents
+    change, so a scope is recomputed only when one of its own features (or
+    their prerequisites) changed.
+    """
+
+    def __init__(self, feature_index: FeatureIndex):
+        self.feature_index = feature_index
+        # scope -> (entries the analysis was computed from, analysis)
+        self._cache: Dict[str, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def analyze(self, epic_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Graph analysis for one epic's features, or for every feature when
+        `epic_id` is empty. Returns None if the epic is not indexed.
+        """
+        nodes, fingerprint, scope = self._collect(epic_id)
+        if nodes is None:
+            return None
+        cached = self._cache.get(scope)
+        if cached is not None and len(cached[0]) == len(fingerprint) and all(a is b for a, b in zip(cached[0], fingerprint)):
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        analysis = self._analyze(nodes)
+        analysis["scope"] = scope
+        with self._lock:
+            self._cache[scope] = (fingerprint, analysis)
+        return analysis
+
+    def _collect(self, epic_id: Optional[str]) -> Tuple[Optional[Dict[str, GraphNode]], Tuple[Any, ...], str]:
+        """The scope's nodes (prerequisites outside the scope included) and the entries they depend on."""
+        index = self.feature_index
+        if epic_id:
+            epic = index.get(epic_id)
+            if epic is None or epic.kind != "epic":
+                return None, (), epic_id
+            epics = [epic]
+            members = [row["feature_id"].upper() for row in epic.breakdown if row["feature_id"].upper().startswith("FEAT-")]
+            members.extend(entry.id for entry in index.epic_features(epic.id))
+            scope = epic.id
+        else:
+            entries = index.entries()
+            epics = [entry for entry in entries if entry.kind == "epic"]
+            members = [entry.id for entry in entries if entry.kind == "feature"]
+            scope = "*"
+
+        nodes: Dict[str, GraphNode] = {}
+        for item_id in dict.fromkeys(members):
+            nodes[item_id] = GraphNode(item_id, index.get(item_id))
+        for epic in epics:
+            for row in epic.breakdown:
+                node = nodes.get(row["feature_id"].upper())
+                if node is None:
+                    continue
+                if row.get("priority"):
+                    node.priority = min(node.priority, row["priority"].upper())
+                node.depends_on.extend(row["dependencies"])
+        for node in list(nodes.values()):
+            if node.entry is not None:
+                node.depends_on.extend(node.entry.dependencies)
+            node.depends_on = [item_id for item_id in dict.fromkeys(node.depends_on) if item_id != node.id]
+        # Prerequisites outside the scope are leaf nodes: only their state matters
+        for node in list(nodes.values()):
+            for item_id in node.depends_on:
+                if item_id not in nodes:
+                    nodes[item_id] = GraphNode(item_id, index.get(item_id), external=True)
+
+        fingerprint = tuple(epics) + tuple(node.entry for node in nodes.values())
+        return nodes, fingerprint, scope
+
+    def _analyze(self, nodes: Dict[str, GraphNode]) -> Dict[str, Any]:
+        internal = {item_id: node for item_id, node in nodes.items() if not node.external}
+        cycles = find_cycles(internal)
+        in_cycle = {item_id for cycle in cycles for item_id in cycle}
+
+        # Kahn's algorithm over in-scope edges; ties broken by ID so the order is stable
+        pending = {
+            item_id: sum(1 for dependency in node.depends_on if dependency in internal)
+            for item_id, node in internal.items()
+        }
+        dependents: Dict[str, List[str]] = {item_id: [] for item_id in internal}
+        for item_id, node in internal.items():
+            for dependency in node.depends_on:
+                if dependency in internal:
+                    dependents[dependency].append(item_id)
+        ready = [id_sort_key(item_id) for item_id, count in pending.items() if count == 0]
+        heapq.heapify(ready)
+        order: List[str] = []
+        while ready:
+            item_id = heapq.heappop(ready)[1]
+            order.append(item_id)
+            for dependent in dependents[item_id]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    heapq.heappush(ready, id_sort_key(dependent))
+        position = {item_id: rank for rank, item_id in enumerate(order)}
+        unordered = sorted((item_id for item_id in internal if item_id not in position), key=id_sort_key)
+
+        # Critical path: the longest chain of unfinished features, ties broken by remaining estimated hours
+        best: Dict[str, Tuple[int, float, Optional[str]]] = {}
+        for item_id in order:
+            node = internal[item_id]
+            if node.done or node.cancelled:
+                continue
+            length, hours, previous = 0, 0.0, None
+            for dependency in node.depends_on:
+                if dependency in best and best[dependency][:2] > (length, hours):
+                    length, hours, previous = best[dependency][0], best[dependency][1], dependency
+            own_hours = node.entry.remaining_hours if node.entry is not None else 0.0
+            best[item_id] = (length + 1, hours + own_hours, previous)
+        critical_path: List[str] = []
+        if best:
+            tail: Optional[str] = max(best, key=lambda item_id: (best[item_id][0], best[item_id][1], -position[item_id]))
+            critical_hours = best[tail][1]
+            while tail is not None:
+                critical_path.append(tail)
+                tail = best[tail][2]
+            critical_path.reverse()
+        else:
+            critical_hours = 0.0
+
+        ready_features, blocked, in_progress = [], [], []
+        for item_id in order + unordered:
+            node = internal[item_id]
+            if node.entry is None or node.done or node.cancelled:
+                continue
+            if node.entry.state == "03_IN_PROGRESS":
+                in_progress.append(item_id)
+                continue
+            waiting = [dependency for dependency in node.depends_on if not nodes[dependency].done]
+            if item_id in in_cycle or waiting:
+                blocked.append({"id": item_id, "waiting_on": waiting, "in_cycle": item_id in in_cycle})
+            elif node.entry.state not in NOT_STARTABLE_STATES:
+                ready_features.append(item_id)
+        ready_features.sort(key=lambda item_id: (
+            READY_STATE_ORDER.get(internal[item_id].entry.state, len(READY_STATE_ORDER)),
+            internal[item_id].priority,
+            position.get(item_id, len(position)),
+        ))
+
+        return {
+            "nodes": [nodes[item_id].describe() for item_id in sorted(nodes, key=id_sort_key)],
+            "order": order,
+            "unordered": unordered,
+            "cycles": cycles,
+            "critical_path": {"features": critical_path, "remaining_hours": critical_hours},
+            "ready": ready_features,
+            "in_progress": in_progress,
+            "blocked": blocked,
+            "missing": sorted((item_id for item_id, node in nodes.items() if node.entry is None), key=id_sort_key),
+        }
+
+    def stats(self) -> Dict[str, int]:
+        return {"cached_scopes": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+def find_cycles(nodes: Dict[str, GraphNode]) -> List[List[str]]:
+    """Strongly connected components with more than one feature (Tarjan, iterative)."""
+    index_of: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack = set()
+    cycles: List[List[str]] = []
+    counter = 0
+
+    for root in sorted(nodes, key=id_sort_key):
+        if root in index_of:
+            continue
+        work = [(root, 0)]
+        while work:
+            item_id, edge = work.pop()
+            if edge == 0:
+                index_of[item_id] = low[item_id] = counter
+                counter += 1
+                stack.append(item_id)
+                on_stack.add(item_id)
+            successors = [dependency for dependency in nodes[item_id].depends_on if dependency in nodes]
+            if edge < len(successors):
+                work.append((item_id, edge + 1))
+                successor = successors[edge]
+                if successor not in index_of:
+                    work.append((successor, 0))
+                elif successor in on_stack:
+                    low[item_id] = min(low[item_id], index_of[successor])
+                continue
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[item_id])
+            if low[item_id] == index_of[item_id]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == item_id:
+                        break
+                if len(component) > 1:
+                    cycles.append(sorted(component, key=id_sort_key))
+    return cycles
@@ -0,0 +1,186 @@
+import threading
+from typing import Optional, List, Any, Dict, Tuple
+
+from epic_graph import DependencyGraph
+from memory_bank import DONE_STATUSES, HOUR_COLUMNS, FeatureEntry, FeatureIndex
+
+# --- Constants & Configuration ---
+# Epic-facing status per state folder (see Prompts/epic-status-update.md, Feature State Mapping)
+STATE_STATUS = {
+    "01_SUBMITTED": "SUBMITTED",
+    "02_READY_TO_DEVELOP": "READY",
+    "03_IN_PROGRESS": "IN_PROGRESS",
+    "04_COMPLETED": "COMPLETED",
+    "05_CANCELLED": "CANCELLED",
+}
+
+# Epic status -> (icon, summary label, Mermaid class); order is the Progress Summary row order
+STATUS_DISPLAY = {
+    "COMPLETED": ("✅", "Completed", "completed"),
+    "IN_PROGRESS": ("🔨", "In Progress", "inProgress"),
+    "READY": ("📝", "Ready", "ready"),
+    "DESIGNED": ("📐", "Designed", "designed"),
+    "SUBMITTED": ("📋", "Submitted", "notStarted"),
+    "CANCELLED": ("❌", "Cancelled", "cancelled"),
+}
+
+# Progress bar width in blocks
+PROGRESS_BLOCKS = 16
+
+# Mermaid class definitions included in every epic's Dependency Flow Diagram
+CLASS_DEFINITIONS = (
+    "classDef notStarted fill:#6c757d,color:white,stroke:#495057",
+    "classDef designed fill:#6c757d,color:white,stroke:#17a2b8",
+    "classDef ready fill:#6c757d,color:white,stroke:#28a745",
+    "classDef inProgress fill:#ffc107,color:black,stroke:#e0a800",
+    "classDef completed fill:#28a745,color:white,stroke:#1e7e34",
+    "classDef cancelled fill:#dc3545,color:white,stroke:#c82333",
+)
+
+
+def feature_status(entry: Optional[FeatureEntry]) -> str:
+    """Epic-facing status of a feature: its state folder, with SUBMITTED split on whether a design exists."""
+    if entry is None:
+        return "SUBMITTED"
+    status = STATE_STATUS.get(entry.state, "SUBMITTED")
+    if status == "SUBMITTED" and entry.has_design:
+        return "DESIGNED"
+    return status
+
+
+def feature_rollup(item_id: str, entry: Optional[FeatureEntry]) -> Dict[str, Any]:
+    """Status, phase completion and time totals of one feature."""
+    status = feature_status(entry)
+    icon, _, css_class = STATUS_DISPLAY[status]
+    rollup: Dict[str, Any] = {"id": item_id, "title": entry.title if entry else "", "status": status, "icon": icon, "class": css_class}
+    if entry is None:
+        rollup["missing"] = True
+        return rollup
+    rollup["state"] = entry.state
+    phases = entry.phases
+    done = sum(1 for phase in phases if phase.status in DONE_STATUSES)
+    rollup["phases"] = {"total": len(phases), "done": done, "percent": round(done * 100 / len(phases)) if phases else 0}
+    current = entry.current_phase
+    if current is not None:
+        rollup["current_phase"] = {"number": current.number, "name": current.name, "status": current.status}
+    rollup["hours"] = {key: sum(phase.hours.get(key, 0.0) for phase in phases) for key in HOUR_COLUMNS.values()}
+    return rollup
+
+
+class EpicRollup:
+    """
+    Server-side epic status rollup: per-status feature counts, progress bar,
+    phase completion and time-tracking totals, plus ready-to-paste Markdown
+    for the epic's Progress Summary and Dependency Flow Diagram.
+    Per-feature rollups are cached by index entry and epic rollups by the
+    entries they were built from; index entries are replaced when their
+    documents change, so only changed features are recomputed.
+    """
+
+    def __init__(self, feature_index: FeatureIndex, dependency_graph: DependencyGraph):
+        self.feature_index = feature_index
+        self.dependency_graph = dependency_graph
+        self._features: Dict[str, Tuple[Optional[FeatureEntry], Dict[str, Any]]] = {}
+        self._epics: Dict[str, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def rollup(self, epic_id: str) -> Optional[Dict[str, Any]]:
+        """The rollup for `epic_id`, or None if the epic is not indexed."""
+        epic = self.feature_index.get(epic_id)
+        if epic is None or epic.kind != "epic":
+            return None
+        members = [row["feature_id"].upper() for row in epic.breakdown if row["feature_id"].upper().startswith("FEAT-")]
+        members.extend(entry.id for entry in self.feature_index.epic_features(epic.id))
+        members = list(dict.fromkeys(members))
+        entries = [self.feature_index.get(item_id) for item_id in members]
+
+        fingerprint = (epic, *entries)
+        cached = self._epics.get(epic.id)
+        if cached is not None and len(cached[0]) == len(fingerprint) and all(a is b for a, b in zip(cached[0], fingerprint)):
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+
+        features = [self._feature(item_id, entry) for item_id, entry in zip(members, entries)]
+        by_status: Dict[str, List[str]] = {status: [] for status in STATUS_DISPLAY}
+        for feature in features:
+            by_status[feature["status"]].append(feature["id"])
+
+        active = [feature for feature in features if feature["status"] != "CANCELLED"]
+        completed = len(by_status["COMPLETED"])
+        percent = round(completed * 100 / len(active)) if active else 0
+        filled = round(completed * PROGRESS_BLOCKS / len(active)) if active else 0
+        if active and completed == len(active):
+            epic_status = "COMPLETED"
+        elif any(feature["status"] in ("IN_PROGRESS", "COMPLETED") for feature in active):
+            epic_status = "IN_PROGRESS"
+        else:
+            epic_status = "DRAFT"
+
+        phase_total = sum(feature.get("phases", {}).get("total", 0) for feature in active)
+        phase_done = sum(feature.get("phases", {}).get("done", 0) for feature in active)
+        hours = {key: sum(feature.get("hours", {}).get(key, 0.0) for feature in active) for key in HOUR_COLUMNS.values()}
+        progress_bar = "█" * filled + "░" * (PROGRESS_BLOCKS - filled)
+
+        rollup = {
+            "epic_id": epic.id,
+            "epic_path": epic.client_path,
+            "epic_status": epic_status,
+            "progress": {"completed": completed, "total": len(active), "percent": percent, "bar": progress_bar},
+            "counts": {status: len(ids) for status, ids in by_status.items()},
+            "phases": {"total": phase_total, "done": phase_done, "percent": round(phase_done * 100 / phase_total) if phase_total else 0},
+            "hours": hours,
+            "features": features,
+            "unassigned_rows": sum(1 for row in epic.breakdown if not row["feature_id"].upper().startswith("FEAT-")),
+            "markdown": {
+                "progress_summary": self._progress_summary(epic_status, progress_bar, percent, completed, len(active), by_status),
+                "dependency_diagram": self._diagram(epic.id, features),
+            },
+        }
+        with self._lock:
+            self._epics[epic.id] = (fingerprint, rollup)
+        return rollup
+
+    def _feature(self, item_id: str, entry: Optional[FeatureEntry]) -> Dict[str, Any]:
+        cached = self._features.get(item_id)
+        if cached is not None and cached[0] is entry:
+            return cached[1]
+        rollup = feature_rollup(item_id, entry)
+        with self._lock:
+            self._features[item_id] = (entry, rollup)
+        return rollup
+
+    @staticmethod
+    def _progress_summary(epic_status: str, bar: str, percent: int, completed: int, total: int, by_status: Dict[str, List[str]]) -> str:
+        lines = [
+            "### Epic Progress",
+            "",
+            f"**Status:** {epic_status}",
+            f"**Progress:** {bar} {percent}% ({completed}/{total} features complete)",
+            "",
+            "| Status | Count | Features |",
+            "|--------|-------|----------|",
+        ]
+        for status, (icon, label, _) in STATUS_DISPLAY.items():
+            if status == "CANCELLED" and not by_status[status]:
+                continue
+            ids = by_status[status]
+            lines.append(f"| {icon} {label} | {len(ids)} | {', '.join(ids) or '-'} |")
+        return "\n".join(lines)
+
+    def _diagram(self, epic_id: str, features: List[Dict[str, Any]]) -> str:
+        graph = self.dependency_graph.analyze(epic_id)
+        lines = ["flowchart TD"]
+        lines.extend(f"    {feature['id']}[{feature['icon']} {feature['id']}: {feature['title']}]" for feature in features)
+        members = {feature["id"] for feature in features}
+        for node in graph["nodes"] if graph is not None else []:
+            if node["id"] in members:
+                lines.extend(f"    {dependency} --> {node['id']}" for dependency in node["depends_on"] if dependency in members)
+        lines.extend(f"    class {feature['id']} {feature['class']}" for feature in features)
+        lines.extend(f"    {definition}" for definition in CLASS_DEFINITIONS)
+        return "\n".join(lines)
+
+    def stats(self) -> Dict[str, int]:
+        return {"cached_epics": len(self._epics), "cached_features": len(self._features), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,586 @@
+import os
+import re
+import json
+import bisect
+import mmap
+import zlib
+import struct
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, List, Any, Dict, Tuple
+
+# --- Constants & Configuration ---
+# Mounted working copy (or bare repository) whose commits are verified; empty disables commit verification
+DEFAULT_GIT_REPO_DIR = os.environ.get("DEVCYCLE_GIT_REPO_DIR", "")
+
+# Seconds between ref checks of the mounted repository (0 disables background refresh)
+DEFAULT_REFRESH_INTERVAL = float(os.environ.get("DEVCYCLE_GIT_REFRESH_INTERVAL", "10.0"))
+
+# On-disk snapshot of the commit index, so a restart only reads commits added since (empty disables it)
+DEFAULT_SNAPSHOT_PATH = os.environ.get("DEVCYCLE_GIT_INDEX_SNAPSHOT", str(Path(tempfile.gettempdir()) / "devcycle-git-index.json"))
+
+# Branches whose history is shared by every feature (local or remote-tracking, e.g. `origin/main`)
+MAINLINE_BRANCHES = tuple(name.strip() for name in os.environ.get("DEVCYCLE_GIT_MAINLINE_BRANCHES", "main,master").split(",") if name.strip())
+
+# Bumped whenever the snapshot layout changes, so stale snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+# Commits walked per branch beyond the mainline (guards against branches unrelated to it)
+MAX_BRANCH_COMMITS = 10000
+
+# Resolved delta bases kept per pack (commit deltas chain on the same few bases)
+DELTA_BASE_CACHE_SIZE = 256
+
+# Pack object types (see gitformat-pack)
+OBJECT_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+OBJECT_TYPE_NUMBERS = {name: number for number, name in OBJECT_TYPES.items()}
+OFS_DELTA = 6
+REF_DELTA = 7
+
+SHA_PATTERN = re.compile(r"^[0-9a-f]{4,40}$")
+
+
+class PackFile:
+    """
+    A `.pack` with its version 2 `.idx`: object lookup by (prefix of) SHA via
+    the fan-out table and a binary search, and object reads with OFS/REF delta
+    resolution. Both files are memory-mapped, so nothing is read up front.
+    """
+
+    def __init__(self, idx_path: Path, store: "ObjectStore"):
+        self.store = store
+        with open(idx_path, "rb") as f:
+            self._idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(idx_path.with_suffix(".pack"), "rb") as f:
+            self._pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._idx[:4] != b"\xfftOc" or struct.unpack(">I", self._idx[4:8])[0] != 2:
+            raise ValueError(f"Unsupported pack index {idx_path.name}")
+        self.count = struct.unpack(">I", self._idx[8 + 255 * 4:8 + 256 * 4])[0]
+        self._names = 8 + 256 * 4
+        self._offsets = self._names + self.count * 24
+        self._large_offsets = self._offsets + self.count * 4
+        self._bases: Dict[int, Tuple[int, bytes]] = {}
+
+    def _fanout(self, byte: int) -> int:
+        return struct.unpack(">I", self._idx[8 + byte * 4:12 + byte * 4])[0] if byte >= 0 else 0
+
+    def _name(self, position: int) -> bytes:
+        return self._idx[self._names + position * 20:self._names + position * 20 + 20]
+
+    def find(self, prefix: bytes, limit: int = 2) -> List[Tuple[bytes, int]]:
+        """(SHA, position) of up to `limit` objects whose binary SHA starts with `prefix`."""
+        low, high = self._fanout(prefix[0] - 1), self._fanout(prefix[0])
+        while low < high:
+            middle = (low + high) // 2
+            if self._name(middle) < prefix:
+                low = middle + 1
+            else:
+                high = middle
+        matches = []
+        while low < self.count and len(matches) < limit and self._name(low).startswith(prefix):
+            matches.append((self._name(low), low))
+            low += 1
+        return matches
+
+    def offset(self, position: int) -> int:
+        offset = struct.unpack(">I", self._idx[self._offsets + position * 4:self._offsets + position * 4 + 4])[0]
+        if offset & 0x80000000:
+            start = self._large_offsets + (offset & 0x7FFFFFFF) * 8
+            offset = struct.unpack(">Q", self._idx[start:start + 8])[0]
+        return offset
+
+    def read_at(self, offset: int) -> Tuple[int, bytes]:
+        """(type, data) of the object at `offset`, with deltas applied."""
+        cached = self._bases.get(offset)
+        if cached is not None:
+            return cached
+        pack = self._pack
+        byte = pack[offset]
+        kind, size, shift, position = (byte >> 4) & 7, byte & 15, 4, offset + 1
+        while byte & 0x80:
+            byte = pack[position]
+            size |= (byte & 0x7F) << shift
+            shift += 7
+            position += 1
+
+        if kind == OFS_DELTA:
+            byte = pack[position]
+            distance = byte & 0x7F
+            position += 1
+            while byte & 0x80:
+                byte = pack[position]
+                distance = ((distance + 1) << 7) | (byte & 0x7F)
+                position += 1
+            kind, base = self.read_at(offset - distance)
+            result = (kind, apply_delta(base, inflate(pack, position)))
+        elif kind == REF_DELTA:
+            base_object = self.store.read_binary(pack[position:position + 20])
+            if base_object is None:
+                raise ValueError(f"Missing delta base {pack[position:position + 20].hex()}")
+            kind, base = base_object
+            result = (kind, apply_delta(base, inflate(pack, position + 20)))
+        else:
+            result = (kind, inflate(pack, position))
+
+        if len(self._bases) >= DELTA_BASE_CACHE_SIZE:
+            del self._bases[next(iter(self._bases))]
+        self._bases[offset] = result
+        return result
+
+
+def inflate(buffer: Any, position: int) -> bytes:
+    decompressor = zlib.decompressobj()
+    chunks = []
+    while not decompressor.eof:
+        chunk = buffer[position:position + 8192]
+        if not chunk:
+            break
+        chunks.append(decompressor.decompress(chunk))
+        position += len(chunk)
+    return b"".join(chunks)
+
+
+def read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    value, shift = 0, 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, position
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Applies a git delta (copy-from-base / insert instructions) to `base`."""
+    _, position = read_varint(delta, 0)
+    _, position = read_varint(delta, position)
+    out = bytearray()
+    while position < len(delta):
+        opcode = delta[position]
+        position += 1
+        if opcode & 0x80:
+            offset = size = 0
+            for bit in range(4):
+                if opcode & (1 << bit):
+                    offset |= delta[position] << (8 * bit)
+                    position += 1
+            for bit in range(3):
+                if opcode & (0x10 << bit):
+                    size |= delta[position] << (8 * bit)
+                    position += 1
+            out += base[offset:offset + (size or 0x10000)]
+        elif opcode:
+            out += delta[position:position + opcode]
+            position += opcode
+    return bytes(out)
+
+
+class ObjectStore:
+    """Read-only access to a repository's loose and packed objects."""
+
+    def __init__(self, git_dir: Path):
+        self.objects_dir = git_dir / "objects"
+        self._packs: Dict[str, PackFile] = {}
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Opens packs added since the last call and drops removed ones (after `git gc`)."""
+        try:
+            names = {name for name in os.listdir(self.objects_dir / "pack") if name.endswith(".idx")}
+        except FileNotFoundError:
+            names = set()
+        for name in list(self._packs):
+            if name not in names:
+                del self._packs[name]
+        for name in sorted(names - set(self._packs)):
+            try:
+                self._packs[name] = PackFile(self.objects_dir / "pack" / name, self)
+            except (OSError, ValueError) as e:
+                print(f"[MCP SERVER] Skipping pack {name}: {e}")
+
+    def read(self, sha: str) -> Optional[Tuple[str, bytes]]:
+        """(type name, data) of the object `sha`, or None if it is not in the repository."""
+        found = self.read_binary(bytes.fromhex(sha))
+        if found is None:
+            return None
+        kind, data = found
+        return OBJECT_TYPES.get(kind, str(kind)), data
+
+    def read_binary(self, sha: bytes) -> Optional[Tuple[int, bytes]]:
+        hex_sha = sha.hex()
+        try:
+            with open(self.objects_dir / hex_sha[:2] / hex_sha[2:], "rb") as f:
+                raw = zlib.decompress(f.read())
+            header, _, data = raw.partition(b"\0")
+            kind = header.split(b" ", 1)[0].decode("ascii")
+            return OBJECT_TYPE_NUMBERS.get(kind, 0), data
+        except FileNotFoundError:
+            pass
+        for pack in self._packs.values():
+            for _, position in pack.find(sha, limit=1):
+                return pack.read_at(pack.offset(position))
+        return None
+
+    def find(self, prefix: str, limit: int = 2) -> List[str]:
+        """Full SHAs of up to `limit` objects starting with the hex `prefix` (two means ambiguous)."""
+        matches = set()
+        try:
+            for name in os.listdir(self.objects_dir / prefix[:2]):
+                if (prefix[:2] + name).startswith(prefix):
+                    matches.add(prefix[:2] + name)
+        except FileNotFoundError:
+            pass
+        # Packs index whole bytes: search by the even-length part, then filter
+        binary = bytes.fromhex(prefix[:len(prefix) // 2 * 2])
+        for pack in self._packs.values():
+            for sha, _ in pack.find(binary, limit=limit + 16):
+                if sha.hex().startswith(prefix):
+                    matches.add(sha.hex())
+        return sorted(matches)[:limit]
+
+    def stats(self) -> Dict[str, int]:
+        return {"packs": len(self._packs), "packed_objects": sum(pack.count for pack in self._packs.values())}
+
+
+class CommitInfo:
+    """Parents, committer time and subject of an indexed commit."""
+
+    __slots__ = ("parents", "time", "subject")
+
+    def __init__(self, parents: Tuple[str, ...], time: int, subject: str):
+        self.parents = parents
+        self.time = time
+        self.subject = subject
+
+    def to_snapshot(self) -> List[Any]:
+        return [list(self.parents), self.time, self.subject]
+
+    @classmethod
+    def from_snapshot(cls, data: List[Any]) -> "CommitInfo":
+        return cls(tuple(data[0]), data[1], data[2])
+
+
+def parse_commit(data: bytes) -> CommitInfo:
+    header, _, message = data.partition(b"\n\n")
+    parents: List[str] = []
+    time = 0
+    for line in header.split(b"\n"):
+        if line.startswith(b"parent "):
+            parents.append(line[7:].decode("ascii"))
+        elif line.startswith(b"committer "):
+            fields = line.rsplit(b" ", 2)
+            time = int(fields[1]) if len(fields) == 3 and fields[1].isdigit() else 0
+    subject = message.split(b"\n", 1)[0].decode("utf-8", errors="replace")
+    return CommitInfo(tuple(parents), time, subject)
+
+
+def find_git_dir(repo_dir: Path) -> Optional[Path]:
+    """The git directory of a working copy (`.git` folder or `gitdir:` file) or of a bare repository."""
+    dot_git = repo_dir / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    if dot_git.is_file():
+        with open(dot_git, "r", encoding="utf-8") as f:
+            target = f.read().strip().partition("gitdir:")[2].strip()
+        return (repo_dir / target).resolve() if target else None
+    if (repo_dir / "objects").is_dir() and (repo_dir / "HEAD").is_file():
+        return repo_dir
+    return None
+
+
+class GitCommitIndex:
+    """
+    Commit graph of a mounted repository, read directly from its refs, loose
+    objects and packs (no `git` binary needed). `refresh()` re-reads the refs
+    and indexes only commits not seen before, walking back from changed
+    branch tips until it reaches known history; the index is persisted to a
+    snapshot so a restart only reads commits added since. The mainline
+    (`main`/`master`) reachable set is extended the same way, and each other
+    branch's own commits (those not on the mainline) are cached per tip.
+    `verify()` checks commit references from the MemoryBank against it.
+    With `warm=False`, the snapshot load and first walk wait for `warm_up()`.
+    """
+
+    def __init__(self, repo_dir: Path, snapshot_path: Optional[str] = DEFAULT_SNAPSHOT_PATH, refresh_interval: float = DEFAULT_REFRESH_INTERVAL, warm: bool = True):
+        self.repo_dir = Path(repo_dir)
+        self.git_dir = find_git_dir(self.repo_dir)
+        if self.git_dir is None:
+            raise ValueError(f"{repo_dir} is not a git repository")
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.refresh_interval = refresh_interval
+        self.objects = ObjectStore(self.git_dir)
+        self.generation = 0
+        self.head: Optional[str] = None
+        self._refs: Dict[str, str] = {}
+        self._commits: Dict[str, CommitInfo] = {}
+        self._mainline: set = set()
+        self._mainline_tips: Dict[str, str] = {}
+        # branch -> (tip, mainline generation, own commits newest first)
+        self._branches: Dict[str, Tuple[str, int, List[str]]] = {}
+        self._mainline_generation = 0
+        self._sorted: Optional[List[str]] = None
+        self._lock = threading.RLock()
+        if warm:
+            self.warm_up()
+
+    def warm_up(self) -> List[str]:
+        """Restores the snapshot and indexes the commits added since it was taken."""
+        with self._lock:
+            if not self._commits:
+                self._load_snapshot()
+        return self.refresh()
+
+    def refresh(self) -> List[str]:
+        """
+        Re-reads the refs and indexes commits reachable from changed tips.
+        Returns the branches whose tip changed.
+        """
+        with self._lock:
+            refs = self._read_refs()
+            if refs == self._refs:
+                return []
+            self.objects.refresh()
+            changed = sorted(name for name in set(refs) | set(self._refs) if refs.get(name) != self._refs.get(name))
+            added = 0
+            for name in changed:
+                if name in refs:
+                    added += self._index_from(refs[name])
+            self._refs = refs
+            self._update_mainline()
+            self._branches = {name: cached for name, cached in self._branches.items() if refs.get(name) == cached[0]}
+            self.generation += 1
+            if added:
+                self._sorted = None
+                self._save_snapshot()
+            return changed
+
+    def _read_refs(self) -> Dict[str, str]:
+        """Branch name (`feat/x`, `origin/feat/x`) -> tip SHA, from packed-refs overlaid with loose refs."""
+        refs: Dict[str, str] = {}
+        try:
+            with open(self.git_dir / "packed-refs", "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith(("#", "^")):
+                        continue
+                    sha, _, name = line.strip().partition(" ")
+                    refs[name] = sha
+        except FileNotFoundError:
+            pass
+        for namespace in ("refs/heads", "refs/remotes"):
+            for directory, _, names in os.walk(self.git_dir / namespace):
+                for name in names:
+                    full_path = os.path.join(directory, name)
+                    try:
+                        with open(full_path, "r", encoding="utf-8") as f:
+                            value = f.read().strip()
+                    except (FileNotFoundError, UnicodeDecodeError):
+                        continue
+                    if SHA_PATTERN.match(value):
+                        refs[os.path.relpath(full_path, self.git_dir).replace(os.sep, "/")] = value
+        try:
+            with open(self.git_dir / "HEAD", "r", encoding="utf-8") as f:
+                head = f.read().strip()
+            self.head = head[len("ref: refs/heads/"):] if head.startswith("ref: refs/heads/") else head
+        except FileNotFoundError:
+            self.head = None
+        branches = {}
+        for name, sha in refs.items():
+            for prefix in ("refs/heads/", "refs/remotes/"):
+                if name.startswith(prefix) and not name.endswith("/HEAD"):
+                    branches[name[len(prefix):]] = sha
+        return branches
+
+    def _index_from(self, tip: str) -> int:
+        """Indexes `tip` and its unseen ancestors; history missing from the store (shallow clones) ends the walk."""
+        added = 0
+        stack = [tip]
+        while stack:
+            sha = stack.pop()
+            if sha in self._commits:
+                continue
+            found = self.objects.read(sha)
+            if found is None or found[0] != "commit":
+                continue
+            info = parse_commit(found[1])
+            self._commits[sha] = info
+            added += 1
+            stack.extend(parent for parent in info.parents if parent not in self._commits)
+        return added
+
+    def _walk(self, tip: str, stop: set, limit: Optional[int] = None) -> Tuple[List[str], set]:
+        """Commits reachable from `tip` but not from `stop` (newest first), and the `stop` commits reached."""
+        walked: List[str] = []
+        seen = {tip}
+        boundary = set()
+        stack = [tip]
+        while stack and (limit is None or len(walked) < limit):
+            sha = stack.pop()
+            if sha in stop:
+                boundary.add(sha)
+                continue
+            info = self._commits.get(sha)
+            if info is None:
+                continue
+            walked.append(sha)
+            for parent in info.parents:
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+        walked.sort(key=lambda sha: -self._commits[sha].time)
+        return walked, boundary
+
+    def _update_mainline(self) -> None:
+        tips = {name: sha for name, sha in self._refs.items() if name.rpartition("/")[2] in MAINLINE_BRANCHES and name.count("/") <= 1}
+        if tips == self._mainline_tips:
+            return
+        rebuild = False
+        mainline = set(self._mainline)
+        for name, sha in tips.items():
+            previous = self._mainline_tips.get(name)
+            walked, boundary = self._walk(sha, mainline)
+            mainline.update(walked)
+            # A rewound or force-pushed mainline does not reach its old tip: start over
+            if previous is not None and previous != sha and previous not in boundary and previous not in walked:
+                rebuild = True
+        if rebuild or any(name not in tips for name in self._mainline_tips):
+            mainline = set()
+            for sha in tips.values():
+                mainline.update(self._walk(sha, mainline)[0])
+        self._mainline = mainline
+        self._mainline_tips = tips
+        self._mainline_generation += 1
+
+    def branch_commits(self, branch: str) -> List[str]:
+        """Commits of `branch` that are not on the mainline, newest first."""
+        tip = self._refs.get(branch)
+        if tip is None:
+            return []
+        cached = self._branches.get(branch)
+        if cached is not None and cached[0] == tip and cached[1] == self._mainline_generation:
+            return cached[2]
+        with self._lock:
+            commits = self._walk(tip, self._mainline, limit=MAX_BRANCH_COMMITS)[0]
+            self._branches[branch] = (tip, self._mainline_generation, commits)
+        return commits
+
+    def feature_branches(self, feature_id: str) -> List[str]:
+        """Branches named after `feature_id` (`feat/FEAT-001-slug`, `origin/feat/FEAT-001-slug`, ...)."""
+        pattern = re.compile(rf"(?:^|/){re.escape(feature_id)}(?:-|$)", re.IGNORECASE)
+        return sorted(name for name in self._refs if pattern.search(name))
+
+    def resolve(self, reference: str) -> Tuple[Optional[str], str]:
+        """
+        (full SHA, state) of an abbreviated or full commit reference; state is
+        `indexed`, `unreachable` (an object no branch reaches), `ambiguous`,
+        `not-a-commit` or `missing`.
+        """
+        prefix = reference.strip().lower()
+        if not SHA_PATTERN.match(prefix):
+            return None, "missing"
+        if prefix in self._commits:
+            return prefix, "indexed"
+        if self._sorted is None:
+            with self._lock:
+                self._sorted = sorted(self._commits)
+        position = bisect.bisect_left(self._sorted, prefix)
+        matches = [sha for sha in self._sorted[position:position + 2] if sha.startswith(prefix)]
+        if len(matches) == 1:
+            return matches[0], "indexed"
+        if len(matches) > 1:
+            return None, "ambiguous"
+        objects = self.objects.find(prefix)
+        if len(objects) > 1:
+            return None, "ambiguous"
+        if not objects:
+            return None, "missing"
+        found = self.objects.read(objects[0])
+        if found is None or found[0] != "commit":
+            return objects[0], "not-a-commit"
+        return objects[0], "unreachable"
+
+    def verify(self, feature_id: str, references: List[Dict[str, Any]], all_references: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Checks every commit reference (`{"commit", "path", "line", "table"}`)
+        against the repository and lists commits on the feature's branches that
+        none of `all_references` (default: `references`) mentions.
+        """
+        branches = self.feature_branches(feature_id)
+        membership: Dict[str, List[str]] = {}
+        for branch in branches:
+            for sha in self.branch_commits(branch):
+                membership.setdefault(sha, []).append(branch)
+
+        verified, missing = [], []
+        for reference in references:
+            sha, state = self.resolve(reference["commit"])
+            if state != "indexed":
+                missing.append({**reference, "sha": sha, "reason": state})
+                continue
+            verified.append({
+                **reference,
+                "sha": sha,
+                "subject": self._commits[sha].subject,
+                "branches": membership.get(sha, []),
+                "mainline": sha in self._mainline,
+            })
+
+        tracked = set()
+        for reference in all_references if all_references is not None else references:
+            sha, state = self.resolve(reference["commit"])
+            if sha is not None:
+                tracked.add(sha)
+        untracked = [
+            {"sha": sha, "commit": sha[:7], "subject": self._commits[sha].subject, "branches": branch_names, "time": self._commits[sha].time}
+            for sha, branch_names in membership.items() if sha not in tracked
+        ]
+        untracked.sort(key=lambda item: -item["time"])
+        return {
+            "feature_id": feature_id,
+            "passed": not missing,
+            "branches": [{"name": branch, "tip": self._refs[branch], "commits": len(self.branch_commits(branch))} for branch in branches],
+            "verified": verified,
+            "missing": missing,
+            "untracked": untracked,
+            "repository": {"head": self.head, "commits_indexed": len(self._commits), "generation": self.generation},
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "commits": len(self._commits),
+            "branches": len(self._refs),
+            "mainline_commits": len(self._mainline),
+            "generation": self.generation,
+            **self.objects.stats(),
+        }
+
+    def _load_snapshot(self) -> None:
+        if self.snapshot_path is None:
+            return
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("git_dir") != str(self.git_dir.resolve()):
+            return
+        self._commits = {sha: CommitInfo.from_snapshot(data) for sha, data in snapshot.get("commits", {}).items()}
+
+    def _save_snapshot(self) -> None:
+        if self.snapshot_path is None:
+            return
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "git_dir": str(self.git_dir.resolve()),
+            "commits": {sha: info.to_snapshot() for sha, info in self._commits.items()},
+        }
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write a uniquely named file then rename, so neither a crash nor a concurrent writer leaves a truncated snapshot
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.snapshot_path.parent, prefix=self.snapshot_path.name + ".", suffix=".tmp", delete=False) as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(f.name, self.snapshot_path)
+        except OSError as e:
+            print(f"[MCP SERVER] Could not write git commit index snapshot {self.snapshot_path}: {e}")
+
@@ -0,0 +1,319 @@
+import os
+import re
+import math
+import heapq
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional, List, Any, Dict, Tuple
+
+from memory_bank import CLIENT_ROOT, FIELD_PATTERN, ITEM_ID_PATTERN, read_text
+from prompt_templates import slugify
+from search_index import tokenize
+
+# --- Constants & Configuration ---
+# Seconds between mtime checks of `LessonsLearned/` (0 disables background refresh)
+DEFAULT_REFRESH_INTERVAL = float(os.environ.get("DEVCYCLE_LESSONS_REFRESH_INTERVAL", "10.0"))
+
+# Lessons folder under the MemoryBank root; its README.md is the global index, not a lesson
+LESSONS_DIR = "LessonsLearned"
+INDEX_FILE = "README.md"
+
+# `# Lessons Learned: Phase 3 - Business Logic` (continue-implementation, Phase 6)
+PHASE_TITLE_PATTERN = re.compile(r"^#\s+Lessons Learned\s*:\s*Phase\s+(\d+)\s*[-:–]\s*(.+?)\s*$", re.MULTILINE | re.IGNORECASE)
+BULLET_PATTERN = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(?:\[[ xX]\]\s+)?(.+?)\s*$")
+
+# Section (slug) -> ranking weight; lessons meant to change behaviour rank above narrative ones
+CATEGORY_WEIGHTS = {
+    "recommendations": 1.3,
+    "challenges-encountered": 1.2,
+    "patterns-discovered": 1.2,
+    "user-highlighted-lessons": 1.2,
+    "technical-decisions": 1.0,
+    "what-went-well": 0.8,
+    "time-analysis": 0.6,
+    "summary": 0.5,
+    "executive-summary": 0.5,
+}
+DEFAULT_CATEGORY_WEIGHT = 0.7
+
+# Boosts for lessons of the same feature and of the same kind of phase
+SAME_FEATURE_BOOST = 1.5
+SAME_PHASE_BOOST = 1.3
+TAG_BOOST = 1.2
+
+# Characters kept per lesson item, items returned per document, keywords kept per document
+ITEM_LENGTH = 240
+ITEMS_PER_DOCUMENT = 2
+KEYWORDS_PER_DOCUMENT = 8
+
+# Ranked results kept per (query, feature, phase, limit); dropped whenever the digest changes
+MAX_CACHED_RESULTS = 256
+
+# Length normalisation as in BM25
+LENGTH_K1 = 1.2
+LENGTH_B = 0.75
+
+
+class LessonItem:
+    """One lesson: a bullet, a table row or a paragraph of a lessons document section."""
+
+    __slots__ = ("document", "category", "text", "line", "terms", "length")
+
+    def __init__(self, document: "LessonDocument", category: str, text: str, line: int, terms: Dict[str, int]):
+        self.document = document
+        self.category = category
+        self.text = text
+        self.line = line
+        self.terms = terms
+        self.length = sum(terms.values())
+
+
+class LessonDocument:
+    """
+    Digest of a lessons document: feature, phase (None for feature-level
+    documents), tags, top keywords and its lesson items.
+    """
+
+    def __init__(self, path: str, mtime_ns: int, text: str):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        folder = path[len(LESSONS_DIR) + 1:].split("/", 1)[0]
+        match = ITEM_ID_PATTERN.match(folder)
+        self.feature_id = match.group(1).upper() if match else None
+        title = PHASE_TITLE_PATTERN.search(text)
+        self.phase: Optional[int] = int(title.group(1)) if title else None
+        self.phase_name = title.group(2) if title else ""
+        self.phase_terms = frozenset(tokenize(self.phase_name))
+        self.tags: List[str] = []
+        self.keywords: List[str] = []
+        self.items: List[LessonItem] = []
+        self._parse(text)
+
+    def _parse(self, text: str) -> None:
+        category = "summary"
+        paragraph: List[str] = []
+        paragraph_line = 0
+        columns: Optional[List[str]] = None
+        in_fence = False
+
+        def flush() -> None:
+            if paragraph:
+                self._add(category, " ".join(paragraph), paragraph_line)
+                paragraph.clear()
+
+        for number, line in enumerate(text.splitlines(), start=1):
+            if line.lstrip().startswith("```"):
+                in_fence = not in_fence
+                continue
+            if in_fence:
+                continue
+            stripped = line.strip()
+            if stripped.startswith("#"):
+                flush()
+                columns = None
+                if stripped.startswith("## ") or stripped.startswith("### "):
+                    category = slugify(stripped.lstrip("#").strip())
+                continue
+            field = FIELD_PATTERN.match(stripped)
+            if field and field.group(1).strip().lower() == "tags":
+                self.tags = [slugify(tag) for tag in re.split(r"[,;]", field.group(2)) if tag.strip()]
+                continue
+            if not stripped or stripped == "---" or field:
+                flush()
+                columns = None
+                continue
+            if stripped.startswith("|"):
+                flush()
+                cells = [cell.strip() for cell in stripped.strip("|").split("|")]
+                if columns is None:
+                    columns = cells
+                elif not all(set(cell) <= set("-: ") for cell in cells):
+                    self._add(category, " — ".join(cell for cell in cells if cell and cell != "-"), number)
+                continue
+            bullet = BULLET_PATTERN.match(line)
+            if bullet:
+                flush()
+                self._add(category, bullet.group(1), number)
+                continue
+            if not paragraph:
+                paragraph_line = number
+            paragraph.append(stripped)
+        flush()
+
+        counts: Counter = Counter()
+        for item in self.items:
+            counts.update(item.terms)
+        self.keywords = [term for term, _ in counts.most_common(KEYWORDS_PER_DOCUMENT)]
+
+    def _add(self, category: str, text: str, line: int) -> None:
+        terms = Counter(tokenize(text))
+        if terms:
+            compact = " ".join(text.replace("**", "").split())
+            if len(compact) > ITEM_LENGTH:
+                compact = compact[:ITEM_LENGTH - 1].rstrip() + "…"
+            self.items.append(LessonItem(self, category, compact, line, dict(terms)))
+
+    def describe(self) -> Dict[str, Any]:
+        described: Dict[str, Any] = {"path": f"{CLIENT_ROOT}/{self.path}", "feature_id": self.feature_id, "phase": self.phase}
+        if self.phase_name:
+            described["phase_name"] = self.phase_name
+        if self.tags:
+            described["tags"] = list(self.tags)
+        described["keywords"] = list(self.keywords)
+        described["lessons"] = len(self.items)
+        return described
+
+
+class LessonsDigest:
+    """
+    Compact index of `LessonsLearned/`: every lessons document is reduced to
+    its feature, phase, tags, keywords and short lesson items (bullets and
+    table rows), with an inverted index over the items. `relevant()` ranks
+    items for the feature and phase at hand, so procedures get the few lessons
+    that apply instead of the whole folder. `refresh()` reparses only files
+    whose mtime changed; with `warm=False` the first parse waits for it.
+    """
+
+    def __init__(self, root: Path, refresh_interval: float = DEFAULT_REFRESH_INTERVAL, warm: bool = True):
+        self.root = Path(root)
+        self.refresh_interval = refresh_interval
+        self.generation = 0
+        self._documents: Dict[str, LessonDocument] = {}
+        self._postings: Dict[str, List[LessonItem]] = {}
+        self._item_count = 0
+        self._total_length = 0
+        self._results: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        if warm:
+            self.refresh()
+
+    def refresh(self) -> List[str]:
+        """Reparses added or modified lessons documents and drops deleted ones; returns the changed paths."""
+        with self._refresh_lock:
+            current = self._scan()
+            changed: Dict[str, LessonDocument] = {}
+            for path, mtime_ns in current.items():
+                known = self._documents.get(path)
+                if known is None or known.mtime_ns != mtime_ns:
+                    changed[path] = LessonDocument(path, mtime_ns, read_text(self.root / path))
+            removed = [path for path in self._documents if path not in current]
+            if not changed and not removed:
+                return []
+
+            documents = {path: document for path, document in self._documents.items() if path in current}
+            documents.update(changed)
+            postings: Dict[str, List[LessonItem]] = {}
+            item_count = total_length = 0
+            for document in documents.values():
+                for item in document.items:
+                    item_count += 1
+                    total_length += item.length
+                    for term in item.terms:
+                        postings.setdefault(term, []).append(item)
+            with self._lock:
+                self._documents = documents
+                self._postings = postings
+                self._item_count = item_count
+                self._total_length = total_length
+                self._results = {}
+                self.generation += 1
+            return sorted(changed) + removed
+
+    def _scan(self) -> Dict[str, int]:
+        files: Dict[str, int] = {}
+        top = str(self.root / LESSONS_DIR)
+        for directory, subdirectories, names in os.walk(top):
+            subdirectories[:] = [name for name in subdirectories if not name.startswith(".")]
+            for name in names:
+                if not name.endswith(".md") or (name == INDEX_FILE and directory == top):
+                    continue
+                full_path = os.path.join(directory, name)
+                try:
+                    files[os.path.relpath(full_path, self.root).replace(os.sep, "/")] = os.stat(full_path).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+        return files
+
+    def relevant(self, query: str, feature_id: Optional[str] = None, phase: Optional[Tuple[int, str]] = None, limit: int = 8) -> List[Dict[str, Any]]:
+        """
+        Top `limit` lesson items for `query` (the feature's title, epic and
+        phase name), boosted for lessons of `feature_id` itself, of the same
+        phase (number or name) and with matching tags; at most
+        ITEMS_PER_DOCUMENT items per document.
+        """
+        key = (query, feature_id, phase, limit, self.generation)
+        cached = self._results.get(key)
+        if cached is not None:
+            return cached
+        terms = set(tokenize(query))
+        phase_terms = set(tokenize(phase[1])) if phase is not None else set()
+        terms |= phase_terms
+        with self._lock:
+            if not terms or not self._item_count:
+                return []
+            average_length = self._total_length / self._item_count
+            scores: Dict[LessonItem, float] = {}
+            for term in terms:
+                items = self._postings.get(term)
+                if not items:
+                    continue
+                idf = math.log(1 + (self._item_count - len(items) + 0.5) / (len(items) + 0.5))
+                for item in items:
+                    frequency = item.terms[term]
+                    norm = LENGTH_K1 * (1 - LENGTH_B + LENGTH_B * item.length / average_length)
+                    scores[item] = scores.get(item, 0.0) + idf * frequency * (LENGTH_K1 + 1) / (frequency + norm)
+            for item in scores:
+                document = item.document
+                weight = CATEGORY_WEIGHTS.get(item.category, DEFAULT_CATEGORY_WEIGHT)
+                if feature_id and document.feature_id == feature_id:
+                    weight *= SAME_FEATURE_BOOST
+                if phase is not None and (document.phase == phase[0] or phase_terms & document.phase_terms):
+                    weight *= SAME_PHASE_BOOST
+                if terms & set(document.tags):
+                    weight *= TAG_BOOST
+                scores[item] *= weight
+            ranked = heapq.nlargest(limit * ITEMS_PER_DOCUMENT, scores.items(), key=lambda pair: pair[1])
+
+        lessons: List[Dict[str, Any]] = []
+        per_document: Counter = Counter()
+        for item, score in ranked:
+            document = item.document
+            if per_document[document.path] >= ITEMS_PER_DOCUMENT:
+                continue
+            per_document[document.path] += 1
+            lesson: Dict[str, Any] = {"feature_id": document.feature_id, "phase": document.phase}
+            if document.phase_name:
+                lesson["phase_name"] = document.phase_name
+            lesson.update({
+                "category": item.category,
+                "lesson": item.text,
+                "path": f"{CLIENT_ROOT}/{document.path}",
+                "line": item.line,
+                "score": round(score, 4),
+            })
+            lessons.append(lesson)
+            if len(lessons) >= limit:
+                break
+        with self._lock:
+            if len(self._results) >= MAX_CACHED_RESULTS:
+                del self._results[next(iter(self._results))]
+            self._results[key] = lessons
+        return lessons
+
+    def documents(self, feature_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Digests of every lessons document (or of one feature's), by path."""
+        return [
+            document.describe() for path, document in sorted(self._documents.items())
+            if feature_id is None or document.feature_id == feature_id
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "documents": len(self._documents),
+            "lessons": self._item_count,
+            "terms": len(self._postings),
+            "cached_results": len(self._results),
+            "generation": self.generation,
+        }
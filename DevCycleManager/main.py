@@ -1,16 +1,119 @@
 import os
 import re
 import json
+import asyncio
+import time
+import signal
+import sqlite3
+import hashlib
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional, Union, List, Any, Dict
+from urllib.parse import parse_qs
+from typing import Optional, Union, List, Any, Dict, Callable
 
-from fastapi import FastAPI, Response, status
-from pydantic import BaseModel, Field
+from fastapi import Body, FastAPI, HTTPException, Request, Response, status
+from pydantic import BaseModel, Field, ValidationError
+
+from compression import CompressionCache, CompressionMiddleware
+from context_pack import ContextPackBuilder
+from epic_graph import DependencyGraph
+from epic_rollup import EpicRollup
+from git_commits import DEFAULT_GIT_REPO_DIR, GitCommitIndex
+from lessons_digest import LessonsDigest
+from memory_bank import DEFAULT_MEMORY_BANK_DIR, STATE_FOLDERS, FeatureIndex
+from metadata_store import DEFAULT_METADATA_DB, MetadataStore
+from metrics import EXPOSITION_CONTENT_TYPE, Sample, ServerMetrics, cache_samples
+from profiling import PROFILE_ID_HEADER, PROFILING_ENABLED, PROFILING_TOKEN, RequestProfiler
+from prompt_templates import FRAGMENTS_DIR_NAME, TEMPLATE_URI_PREFIX, PromptTemplate, PromptTemplateRegistry, Section
+from quality_gates import QualityGateValidator
+from runtime import EventLoopLagMonitor, PeriodicTask, Warmup, run_blocking
+from search_index import SearchIndex
+from tool_registry import INCLUDE_DELIVERY_MODES, SECTION_DELIVERY_MODES, CallOptions, Tool, ToolArgumentError, ToolParameter, ToolRegistry
 
 # --- Constants & Configuration ---
 # Path to the directory containing prompt/config files
 PROMPTS_DIR = Path(__file__).parent / "Prompts"
 
+# Every prompt file is loaded and compiled once at startup; modified files are hot-reloaded by mtime
+PROMPT_TEMPLATES = PromptTemplateRegistry(PROMPTS_DIR)
+
+# Reference-only sections omitted from `sectionDelivery=relevant` responses (fetched on demand)
+REFERENCE_SECTIONS = ("error-recovery", "rejection-quick-reference", "related-commands")
+
+def open_metadata_store() -> Optional[MetadataStore]:
+    """The SQLite metadata store at DEVCYCLE_METADATA_DB, or None when the store is off."""
+    if not DEFAULT_METADATA_DB:
+        return None
+    try:
+        return MetadataStore(DEFAULT_METADATA_DB, DEFAULT_MEMORY_BANK_DIR)
+    except (OSError, sqlite3.Error) as e:
+        print(f"[MCP SERVER] Metadata store disabled: {e}")
+        return None
+
+# Optional: SQLite mirror of the feature index, for warm restarts and cross-project queries
+METADATA_STORE = open_metadata_store()
+
+# Feature/epic ID -> folder index of the mounted MemoryBank, kept current by mtime polling (built by WARMUP)
+FEATURE_INDEX = FeatureIndex(DEFAULT_MEMORY_BANK_DIR, store=METADATA_STORE, warm=False)
+
+# Path arguments filled from the feature index when omitted: path parameter -> ID parameter
+INDEXED_PATH_ARGUMENTS = {"feature_path": "feature_id", "epic_path": "epic_id"}
+
+# Page size bounds for `list-features`
+DEFAULT_QUERY_LIMIT = 50
+MAX_QUERY_LIMIT = 500
+
+# BM25 full-text index over the MemoryBank Markdown (sections), restored from its snapshot by WARMUP
+SEARCH_INDEX = SearchIndex(DEFAULT_MEMORY_BANK_DIR, warm=False)
+
+# Result bounds for `search-memory-bank` and the sections suggested by `search_context` tools
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+CONTEXT_SEARCH_LIMIT = 8
+
+# Per-feature ranked context packs, cached until an index or a packed file changes
+CONTEXT_PACKS = ContextPackBuilder(DEFAULT_MEMORY_BANK_DIR, FEATURE_INDEX, SEARCH_INDEX)
+
+# Feature dependency graph analyses (per epic and portfolio-wide), cached until a member feature changes
+DEPENDENCY_GRAPH = DependencyGraph(FEATURE_INDEX)
+
+# Epic progress rollups (status counts, phase completion, hours), recomputed per changed feature
+EPIC_ROLLUP = EpicRollup(FEATURE_INDEX, DEPENDENCY_GRAPH)
+
+# Deterministic phase/task status, commit table, checkpoint and code review checks for accept-phase and complete-feature
+QUALITY_GATES = QualityGateValidator(DEFAULT_MEMORY_BANK_DIR, FEATURE_INDEX)
+
+def open_git_commit_index() -> Optional[GitCommitIndex]:
+    """The commit index of the repository mounted at DEVCYCLE_GIT_REPO_DIR, or None when commit verification is off."""
+    if not DEFAULT_GIT_REPO_DIR:
+        return None
+    try:
+        return GitCommitIndex(Path(DEFAULT_GIT_REPO_DIR), warm=False)
+    except (OSError, ValueError) as e:
+        print(f"[MCP SERVER] Commit verification disabled: {e}")
+        return None
+
+# Optional: commit graph of the mounted project repository, used to verify the Git Commits tables
+GIT_COMMITS = open_git_commit_index()
+
+# Digest of LessonsLearned/ (feature, phase, tags, keywords, lesson items) for cross-feature retrieval
+LESSONS = LessonsDigest(DEFAULT_MEMORY_BANK_DIR, warm=False)
+
+# Lesson items returned to `lessons` tools
+LESSONS_LIMIT = 8
+
+# `metadata-store` actions
+METADATA_STORE_ACTIONS = ("status", "check", "rebuild")
+
+# Default number of features returned by `next-ready-feature`
+DEFAULT_READY_LIMIT = 5
+
+# Context folders a context pack replaces (the pack lists the relevant files inside them)
+PACKED_CONTEXT_FOLDERS = ("{memory_bank}/Features/", "{memory_bank}/CodeGuidelines/", "{memory_bank}/LessonsLearned/")
+
+# Context folder a non-empty `lessons` list replaces
+LESSONS_CONTEXT_FOLDER = "{memory_bank}/LessonsLearned/"
+
 # --- Mocking the MCP Context/Sampling for the Prototype ---
 async def mock_sample_llm(prompt: str, context: Optional[str] = None) -> str:
     """
@@ -27,17 +130,233 @@ async def mock_sample_llm(prompt: str, context: Optional[str] = None) -> str:
 
 # --- Core Business Logic (The "Recipes") ---
 
-async def run_init_project() -> dict:
+async def run_procedure(tool: Tool, arguments: Dict[str, Any], options: CallOptions, outputs: Optional[List[str]] = None) -> dict:
+    """
+    The generic Recipe for procedure tools.
+    Renders the tool's template with the validated arguments (or the declared
+    defaults) and returns it with the context the Client's LLM should read first.
+    If the client already holds the template (`knownTemplateHash` matches), the
+    instructions are replaced by the placeholder bindings to apply to it.
+    With `sectionDelivery=relevant`, sections that do not apply to the arguments
+    (and reference-only sections) are omitted and listed for on-demand fetching.
+    With `includeDelivery=reference`, shared fragments stay as `{{> name}}`
+    markers and are listed as resources for the client to cache by hash.
+    Omitted feature/epic paths are resolved from the MemoryBank index,
+    `context_pack` tools list the files to read instead of whole folders,
+    `quality_gates` tools carry the server-side gate report, and `lessons`
+    tools the most relevant LessonsLearned items across features.
+    """
+    # Load the compiled procedure template
+    procedure_template = PROMPT_TEMPLATES.get(tool.template)
+    if procedure_template is None:
+        return {
+            "status": "error",
+            "message": f"{tool.template} prompt template not found in Prompts directory."
+        }
+
+    resolved_paths = resolve_indexed_paths(tool, arguments)
+    bindings = tool.placeholder_values({**arguments, **resolved_paths})
+    template_ref = {"uri": procedure_template.uri, "hash": procedure_template.hash}
+    omitted = select_omitted_sections(tool, procedure_template, arguments) if options.section_delivery == "relevant" else []
+
+    result = {
+        "status": "pending_execution",
+        "action": "execute_procedure",
+        "procedure_name": tool.name
+    }
+    if options.known_template_hash == procedure_template.hash:
+        # Client renders its cached copy: replace each {{name}} with bindings[name]
+        result["template_ref"] = {**template_ref, "status": "unchanged", "bindings": bindings}
+    else:
+        # Render placeholders with actual values in a single pass
+        render_started = time.perf_counter()
+        result["instructions"] = procedure_template.render(
+            bindings, omit=[section.id for section in omitted], inline_includes=options.include_delivery == "inline"
+        )
+        METRICS.observe_render(procedure_template.name, time.perf_counter() - render_started)
+        result["template_ref"] = {**template_ref, "status": "included"}
+        if options.include_delivery == "reference" and procedure_template.includes:
+            result["includes"] = [
+                {"name": name, "uri": fragment.uri, "hash": fragment.hash}
+                for name, fragment in ((name, PROMPT_TEMPLATES.get_fragment(name)) for name in procedure_template.includes)
+                if fragment is not None
+            ]
+    METRICS.observe_template_ref(result["template_ref"]["status"])
+    if options.section_delivery == "relevant":
+        result["sections"] = {
+            "delivery": "relevant",
+            "omitted": [section.describe() for section in omitted],
+            "fetch_tool": "get-procedure-section"
+        }
+    if resolved_paths:
+        result["resolved_paths"] = resolved_paths
+    # Building a pack stats (and may hash) files, so it runs on the I/O pool
+    context_pack = await run_blocking(CONTEXT_PACKS.build, str(arguments.get("feature_id") or "")) if tool.context_pack else None
+    graph = DEPENDENCY_GRAPH.analyze(str(arguments["epic_id"])) if tool.dependency_graph and arguments.get("epic_id") else None
+    if graph is not None:
+        result["dependency_graph"] = graph
+    if tool.quality_gates and arguments.get("feature_id"):
+        # Parses the phase files (cached by mtime), so it runs on the I/O pool too
+        if arguments.get("phase_number") is not None:
+            gates = await run_blocking(QUALITY_GATES.validate_phase, str(arguments["feature_id"]), arguments["phase_number"])
+        else:
+            gates = await run_blocking(QUALITY_GATES.validate_feature, str(arguments["feature_id"]))
+        if gates is not None:
+            result["quality_gates"] = gates
+        if gates is not None and GIT_COMMITS is not None:
+            result["commit_verification"] = await run_blocking(verify_commits, str(arguments["feature_id"]), arguments.get("phase_number"))
+    lessons = relevant_lessons(arguments) if tool.lessons else []
+    if lessons:
+        result["lessons"] = lessons
+    if context_pack is not None:
+        result["context_pack"] = context_pack
+        result["context_folders"] = [folder for folder in tool.context_folders if not folder.startswith(PACKED_CONTEXT_FOLDERS)]
+    else:
+        if tool.search_context:
+            relevant = search_item_context(arguments)
+            if relevant:
+                result["relevant_sections"] = relevant
+        # The ranked lessons stand in for reading the whole LessonsLearned folder
+        result["context_folders"] = [
+            folder for folder in tool.context_folders
+            if not (lessons and folder.startswith(LESSONS_CONTEXT_FOLDER))
+        ]
+    result["context_files"] = list(tool.context_files)
+    if outputs is not None or tool.outputs is not None:
+        result["outputs"] = list(outputs if outputs is not None else tool.outputs)
+    result["message"] = tool.message
+    return result
+
+def verify_commits(feature_id: str, phase_number: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Checks the commits of one phase's (or every phase's) Git Commits tables
+    against the mounted repository. Commits on the feature's branches count as
+    tracked if any phase of the feature lists them.
+    """
+    references = QUALITY_GATES.commit_references(feature_id, phase_number)
+    if references is None:
+        return None
+    all_references = references if phase_number is None else QUALITY_GATES.commit_references(feature_id)
+    return GIT_COMMITS.verify(FEATURE_INDEX.get(feature_id).id, references, all_references)
+
+def resolve_indexed_paths(tool: Tool, arguments: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Paths for omitted `feature_path`/`epic_path` arguments whose ID is in the
+    feature index, as `{MEMORY_BANK_PATH}/Features/<state>/<folder>/`.
+    Unknown IDs keep the parameter default (search instructions).
+    """
+    resolved = {}
+    for path_name, id_name in INDEXED_PATH_ARGUMENTS.items():
+        if arguments.get(path_name) or not tool.has_parameter(path_name):
+            continue
+        entry = FEATURE_INDEX.get(str(arguments.get(id_name) or ""))
+        if entry is not None:
+            resolved[path_name] = entry.client_path
+    return resolved
+
+def search_item_context(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    MemoryBank sections outside the feature's own folder that best match the
+    feature (ID, title and parent epic), for tools declared with `search_context`.
+    """
+    feature_id = str(arguments.get("feature_id") or "")
+    entry = FEATURE_INDEX.get(feature_id)
+    if entry is None:
+        return SEARCH_INDEX.search(feature_id, limit=CONTEXT_SEARCH_LIMIT) if feature_id else []
+    terms = [entry.id, entry.title]
+    epic = FEATURE_INDEX.get(entry.parent_epic or "")
+    if epic is not None:
+        terms.extend([epic.id, epic.title])
+    return SEARCH_INDEX.search(" ".join(terms), limit=CONTEXT_SEARCH_LIMIT, exclude_prefix=entry.path)
+
+def relevant_lessons(arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    LessonsLearned items that best match the feature (title and parent epic)
+    and its current phase, for tools declared with `lessons`.
+    """
+    entry = FEATURE_INDEX.get(str(arguments.get("feature_id") or ""))
+    if entry is None:
+        return []
+    terms = [entry.title]
+    epic = FEATURE_INDEX.get(entry.parent_epic or "")
+    if epic is not None:
+        terms.append(epic.title)
+    current = entry.current_phase
+    phase = (current.number, current.name) if current is not None else None
+    return LESSONS.relevant(" ".join(terms), feature_id=entry.id, phase=phase, limit=LESSONS_LIMIT)
+
+def select_omitted_sections(tool: Tool, template: PromptTemplate, arguments: Dict[str, Any]) -> List[Section]:
+    """
+    Sections left out of a `sectionDelivery=relevant` response: those whose
+    `omit_sections` predicate matches the arguments, plus reference-only sections.
+    """
+    omitted = []
+    for section in template.sections:
+        predicate = tool.omit_sections.get(section.id)
+        if section.id in REFERENCE_SECTIONS or (predicate is not None and predicate(arguments)):
+            omitted.append(section)
+    # Subsections of an omitted section are dropped with it; list only the outermost ones
+    return [
+        section for section in omitted
+        if not any(section.id.startswith(parent.id + "/") for parent in omitted)
+    ]
+
+async def run_get_procedure_section(tool: Tool, arguments: Dict[str, Any], options: CallOptions) -> dict:
+    """
+    The Recipe for fetching procedure sections on demand.
+    Returns the requested sections of a tool's procedure, rendered with the
+    same arguments as the original call, or the section index if none are given.
+    """
+    procedure_tool = TOOLS.get(arguments.get("procedure"))
+    procedure_template = PROMPT_TEMPLATES.get(procedure_tool.template) if procedure_tool and procedure_tool.template else None
+    if procedure_template is None:
+        return {
+            "status": "error",
+            "message": f"Unknown procedure: {arguments.get('procedure')}. Use the name of a procedure tool (e.g. continue-implementation)."
+        }
+
+    template_ref = {"uri": procedure_template.uri, "hash": procedure_template.hash}
+    section_ids = arguments.get("section_ids") or []
+    if not section_ids:
+        return {
+            "status": "success",
+            "procedure_name": procedure_tool.name,
+            "template_ref": template_ref,
+            "sections": [section.describe() for section in procedure_template.sections],
+            "message": "Section index for the procedure. Call again with `section_ids` to fetch section content."
+        }
+
+    unknown = [section_id for section_id in section_ids if section_id not in procedure_template.section_index]
+    if unknown:
+        return {
+            "status": "error",
+            "message": f"Unknown section id(s) for {procedure_tool.name}: {', '.join(unknown)}. Call without `section_ids` to list available sections."
+        }
+
+    # Placeholders only: missing arguments fall back to their defaults instead of failing validation
+    procedure_arguments = arguments.get("arguments") or {}
+    bindings = procedure_tool.placeholder_values({**procedure_arguments, **resolve_indexed_paths(procedure_tool, procedure_arguments)})
+    return {
+        "status": "success",
+        "procedure_name": procedure_tool.name,
+        "template_ref": template_ref,
+        "sections": [
+            {**procedure_template.section_index[section_id].describe(), "content": procedure_template.render_section(section_id, bindings)}
+            for section_id in section_ids
+        ],
+        "message": "Requested procedure sections, rendered with the given arguments. Apply them in the context of the procedure you are executing."
+    }
+
+async def run_init_project(tool: Tool, arguments: Dict[str, Any], options: CallOptions) -> dict:
     """
     The Recipe for initializing the project.
     It reads the required folder structure from a configuration file.
     """
-    try:
-        with open(PROMPTS_DIR / "init-project.json", "r", encoding="utf-8") as f:
-            config = json.load(f)
-            required_folders = config.get("directories", [])
-    except FileNotFoundError:
+    config_template = PROMPT_TEMPLATES.get("init-project.json")
+    if config_template is None:
         raise HTTPException(status_code=500, detail="init-project.json not found in Prompts directory.")
+    try:
+        required_folders = config_template.json().get("directories", [])
     except json.JSONDecodeError:
         raise HTTPException(status_code=500, detail="Error decoding init-project.json.")
 
@@ -57,563 +376,752 @@ async def run_init_project() -> dict:
         )
     }
 
-async def run_submit_epic(description: str, title: Optional[str] = None, external_id: Optional[str] = None) -> dict:
+async def run_deep_dive(tool: Tool, arguments: Dict[str, Any], options: CallOptions) -> dict:
     """
-    The Recipe for submitting an epic.
-    Returns the step-by-step procedure prompt for the Client's LLM to execute.
+    The Recipe for conducting a deep-dive interview about a spec file.
+    Guides the LLM through an intensive interview process to gather comprehensive
+    information about a specification, leaving no stone unturned:
+    1. Read and analyze the spec file
+    2. Identify file type (FeatureDescription, Phase, Overview, etc.)
+    3. Conduct thorough interview using AskUserQuestion tool
+    4. Probe deeply on vague answers
+    5. Read and incorporate referenced documents
+    6. Update the spec file with gathered information
     """
-    # Load the procedure template
-    try:
-        with open(PROMPTS_DIR / "submit-epic.md", "r", encoding="utf-8") as f:
-            procedure_template = f.read()
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": "submit-epic.md prompt template not found in Prompts directory."
-        }
+    return await run_procedure(tool, arguments, options, outputs=[
+        f"{arguments.get('file_path')} (updated with new sections)"
+    ])
 
-    # Replace placeholders with actual values
-    procedure = procedure_template.replace("{{description}}", description or "")
-    procedure = procedure.replace("{{title}}", title or "[Not provided - LLM should generate]")
-    procedure = procedure.replace("{{external_id}}", external_id or "[Not provided]")
+async def run_list_features(tool: Tool, arguments: Dict[str, Any], options: CallOptions) -> dict:
+    """
+    The Recipe for listing features and epics.
+    Answered from the in-memory MemoryBank index: no filesystem access and no
+    client-side folder walking. Results are paged with `offset`/`limit`.
+    Another `project`, or a `commit` filter, is answered from the metadata store.
+    """
+    offset = max(0, arguments.get("offset", 0))
+    limit = min(max(1, arguments.get("limit", DEFAULT_QUERY_LIMIT)), MAX_QUERY_LIMIT)
+    kind = arguments.get("kind")
+    if kind is not None and kind not in ("feature", "epic"):
+        return {"status": "error", "message": "kind must be one of: feature, epic"}
+    filters = {
+        "state": arguments.get("state"),
+        "status": arguments.get("status"),
+        "kind": kind,
+        "parent_epic": arguments.get("epic_id"),
+        "offset": offset,
+        "limit": limit,
+    }
 
+    project = arguments.get("project")
+    if project or arguments.get("commit"):
+        if METADATA_STORE is None:
+            return {"status": "error", "message": "project and commit filters need the metadata store: set DEVCYCLE_METADATA_DB."}
+        entries, total = await run_blocking(METADATA_STORE.query, project=project, commit=arguments.get("commit"), **filters)
+        projects = {described["project"]: described for described in await run_blocking(METADATA_STORE.projects)}
+        state_counts = projects.get(project or METADATA_STORE.project, {}).get("state_counts", {})
+    else:
+        entries, total = FEATURE_INDEX.query(**filters)
+        state_counts = FEATURE_INDEX.counts()
+    next_offset = offset + len(entries)
     return {
-        "status": "pending_execution",
-        "action": "execute_procedure",
-        "procedure_name": "submit-epic",
-        "instructions": procedure,
-        "context_folders": [
-            "{memory_bank}/Overview/",
-            "{memory_bank}/Architecture/",
-            "{memory_bank}/Features/00_EPICS/",
-            "{memory_bank}/Features/"
-        ],
-        "context_files": [
-            "CLAUDE.md",
-            "{memory_bank}/Features/00_EPICS/NEXT_EPIC_ID.txt"
-        ],
-        "message": "Execute the submit-epic procedure. IMPORTANT: Start with Step 0 to read the project context before generating the epic description."
+        "status": "success",
+        "items": [entry.describe() for entry in entries],
+        "total": total,
+        "offset": offset,
+        "next_offset": next_offset if next_offset < total else None,
+        "state_counts": state_counts,
+        "index_generation": FEATURE_INDEX.generation,
+        "message": f"{total} matching item(s); showing {len(entries)} from offset {offset}."
     }
 
-async def run_submit_feature(description: str, title: Optional[str] = None, external_id: Optional[str] = None, epic_id: Optional[str] = None) -> dict:
+async def run_feature_status(tool: Tool, arguments: Dict[str, Any], options: CallOptions) -> dict:
     """
-    The Recipe for submitting a feature.
-    Returns the step-by-step procedure prompt for the Client's LLM to execute.
+    The Recipe for a single feature's (or epic's) state, phases and task statuses,
+    answered from the in-memory MemoryBank index (or, for another `project`,
+    from the metadata store).
     """
-    # Load the procedure template
-    try:
-        with open(PROMPTS_DIR / "submit-feature.md", "r", encoding="utf-8") as f:
-            procedure_template = f.read()
-    except FileNotFoundError:
+    project = arguments.get("project")
+    if project and METADATA_STORE is None:
+        return {"status": "error", "message": "The project filter needs the metadata store: set DEVCYCLE_METADATA_DB."}
+    if project and project != METADATA_STORE.project:
+        entry = await run_blocking(METADATA_STORE.get, arguments["feature_id"], project)
+    else:
+        entry = FEATURE_INDEX.get(arguments["feature_id"])
+    if entry is None:
         return {
             "status": "error",
-            "message": "submit-feature.md prompt template not found in Prompts directory."
+            "message": f"{arguments['feature_id']} not found in the MemoryBank index ({', '.join(STATE_FOLDERS)})."
         }
-
-    # Replace placeholders with actual values
-    procedure = procedure_template.replace("{{description}}", description or "")
-    procedure = procedure.replace("{{title}}", title or "[Not provided - LLM should generate]")
-    procedure = procedure.replace("{{external_id}}", external_id or "[Not provided]")
-    procedure = procedure.replace("{{epic_id}}", epic_id or "[Not provided - standalone feature]")
-
     return {
-        "status": "pending_execution",
-        "action": "execute_procedure",
-        "procedure_name": "submit-feature",
-        "instructions": procedure,
-        "context_folders": [
-            "{memory_bank}/Overview/",
-            "{memory_bank}/Architecture/",
-            "{memory_bank}/CodeGuidelines/",
-            "{memory_bank}/Features/",
-            "{memory_bank}/Features/00_EPICS/"
-        ],
-        "context_files": [
-            "CLAUDE.md",
-            "{memory_bank}/Features/NEXT_FEATURE_ID.txt"
-        ],
-        "message": "Execute the submit-feature procedure. IMPORTANT: Start with Step 0 to read the project context before generating the feature description."
+        "status": "success",
+        "item": entry.detail(include_tasks=arguments.get("include_tasks", True)),
+        "index_generation": FEATURE_INDEX.generation,
+        "message": f"{entry.id} is in {entry.state}."
     }
 
-async def run_create_epic_features(epic_id: str, epic_path: Optional[str] = None) -> dict:
+async def run_search_memory_bank(tool: Tool, arguments: Dict[str, Any], options: CallOptions) -> dict:
     """
-    The Recipe for batch-creating all features defined in an epic.
-    Creates features from the epic's Features Breakdown table (TBD entries).
+    The Recipe for full-text search over the MemoryBank.
+    Ranks document sections with BM25 from the in-memory index and returns
+    paths, section ids and line numbers, so the client reads only those.
     """
-    # Load the procedure template
-    try:
-        with open(PROMPTS_DIR / "create-epic-features.md", "r", encoding="utf-8") as f:
-            procedure_template = f.read()
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": "create-epic-features.md prompt template not found in Prompts directory."
-        }
-
-    # Replace placeholders with actual values
-    procedure = procedure_template.replace("{{epic_id}}", epic_id or "")
-    procedure = procedure.replace("{{epic_path}}", epic_path or "[Not provided - search in {MEMORY_BANK_PATH}/Features/00_EPICS/ as defined in CLAUDE.md]")
-
+    limit = min(max(1, arguments.get("limit", DEFAULT_SEARCH_LIMIT)), MAX_SEARCH_LIMIT)
+    folder = (arguments.get("folder") or "").strip("/")
+    results = SEARCH_INDEX.search(arguments["query"], limit=limit, path_prefix=folder + "/" if folder else None)
     return {
-        "status": "pending_execution",
-        "action": "execute_procedure",
-        "procedure_name": "create-epic-features",
-        "instructions": procedure,
-        "context_folders": [
-            "{memory_bank}/Features/00_EPICS/",
-            "{memory_bank}/Features/01_SUBMITTED/",
-            "{memory_bank}/Overview/",
-            "{memory_bank}/Architecture/"
-        ],
-        "context_files": [
-            "CLAUDE.md",
-            "{memory_bank}/Features/NEXT_FEATURE_ID.txt"
-        ],
-        "message": "Execute the create-epic-features procedure. This will batch-create all TBD features from the epic's Features Breakdown table. User confirmation is required before creating."
+        "status": "success",
+        "query": arguments["query"],
+        "results": results,
+        "index": SEARCH_INDEX.stats(),
+        "message": f"{len(results)} matching section(s). Read the listed sections (path + line) instead of whole folders."
     }
 
-async def run_link_feature_to_epic(feature_id: str, epic_id: str, feature_path: Optional[str] = None, epic_path: Optional[str] = None) -> dict:
+async def run_epic_dependency_graph(tool: Tool, arguments: Dict[str, Any], options: CallOptions) -> dict:
     """
-    The Recipe for linking an existing feature to an epic.
-    Updates both the feature and epic documents to establish the relationship.
+    The Recipe for dependency analysis of an epic (or of every feature).
+    Topological order, critical path, cycles and ready/blocked features are
+    computed from the MemoryBank index and cached until a member changes.
     """
-    # Load the procedure template
-    try:
-        with open(PROMPTS_DIR / "link-feature-to-epic.md", "r", encoding="utf-8") as f:
-            procedure_template = f.read()
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": "link-feature-to-epic.md prompt template not found in Prompts directory."
-        }
-
-    # Replace placeholders with actual values
-    procedure = procedure_template.replace("{{feature_id}}", feature_id or "")
-    procedure = procedure.replace("{{epic_id}}", epic_id or "")
-    procedure = procedure.replace("{{feature_path}}", feature_path or "[Not provided - search in all feature folders]")
-    procedure = procedure.replace("{{epic_path}}", epic_path or "[Not provided - search in {MEMORY_BANK_PATH}/Features/00_EPICS/ as defined in CLAUDE.md]")
-
+    epic_id = arguments.get("epic_id")
+    graph = DEPENDENCY_GRAPH.analyze(epic_id)
+    if graph is None:
+        return {"status": "error", "message": f"Epic {epic_id} not found in the MemoryBank index."}
     return {
-        "status": "pending_execution",
-        "action": "execute_procedure",
-        "procedure_name": "link-feature-to-epic",
-        "instructions": procedure,
-        "context_folders": [
-            "{memory_bank}/Features/00_EPICS/",
-            "{memory_bank}/Features/01_SUBMITTED/",
-            "{memory_bank}/Features/02_READY_TO_DEVELOP/",
-            "{memory_bank}/Features/03_IN_PROGRESS/",
-            "{memory_bank}/Features/04_COMPLETED/"
-        ],
-        "context_files": [
-            "CLAUDE.md"
-        ],
-        "message": "Execute the link-feature-to-epic procedure. This links an existing feature to an epic, updating both documents to maintain the relationship."
+        "status": "success",
+        "graph": graph,
+        "index_generation": FEATURE_INDEX.generation,
+        "message": (
+            f"{len(graph['order'])} feature(s) in dependency order, {len(graph['ready'])} ready, "
+            f"{len(graph['blocked'])} blocked, {len(graph['cycles'])} cycle(s)."
+        )
     }
 
-async def run_design_feature(feature_id: str, feature_path: Optional[str] = None) -> dict:
+async def run_next_ready_feature(tool: Tool, arguments: Dict[str, Any], options: CallOptions) -> dict:
     """
-    The Recipe for designing a feature.
-    Returns a comprehensive 3-phase procedure that creates:
-    1. UX-research-report.md
-    2. Wireframes-design.md
-    3. design-summary.md
+    The Recipe for "what should be started next": features whose dependencies
+    are all completed, refined features and higher breakdown priority first.
     """
-    # Load the procedure template
-    try:
-        with open(PROMPTS_DIR / "design-feature.md", "r", encoding="utf-8") as f:
-            procedure_template = f.read()
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": "design-feature.md prompt template not found in Prompts directory."
-        }
-
-    # Replace placeholders with actual values
-    procedure = procedure_template.replace("{{feature_id}}", feature_id or "")
-    procedure = procedure.replace("{{feature_path}}", feature_path or "[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]")
-
+    epic_id = arguments.get("epic_id")
+    graph = DEPENDENCY_GRAPH.analyze(epic_id)
+    if graph is None:
+        return {"status": "error", "message": f"Epic {epic_id} not found in the MemoryBank index."}
+    limit = max(1, arguments.get("limit", DEFAULT_READY_LIMIT))
+    ready = [FEATURE_INDEX.get(item_id) for item_id in graph["ready"][:limit]]
     return {
-        "status": "pending_execution",
-        "action": "execute_procedure",
-        "procedure_name": "design-feature",
-        "instructions": procedure,
-        "context_folders": [
-            "{memory_bank}/Overview/",
-            "{memory_bank}/Architecture/",
-            "{memory_bank}/CodeGuidelines/",
-            "{memory_bank}/Features/01_SUBMITTED/",
-            "{memory_bank}/Features/02_READY_TO_DEVELOP/"
-        ],
-        "context_files": [
-            "CLAUDE.md"
-        ],
-        "outputs": [
-            "UX-research-report.md",
-            "Wireframes-design.md",
-            "design-summary.md"
-        ],
-        "message": "Execute the design-feature procedure. This is a 3-PHASE process: (1) UX Research, (2) Wireframes, (3) Design Summary. Complete each phase before moving to the next."
+        "status": "success",
+        "scope": graph["scope"],
+        "ready": [entry.describe() for entry in ready if entry is not None],
+        "ready_total": len(graph["ready"]),
+        "in_progress": graph["in_progress"],
+        "critical_path": graph["critical_path"],
+        "message": (
+            f"Next ready feature: {graph['ready'][0]}." if graph["ready"]
+            else "No feature is ready to start: every open feature is in progress or waiting on a dependency."
+        )
     }
 
-async def run_refine_feature(feature_id: str, feature_path: Optional[str] = None) -> dict:
+async def run_epic_status_update(tool: Tool, arguments: Dict[str, Any], options: CallOptions) -> dict:
     """
-    The Recipe for refining a feature into implementable tasks.
-    Transforms a feature from 01_SUBMITTED to 02_READY_TO_DEVELOP by:
-    1. Analyzing all feature-folder documents plus linked epic/dependency context
-    2. Creating phased implementation plan
-    3. Breaking down into independent tasks with unit tests
-    4. Adding checkpoints with quality gates
+    The Recipe for syncing an epic with its features' states.
+    The epic (from `epic_id` or the feature's Parent Epic) is rolled up
+    server-side: status counts, progress bar, phase completion, time totals
+    and the Progress Summary/diagram Markdown, so the LLM only writes them.
     """
-    # Load the procedure template
-    try:
-        with open(PROMPTS_DIR / "refine-feature.md", "r", encoding="utf-8") as f:
-            procedure_template = f.read()
-    except FileNotFoundError:
+    feature = FEATURE_INDEX.get(arguments["feature_id"])
+    epic_id = arguments.get("epic_id") or (feature.parent_epic if feature is not None else None)
+    if not epic_id:
         return {
-            "status": "error",
-            "message": "refine-feature.md prompt template not found in Prompts directory."
+            "status": "success",
+            "skipped": True,
+            "message": f"{arguments['feature_id']} has no Parent Epic in the MemoryBank index: no epic to update."
         }
+    rollup = EPIC_ROLLUP.rollup(epic_id)
+    if rollup is None:
+        return {"status": "success", "skipped": True, "message": f"Epic {epic_id} not found in the MemoryBank index: nothing to update."}
+    if FEATURE_INDEX.get(epic_id).status == "CANCELLED":
+        return {"status": "success", "skipped": True, "message": f"Epic {epic_id} is CANCELLED: its status is not updated."}
 
-    # Replace placeholders with actual values
-    procedure = procedure_template.replace("{{feature_id}}", feature_id or "")
-    procedure = procedure.replace("{{feature_path}}", feature_path or "[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]")
+    result = await run_procedure(tool, {**arguments, "epic_id": rollup["epic_id"]}, options)
+    if result["status"] == "pending_execution":
+        result["rollup"] = rollup
+    return result
 
+async def run_verify_commits(tool: Tool, arguments: Dict[str, Any], options: CallOptions) -> dict:
+    """
+    The Recipe for checking commit tracking against the mounted repository:
+    every hash in the phase files' Git Commits tables must resolve to a commit,
+    and commits on the feature's branches should appear in those tables.
+    """
+    if GIT_COMMITS is None:
+        return {"status": "error", "message": "Commit verification is disabled: set DEVCYCLE_GIT_REPO_DIR to the mounted project repository."}
+    verification = await run_blocking(verify_commits, arguments["feature_id"], arguments.get("phase_number"))
+    if verification is None:
+        return {"status": "error", "message": f"{arguments['feature_id']} not found in the MemoryBank index."}
     return {
-        "status": "pending_execution",
-        "action": "execute_procedure",
-        "procedure_name": "refine-feature",
-        "instructions": procedure,
-        "context_folders": [
-            "{memory_bank}/Overview/",
-            "{memory_bank}/Architecture/",
-            "{memory_bank}/CodeGuidelines/",
-            "{memory_bank}/Features/00_EPICS/",
-            "{memory_bank}/Features/01_SUBMITTED/",
-            "{memory_bank}/Features/02_READY_TO_DEVELOP/",
-            "{memory_bank}/Features/03_IN_PROGRESS/",
-            "{memory_bank}/Features/04_COMPLETED/"
-        ],
-        "context_files": [
-            "CLAUDE.md"
-        ],
-        "outputs": [
-            "FeatureTasks.md",
-            "Phases/phase-0-health-check.md",
-            "Phases/phase-1-planning-analysis.md",
-            "Phases/phase-2-data-layer.md",
-            "Phases/phase-3-business-logic.md",
-            "Phases/phase-4-presentation-logic.md",
-            "Phases/phase-5-user-interface.md",
-            "Phases/phase-6-integration.md",
-            "Phases/phase-7-testing-polish.md",
-            "Phases/phase-8-final-checkpoint.md"
-        ],
-        "message": "Execute the refine-feature procedure. Read the full feature folder plus any linked epic/dependency context, then create a phased implementation plan with tasks, unit tests, and quality checkpoints. The feature will be moved to 02_READY_TO_DEVELOP when complete."
+        "status": "success",
+        "verification": verification,
+        "message": (
+            f"{len(verification['verified'])} tracked commit(s) verified, {len(verification['missing'])} missing or unresolved, "
+            f"{len(verification['untracked'])} commit(s) on the feature branch not tracked in any phase."
+        )
     }
 
-async def run_start_feature(feature_id: str, feature_path: Optional[str] = None, workflow_mode: Optional[str] = None) -> dict:
+async def run_metadata_store(tool: Tool, arguments: Dict[str, Any], options: CallOptions) -> dict:
     """
-    The Recipe for starting a feature (moving to IN_PROGRESS).
-    Validates the feature and transitions from 02_READY_TO_DEVELOP to 03_IN_PROGRESS:
-    1. Pre-validation (consistency, completeness, ambiguity detection)
-    2. Post-validation (time tracking, checkpoints, auto-fix)
-    3. Git branch creation (if connected)
-    4. Move to 03_IN_PROGRESS
-    5. Git commit and push (if connected)
-    6. Optionally hand off to autonomous end-to-end implementation workflow
+    The Recipe for maintaining the SQLite metadata store: `status` lists the
+    projects in the file, `check` compares the stored rows with the index, and
+    `rebuild` reparses the MemoryBank and rewrites this project's rows.
     """
-    # Load the procedure template
-    try:
-        with open(PROMPTS_DIR / "start-feature.md", "r", encoding="utf-8") as f:
-            procedure_template = f.read()
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": "start-feature.md prompt template not found in Prompts directory."
-        }
+    if METADATA_STORE is None:
+        return {"status": "error", "message": "The metadata store is disabled: set DEVCYCLE_METADATA_DB to a SQLite file path."}
+    action = arguments.get("action") or "status"
+    if action not in METADATA_STORE_ACTIONS:
+        return {"status": "error", "message": f"action must be one of: {', '.join(METADATA_STORE_ACTIONS)}"}
 
-    # Replace placeholders with actual values
-    procedure = procedure_template.replace("{{feature_id}}", feature_id or "")
-    procedure = procedure.replace("{{feature_path}}", feature_path or "[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]")
-    procedure = procedure.replace("{{workflow_mode}}", workflow_mode or "[Not provided - interactive default]")
+    result: Dict[str, Any] = {"status": "success", "action": action}
+    if action == "rebuild" and not REFRESH_IN_PROCESS:
+        # Pre-fork worker: the parent owns the store; SIGHUP makes it rebuild and re-fork the workers
+        os.kill(os.getppid(), signal.SIGHUP)
+        result["store"] = METADATA_STORE.stats()
+        result["message"] = "Rebuild requested from the pre-fork parent; workers are re-forked once it is done. Run action=check afterwards."
+        return result
+    if action == "rebuild":
+        # Reparses every item folder, so it runs on the I/O pool like the background refresh
+        await run_blocking(FEATURE_INDEX.reload)
+    if action in ("check", "rebuild"):
+        result["check"] = await run_blocking(METADATA_STORE.check, {entry.id: entry for entry in FEATURE_INDEX.entries()})
+    result["store"] = METADATA_STORE.stats()
+    result["projects"] = await run_blocking(METADATA_STORE.projects)
+    if "check" in result:
+        check = result["check"]
+        result["message"] = (
+            f"Store is consistent with the index ({check['items']['store']} items)." if check["consistent"]
+            else f"Store differs from the index: {len(check['missing'])} missing, {len(check['extra'])} extra, "
+                 f"{len(check['stale'])} stale item(s); integrity {', '.join(check['integrity'])}. Run action=rebuild to rewrite it."
+        )
+    else:
+        result["message"] = f"{len(result['projects'])} project(s) in {METADATA_STORE.db_path}."
+    return result
 
-    return {
-        "status": "pending_execution",
-        "action": "execute_procedure",
-        "procedure_name": "start-feature",
-        "instructions": procedure,
-        "context_folders": [
-            "{memory_bank}/Overview/",
-            "{memory_bank}/Architecture/",
-            "{memory_bank}/CodeGuidelines/",
-            "{memory_bank}/Features/00_EPICS/",
-            "{memory_bank}/Features/02_READY_TO_DEVELOP/"
-        ],
-        "context_files": [
-            "CLAUDE.md"
-        ],
-        "outputs": [
-            "pre-validation-report-[STATUS]-[timestamp].md",
-            "start-feature-report-[timestamp].md"
-        ],
-        "message": "Execute the start-feature procedure. This validates the feature (pre-validation + post-validation), creates a git branch, and moves the feature to 03_IN_PROGRESS. If `workflow_mode=autonomous`, immediately hand off into end-to-end implementation using the same workflow mode. If pre-validation fails, the process STOPS with a rejection report."
-    }
+# --- Tool Registry ---
+# Each tool is declared once: schema, template, defaults and context hints.
+# `tools/list` is generated from these declarations and `tools/call` dispatches by name.
+TOOLS = ToolRegistry()
 
-async def run_continue_implementation(feature_id: str, feature_path: Optional[str] = None, mode: Optional[str] = None, workflow_mode: Optional[str] = None) -> dict:
-    """
-    The Recipe for continuing feature implementation.
-    Orchestrates the systematic implementation of an IN_PROGRESS feature:
-    1. Discovers current state (feature, phase, task)
-    2. Creates/refines the canonical Phase 1 planning document using feature, epic, and dependency context
-    3. Executes tasks following specifications
-    4. Manages quality (build, tests, code-review)
-    5. Tracks progress (update phase files, FeatureTasks.md)
-    6. Hands off phase acceptance (interactive or autonomous workflow)
-    7. Creates LessonsLearned documents per phase
-    """
-    # Load the procedure template
-    try:
-        with open(PROMPTS_DIR / "continue-implementation.md", "r", encoding="utf-8") as f:
-            procedure_template = f.read()
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": "continue-implementation.md prompt template not found in Prompts directory."
-        }
+TOOLS.register(Tool(
+    name="init-project",
+    description="Initialize the memory bank folder structure (path configured in CLAUDE.md).",
+    handler=run_init_project
+))
 
-    # Replace placeholders with actual values
-    procedure = procedure_template.replace("{{feature_id}}", feature_id or "")
-    procedure = procedure.replace("{{feature_path}}", feature_path or "[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]")
-    procedure = procedure.replace("{{mode}}", mode or "[Not provided - default auto-detect]")
-    procedure = procedure.replace("{{workflow_mode}}", workflow_mode or "[Not provided - interactive default]")
+# The Recipe for submitting an epic.
+# Returns the step-by-step procedure prompt for the Client's LLM to execute.
+TOOLS.register(Tool(
+    name="submit-epic",
+    description="Submit a new epic (large body of work containing multiple features). Returns a step-by-step procedure that creates an epic in 00_EPICS with EpicDescription.md. Use deep-dive afterward to refine details.",
+    template="submit-epic.md",
+    parameters=[
+        ToolParameter("description", "string", "The epic description from the user - what strategic goal or major capability is being built", required=True),
+        ToolParameter("title", "string", "Optional: A title for the epic. If not provided, LLM will generate one.", default="[Not provided - LLM should generate]"),
+        ToolParameter("external_id", "string", "Optional: External reference ID (e.g., initiative ID, roadmap item)", default="[Not provided]"),
+    ],
+    context_folders=[
+        "{memory_bank}/Overview/",
+        "{memory_bank}/Architecture/",
+        "{memory_bank}/Features/00_EPICS/",
+        "{memory_bank}/Features/"
+    ],
+    context_files=[
+        "CLAUDE.md",
+        "{memory_bank}/Features/00_EPICS/NEXT_EPIC_ID.txt"
+    ],
+    message="Execute the submit-epic procedure. IMPORTANT: Start with Step 0 to read the project context before generating the epic description."
+))
 
-    return {
-        "status": "pending_execution",
-        "action": "execute_procedure",
-        "procedure_name": "continue-implementation",
-        "instructions": procedure,
-        "context_folders": [
-            "{memory_bank}/Overview/",
-            "{memory_bank}/Architecture/",
-            "{memory_bank}/CodeGuidelines/",
-            "{memory_bank}/Features/00_EPICS/",
-            "{memory_bank}/Features/01_SUBMITTED/",
-            "{memory_bank}/Features/02_READY_TO_DEVELOP/",
-            "{memory_bank}/Features/03_IN_PROGRESS/",
-            "{memory_bank}/Features/04_COMPLETED/",
-            "{memory_bank}/LessonsLearned/"
-        ],
-        "context_files": [
-            "CLAUDE.md"
-        ],
-        "outputs": [
-            "Phase updates in Phases/*.md",
-            "FeatureTasks.md updates",
-            "planning-analysis-report.md (canonical Phase 1 planning artifact)",
-            "code-reviews/phase-{N}/*.md",
-            "LessonsLearned/{feature_id}/Phase-{N}-{name}.md",
-            "feature-completion-report.md (when all phases complete)"
-        ],
-        "message": "Execute the continue-implementation procedure locally. FIRST write operation when entering a PENDING phase: set phase status IN_PROGRESS in BOTH phase file and FeatureTasks.md before any task work. During Phase 1, create or refresh the canonical feature-root planning document `planning-analysis-report.md` using the full feature history plus any linked epic/dependency context; later phases must read and reuse it instead of re-planning. Understand what is already done, what remains, and what downstream phases/features depend on before writing code or tests. Keep all statuses synchronized (task: PENDING->IN_PROGRESS->COMPLETED/SKIPPED, checkpoint: NOT STARTED->IN_PROGRESS->COMPLETE). Optional `mode`: finalize_current_phase. Optional `workflow_mode`: autonomous for end-to-end no-prompt progression."
-    }
+# The Recipe for submitting a feature.
+# Returns the step-by-step procedure prompt for the Client's LLM to execute.
+TOOLS.register(Tool(
+    name="submit-feature",
+    description="Submit a new feature idea. Returns a step-by-step procedure for the LLM to execute.",
+    template="submit-feature.md",
+    parameters=[
+        ToolParameter("description", "string", "The feature description from the user", required=True),
+        ToolParameter("title", "string", "Optional: A title for the feature. If not provided, LLM will generate one.", default="[Not provided - LLM should generate]"),
+        ToolParameter("external_id", "string", "Optional: External reference ID (e.g., ticket number, user story ID)", default="[Not provided]"),
+        ToolParameter("epic_id", "string", "Optional: Parent epic ID (e.g., EPIC-001) to link this feature to an epic", default="[Not provided - standalone feature]"),
+    ],
+    context_folders=[
+        "{memory_bank}/Overview/",
+        "{memory_bank}/Architecture/",
+        "{memory_bank}/CodeGuidelines/",
+        "{memory_bank}/Features/",
+        "{memory_bank}/Features/00_EPICS/"
+    ],
+    context_files=[
+        "CLAUDE.md",
+        "{memory_bank}/Features/NEXT_FEATURE_ID.txt"
+    ],
+    message="Execute the submit-feature procedure. IMPORTANT: Start with Step 0 to read the project context before generating the feature description."
+))
 
-async def run_accept_phase(feature_id: str, phase_number: int, feature_path: Optional[str] = None, workflow_mode: Optional[str] = None) -> dict:
-    """
-    The Recipe for accepting a completed phase.
-    Formalizes phase acceptance after all quality gates pass:
-    1. Validates checkpoint was filled
-    2. Validates phase is awaiting acceptance
-    3. Validates technical requirements (build, tests, code review)
-    4. Handles incomplete tasks (with user justification)
-    5. Marks phase as COMPLETED in all files
-    6. Updates time tracking with actual vs estimated
-    7. Creates git commit with achievements
-    8. Previews next phase (and optionally auto-continues in autonomous workflow mode)
-    """
-    # Load the procedure template
-    try:
-        with open(PROMPTS_DIR / "accept-phase.md", "r", encoding="utf-8") as f:
-            procedure_template = f.read()
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": "accept-phase.md prompt template not found in Prompts directory."
-        }
+# The Recipe for batch-creating all features defined in an epic.
+# Creates features from the epic's Features Breakdown table (TBD entries).
+TOOLS.register(Tool(
+    name="create-epic-features",
+    description="Batch-create all features defined in an epic's Features Breakdown table. Creates features with TBD IDs and updates the epic with actual FEAT-XXX IDs. Requires user confirmation.",
+    template="create-epic-features.md",
+    parameters=[
+        ToolParameter("epic_id", "string", "The epic ID (e.g., EPIC-001) containing the features to create", required=True),
+        ToolParameter("epic_path", "string", "Optional: Direct path to the epic folder if known", default="[Not provided - search in {MEMORY_BANK_PATH}/Features/00_EPICS/ as defined in CLAUDE.md]"),
+    ],
+    context_folders=[
+        "{memory_bank}/Features/00_EPICS/",
+        "{memory_bank}/Features/01_SUBMITTED/",
+        "{memory_bank}/Overview/",
+        "{memory_bank}/Architecture/"
+    ],
+    context_files=[
+        "CLAUDE.md",
+        "{memory_bank}/Features/NEXT_FEATURE_ID.txt"
+    ],
+    dependency_graph=True,
+    message="Execute the create-epic-features procedure. This will batch-create all TBD features from the epic's Features Breakdown table. User confirmation is required before creating."
+))
 
-    # Replace placeholders with actual values
-    procedure = procedure_template.replace("{{feature_id}}", feature_id or "")
-    procedure = procedure.replace("{{phase_number}}", str(phase_number) if phase_number is not None else "")
-    procedure = procedure.replace("{{feature_path}}", feature_path or "[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]")
-    procedure = procedure.replace("{{workflow_mode}}", workflow_mode or "[Not provided - interactive default]")
+# The Recipe for linking an existing feature to an epic.
+# Updates both the feature and epic documents to establish the relationship.
+TOOLS.register(Tool(
+    name="link-feature-to-epic",
+    description="Link an existing feature to an epic. Updates both the feature's Parent Epic field and the epic's Features Breakdown, Progress Tracking, and Dependency Diagram.",
+    template="link-feature-to-epic.md",
+    parameters=[
+        ToolParameter("feature_id", "string", "The feature ID (e.g., FEAT-001) to link", required=True),
+        ToolParameter("epic_id", "string", "The epic ID (e.g., EPIC-001) to link the feature to", required=True),
+        ToolParameter("feature_path", "string", "Optional: Direct path to the feature folder if known", default="[Not provided - search in all feature folders]"),
+        ToolParameter("epic_path", "string", "Optional: Direct path to the epic folder if known", default="[Not provided - search in {MEMORY_BANK_PATH}/Features/00_EPICS/ as defined in CLAUDE.md]"),
+    ],
+    context_folders=[
+        "{memory_bank}/Features/00_EPICS/",
+        "{memory_bank}/Features/01_SUBMITTED/",
+        "{memory_bank}/Features/02_READY_TO_DEVELOP/",
+        "{memory_bank}/Features/03_IN_PROGRESS/",
+        "{memory_bank}/Features/04_COMPLETED/"
+    ],
+    context_files=[
+        "CLAUDE.md"
+    ],
+    dependency_graph=True,
+    message="Execute the link-feature-to-epic procedure. This links an existing feature to an epic, updating both documents to maintain the relationship."
+))
 
-    return {
-        "status": "pending_execution",
-        "action": "execute_procedure",
-        "procedure_name": "accept-phase",
-        "instructions": procedure,
-        "context_folders": [
-            "{memory_bank}/Features/00_EPICS/",
-            "{memory_bank}/Features/03_IN_PROGRESS/",
-            "{memory_bank}/LessonsLearned/"
-        ],
-        "context_files": [
-            "CLAUDE.md"
-        ],
-        "outputs": [
-            "Phase file updated to COMPLETED",
-            "FeatureTasks.md updated with COMPLETED status and actual times",
-            "start-feature-report-*.md updated",
-            "Checkpoint section marked Complete",
-            "Git commit with phase achievements",
-            "Next phase preview (if not final phase)",
-            "feature-completion-report.md (if final phase)"
-        ],
-        "message": "Execute the accept-phase procedure. This formalizes phase acceptance, updates all documentation with COMPLETED status and time metrics, creates git commit, and previews the next step. In `workflow_mode=autonomous`, continue automatically to the next phase or feature completion unless a blocking condition requires manual intervention."
-    }
+# The Recipe for designing a feature.
+# Returns a comprehensive 3-phase procedure that creates:
+# 1. UX-research-report.md
+# 2. Wireframes-design.md
+# 3. design-summary.md
+TOOLS.register(Tool(
+    name="design-feature",
+    description="Design a feature with UX research, wireframes, and design summary. Returns a 3-phase procedure that creates UX-research-report.md, Wireframes-design.md, and design-summary.md.",
+    template="design-feature.md",
+    parameters=[
+        ToolParameter("feature_id", "string", "The feature ID (e.g., FEAT-001) to design", required=True),
+        ToolParameter("feature_path", "string", "Optional: Direct path to the feature folder if known", default="[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]"),
+    ],
+    context_folders=[
+        "{memory_bank}/Overview/",
+        "{memory_bank}/Architecture/",
+        "{memory_bank}/CodeGuidelines/",
+        "{memory_bank}/Features/01_SUBMITTED/",
+        "{memory_bank}/Features/02_READY_TO_DEVELOP/"
+    ],
+    context_files=[
+        "CLAUDE.md"
+    ],
+    outputs=[
+        "UX-research-report.md",
+        "Wireframes-design.md",
+        "design-summary.md"
+    ],
+    context_pack=True,
+    message="Execute the design-feature procedure. This is a 3-PHASE process: (1) UX Research, (2) Wireframes, (3) Design Summary. Complete each phase before moving to the next."
+))
 
-async def run_code_review(feature_id: str, phase_number: int, feature_path: Optional[str] = None) -> dict:
-    """
-    The Recipe for performing a comprehensive code review.
-    Reviews all code changes in a phase against project CodeGuidelines:
-    1. Determines if review is required (skip for non-code phases)
-    2. Extracts phase context (commits, changed files)
-    3. Reviews each file against CodeGuidelines
-    4. Validates test quality (meaningful assertions, coverage)
-    5. Generates detailed report with actionable feedback
-    6. Updates phase checkpoint with review results
-    """
-    # Load the procedure template
-    try:
-        with open(PROMPTS_DIR / "code-review.md", "r", encoding="utf-8") as f:
-            procedure_template = f.read()
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": "code-review.md prompt template not found in Prompts directory."
-        }
+# The Recipe for refining a feature into implementable tasks.
+# Transforms a feature from 01_SUBMITTED to 02_READY_TO_DEVELOP by:
+# 1. Analyzing all feature-folder documents plus linked epic/dependency context
+# 2. Creating phased implementation plan
+# 3. Breaking down into independent tasks with unit tests
+# 4. Adding checkpoints with quality gates
+TOOLS.register(Tool(
+    name="refine-feature",
+    description="Refine a feature into implementable tasks using the full feature folder plus linked epic/dependency context. Creates a phased implementation plan with tasks, unit tests, and quality checkpoints, then moves the feature from 01_SUBMITTED to 02_READY_TO_DEVELOP.",
+    template="refine-feature.md",
+    parameters=[
+        ToolParameter("feature_id", "string", "The feature ID (e.g., FEAT-001) to refine", required=True),
+        ToolParameter("feature_path", "string", "Optional: Direct path to the feature folder if known", default="[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]"),
+    ],
+    context_folders=[
+        "{memory_bank}/Overview/",
+        "{memory_bank}/Architecture/",
+        "{memory_bank}/CodeGuidelines/",
+        "{memory_bank}/Features/00_EPICS/",
+        "{memory_bank}/Features/01_SUBMITTED/",
+        "{memory_bank}/Features/02_READY_TO_DEVELOP/",
+        "{memory_bank}/Features/03_IN_PROGRESS/",
+        "{memory_bank}/Features/04_COMPLETED/"
+    ],
+    context_files=[
+        "CLAUDE.md"
+    ],
+    outputs=[
+        "FeatureTasks.md",
+        "Phases/phase-0-health-check.md",
+        "Phases/phase-1-planning-analysis.md",
+        "Phases/phase-2-data-layer.md",
+        "Phases/phase-3-business-logic.md",
+        "Phases/phase-4-presentation-logic.md",
+        "Phases/phase-5-user-interface.md",
+        "Phases/phase-6-integration.md",
+        "Phases/phase-7-testing-polish.md",
+        "Phases/phase-8-final-checkpoint.md"
+    ],
+    search_context=True,
+    context_pack=True,
+    lessons=True,
+    message="Execute the refine-feature procedure. Read the full feature folder plus any linked epic/dependency context, then create a phased implementation plan with tasks, unit tests, and quality checkpoints. The feature will be moved to 02_READY_TO_DEVELOP when complete."
+))
 
-    # Replace placeholders with actual values
-    procedure = procedure_template.replace("{{feature_id}}", feature_id or "")
-    procedure = procedure.replace("{{phase_number}}", str(phase_number) if phase_number is not None else "")
-    procedure = procedure.replace("{{feature_path}}", feature_path or "[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]")
+# The Recipe for starting a feature (moving to IN_PROGRESS).
+# Validates the feature and transitions from 02_READY_TO_DEVELOP to 03_IN_PROGRESS:
+# 1. Pre-validation (consistency, completeness, ambiguity detection)
+# 2. Post-validation (time tracking, checkpoints, auto-fix)
+# 3. Git branch creation (if connected)
+# 4. Move to 03_IN_PROGRESS
+# 5. Git commit and push (if connected)
+# 6. Optionally hand off to autonomous end-to-end implementation workflow
+TOOLS.register(Tool(
+    name="start-feature",
+    description="Start implementing a feature. Validates (pre + post), creates git branch, and moves from 02_READY_TO_DEVELOP to 03_IN_PROGRESS. Optionally launches autonomous end-to-end workflow when `workflow_mode` is set. Rejects if documentation is incomplete or ambiguous.",
+    template="start-feature.md",
+    parameters=[
+        ToolParameter("feature_id", "string", "The feature ID (e.g., FEAT-001) to start", required=True),
+        ToolParameter("feature_path", "string", "Optional: Direct path to the feature folder if known", default="[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]"),
+        ToolParameter("workflow_mode", "string", "Optional: set to 'autonomous' to continue from start-feature through all phases to completion without routine user interaction", default="[Not provided - interactive default]"),
+    ],
+    context_folders=[
+        "{memory_bank}/Overview/",
+        "{memory_bank}/Architecture/",
+        "{memory_bank}/CodeGuidelines/",
+        "{memory_bank}/Features/00_EPICS/",
+        "{memory_bank}/Features/02_READY_TO_DEVELOP/"
+    ],
+    context_files=[
+        "CLAUDE.md"
+    ],
+    outputs=[
+        "pre-validation-report-[STATUS]-[timestamp].md",
+        "start-feature-report-[timestamp].md"
+    ],
+    omit_sections={
+        "phase-8-generate-success-report/8-1-autonomous-handoff": lambda args: args.get("workflow_mode") != "autonomous"
+    },
+    context_pack=True,
+    message="Execute the start-feature procedure. This validates the feature (pre-validation + post-validation), creates a git branch, and moves the feature to 03_IN_PROGRESS. If `workflow_mode=autonomous`, immediately hand off into end-to-end implementation using the same workflow mode. If pre-validation fails, the process STOPS with a rejection report."
+))
 
-    return {
-        "status": "pending_execution",
-        "action": "execute_procedure",
-        "procedure_name": "code-review",
-        "instructions": procedure,
-        "context_folders": [
-            "{memory_bank}/CodeGuidelines/",
-            "{memory_bank}/Architecture/",
-            "{memory_bank}/LessonsLearned/",
-            "{memory_bank}/Features/03_IN_PROGRESS/"
-        ],
-        "context_files": [
-            "CLAUDE.md"
-        ],
-        "outputs": [
-            "code-reviews/phase-{N}/Code-Review-{timestamp}-{STATUS}.md",
-            "Phase checkpoint updated with review results"
-        ],
-        "message": "Execute the code-review procedure locally. `pending_execution` is expected and means the MCP call succeeded with a recipe to run. Do not retry the same code-review MCP call unless a procedure step explicitly requires it."
-    }
+# The Recipe for continuing feature implementation.
+# Orchestrates the systematic implementation of an IN_PROGRESS feature:
+# 1. Discovers current state (feature, phase, task)
+# 2. Creates/refines the canonical Phase 1 planning document using feature, epic, and dependency context
+# 3. Executes tasks following specifications
+# 4. Manages quality (build, tests, code-review)
+# 5. Tracks progress (update phase files, FeatureTasks.md)
+# 6. Hands off phase acceptance (interactive or autonomous workflow)
+# 7. Creates LessonsLearned documents per phase
+TOOLS.register(Tool(
+    name="continue-implementation",
+    description="Continue implementing an IN_PROGRESS feature. Phase 1 creates or refreshes the canonical `planning-analysis-report.md` using feature, epic, and dependency context; later phases must read and reuse it instead of re-planning. Also orchestrates task execution, quality gates (build/test/review), downstream-aware test coverage, phase completion, and LessonsLearned documents. With `workflow_mode=autonomous`, it continues through code review, phase acceptance, next phases, and final completion without routine user interaction.",
+    template="continue-implementation.md",
+    parameters=[
+        ToolParameter("feature_id", "string", "The feature ID (e.g., FEAT-001) to continue implementing", required=True),
+        ToolParameter("feature_path", "string", "Optional: Direct path to the feature folder if known", default="[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]"),
+        ToolParameter("mode", "string", "Optional: set to 'finalize_current_phase' to force validation + phase-finalization reconciliation when tasks are done but statuses are not synchronized", default="[Not provided - default auto-detect]"),
+        ToolParameter("workflow_mode", "string", "Optional: set to 'autonomous' to continue through review, acceptance, next phases, and feature completion without routine user prompts", default="[Not provided - interactive default]"),
+    ],
+    context_folders=[
+        "{memory_bank}/Overview/",
+        "{memory_bank}/Architecture/",
+        "{memory_bank}/CodeGuidelines/",
+        "{memory_bank}/Features/00_EPICS/",
+        "{memory_bank}/Features/01_SUBMITTED/",
+        "{memory_bank}/Features/02_READY_TO_DEVELOP/",
+        "{memory_bank}/Features/03_IN_PROGRESS/",
+        "{memory_bank}/Features/04_COMPLETED/",
+        "{memory_bank}/LessonsLearned/"
+    ],
+    context_files=[
+        "CLAUDE.md"
+    ],
+    outputs=[
+        "Phase updates in Phases/*.md",
+        "FeatureTasks.md updates",
+        "planning-analysis-report.md (canonical Phase 1 planning artifact)",
+        "code-reviews/phase-{N}/*.md",
+        "LessonsLearned/{feature_id}/Phase-{N}-{name}.md",
+        "feature-completion-report.md (when all phases complete)"
+    ],
+    omit_sections={
+        "phase-3-special-handling-phase-1-planning-analysis": lambda args: args.get("mode") == "finalize_current_phase",
+        "phase-4-task-execution-loop": lambda args: args.get("mode") == "finalize_current_phase",
+        "phase-7-acceptance-handoff/if-workflow-mode-is-interactive-or-not-provided": lambda args: args.get("workflow_mode") == "autonomous",
+        "phase-7-acceptance-handoff/if-workflow-mode-autonomous": lambda args: args.get("workflow_mode") != "autonomous"
+    },
+    search_context=True,
+    context_pack=True,
+    lessons=True,
+    message="Execute the continue-implementation procedure locally. FIRST write operation when entering a PENDING phase: set phase status IN_PROGRESS in BOTH phase file and FeatureTasks.md before any task work. During Phase 1, create or refresh the canonical feature-root planning document `planning-analysis-report.md` using the full feature history plus any linked epic/dependency context; later phases must read and reuse it instead of re-planning. Understand what is already done, what remains, and what downstream phases/features depend on before writing code or tests. Keep all statuses synchronized (task: PENDING->IN_PROGRESS->COMPLETED/SKIPPED, checkpoint: NOT STARTED->IN_PROGRESS->COMPLETE). Optional `mode`: finalize_current_phase. Optional `workflow_mode`: autonomous for end-to-end no-prompt progression."
+))
 
-async def run_complete_feature(feature_id: str, feature_path: Optional[str] = None, workflow_mode: Optional[str] = None) -> dict:
-    """
-    The Recipe for completing a feature.
-    Validates all requirements and moves feature to COMPLETED state:
-    1. Validates all phases are COMPLETED (or SKIPPED with justification)
-    2. Verifies git repository is clean (no uncommitted/unpushed changes)
-    3. Verifies build and tests pass (0 errors, 0 warnings, 100% tests)
-    4. Compiles Lessons Learned from all phases into feature-level document
-    5. Asks user for additional lessons they want to highlight (or skips the prompt in autonomous workflow mode)
-    6. Updates all documentation with completion status
-    7. Creates completion reports (validation, metrics, lessons learned)
-    8. Moves feature to 04_COMPLETED folder
-    9. Creates completion git commit and pushes
-    """
-    # Load the procedure template
-    try:
-        with open(PROMPTS_DIR / "complete-feature.md", "r", encoding="utf-8") as f:
-            procedure_template = f.read()
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": "complete-feature.md prompt template not found in Prompts directory."
-        }
+# The Recipe for accepting a completed phase.
+# Formalizes phase acceptance after all quality gates pass:
+# 1. Validates checkpoint was filled
+# 2. Validates phase is awaiting acceptance
+# 3. Validates technical requirements (build, tests, code review)
+# 4. Handles incomplete tasks (with user justification)
+# 5. Marks phase as COMPLETED in all files
+# 6. Updates time tracking with actual vs estimated
+# 7. Creates git commit with achievements
+# 8. Previews next phase (and optionally auto-continues in autonomous workflow mode)
+TOOLS.register(Tool(
+    name="accept-phase",
+    description="Accept a completed phase. Validates requirements, marks phase as COMPLETED in all files (phase file, FeatureTasks.md, start-feature-report), updates time tracking, creates git commit, and previews next phase. With `workflow_mode=autonomous`, it continues automatically to the next phase or feature completion when safe.",
+    template="accept-phase.md",
+    parameters=[
+        ToolParameter("feature_id", "string", "The feature ID (e.g., FEAT-001)", required=True),
+        ToolParameter("phase_number", "integer", "The phase number to accept (e.g., 1, 2, 3)", required=True),
+        ToolParameter("feature_path", "string", "Optional: Direct path to the feature folder if known", default="[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]"),
+        ToolParameter("workflow_mode", "string", "Optional: set to 'autonomous' to continue the end-to-end workflow after acceptance without routine user prompts", default="[Not provided - interactive default]"),
+    ],
+    context_folders=[
+        "{memory_bank}/Features/00_EPICS/",
+        "{memory_bank}/Features/03_IN_PROGRESS/",
+        "{memory_bank}/LessonsLearned/"
+    ],
+    context_files=[
+        "CLAUDE.md"
+    ],
+    outputs=[
+        "Phase file updated to COMPLETED",
+        "FeatureTasks.md updated with COMPLETED status and actual times",
+        "start-feature-report-*.md updated",
+        "Checkpoint section marked Complete",
+        "Git commit with phase achievements",
+        "Next phase preview (if not final phase)",
+        "feature-completion-report.md (if final phase)"
+    ],
+    context_pack=True,
+    quality_gates=True,
+    message="Execute the accept-phase procedure. This formalizes phase acceptance, updates all documentation with COMPLETED status and time metrics, creates git commit, and previews the next step. In `workflow_mode=autonomous`, continue automatically to the next phase or feature completion unless a blocking condition requires manual intervention."
+))
 
-    # Replace placeholders with actual values
-    procedure = procedure_template.replace("{{feature_id}}", feature_id or "")
-    procedure = procedure.replace("{{feature_path}}", feature_path or "[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]")
-    procedure = procedure.replace("{{workflow_mode}}", workflow_mode or "[Not provided - interactive default]")
+# The Recipe for performing a comprehensive code review.
+# Reviews all code changes in a phase against project CodeGuidelines:
+# 1. Determines if review is required (skip for non-code phases)
+# 2. Extracts phase context (commits, changed files)
+# 3. Reviews each file against CodeGuidelines
+# 4. Validates test quality (meaningful assertions, coverage)
+# 5. Generates detailed report with actionable feedback
+# 6. Updates phase checkpoint with review results
+TOOLS.register(Tool(
+    name="code-review",
+    description="Perform comprehensive code review of a phase. Reviews all changed files against CodeGuidelines, validates test quality, generates detailed report with APPROVED/APPROVED_WITH_NOTES/NEEDS_CHANGES status, and updates phase checkpoint.",
+    template="code-review.md",
+    parameters=[
+        ToolParameter("feature_id", "string", "The feature ID (e.g., FEAT-001)", required=True),
+        ToolParameter("phase_number", "integer", "The phase number to review (e.g., 2, 3, 4)", required=True),
+        ToolParameter("feature_path", "string", "Optional: Direct path to the feature folder if known", default="[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]"),
+    ],
+    context_folders=[
+        "{memory_bank}/CodeGuidelines/",
+        "{memory_bank}/Architecture/",
+        "{memory_bank}/LessonsLearned/",
+        "{memory_bank}/Features/03_IN_PROGRESS/"
+    ],
+    context_files=[
+        "CLAUDE.md"
+    ],
+    outputs=[
+        "code-reviews/phase-{N}/Code-Review-{timestamp}-{STATUS}.md",
+        "Phase checkpoint updated with review results"
+    ],
+    context_pack=True,
+    message="Execute the code-review procedure locally. `pending_execution` is expected and means the MCP call succeeded with a recipe to run. Do not retry the same code-review MCP call unless a procedure step explicitly requires it."
+))
 
-    return {
-        "status": "pending_execution",
-        "action": "execute_procedure",
-        "procedure_name": "complete-feature",
-        "instructions": procedure,
-        "context_folders": [
-            "{memory_bank}/Features/03_IN_PROGRESS/",
-            "{memory_bank}/LessonsLearned/"
-        ],
-        "context_files": [
-            "CLAUDE.md"
-        ],
-        "outputs": [
-            "feature-completion-report.md",
-            "{memory_bank}/LessonsLearned/{feature_id}/Feature-Completion-LessonsLearned.md",
-            "FeatureTasks.md updated with completion status",
-            "Feature folder moved to 04_COMPLETED/",
-            "Git commit with completion details"
-        ],
-        "message": "Execute the complete-feature procedure. This validates all phases are complete, compiles Lessons Learned, creates completion reports, and moves the feature to 04_COMPLETED. In `workflow_mode=autonomous`, use auto-detected lessons only instead of pausing for extra user input. Running this command is confirmation to proceed (no extra yes/no gate)."
-    }
+# The Recipe for completing a feature.
+# Validates all requirements and moves feature to COMPLETED state:
+# 1. Validates all phases are COMPLETED (or SKIPPED with justification)
+# 2. Verifies git repository is clean (no uncommitted/unpushed changes)
+# 3. Verifies build and tests pass (0 errors, 0 warnings, 100% tests)
+# 4. Compiles Lessons Learned from all phases into feature-level document
+# 5. Asks user for additional lessons they want to highlight (or skips the prompt in autonomous workflow mode)
+# 6. Updates all documentation with completion status
+# 7. Creates completion reports (validation, metrics, lessons learned)
+# 8. Moves feature to 04_COMPLETED folder
+# 9. Creates completion git commit and pushes
+TOOLS.register(Tool(
+    name="complete-feature",
+    description="Complete a feature and move to COMPLETED state. Validates all phases done, compiles Lessons Learned, creates completion reports, and moves feature to 04_COMPLETED. With `workflow_mode=autonomous`, it skips the extra lessons prompt and uses auto-detected lessons only. Invocation is treated as confirmation to proceed.",
+    template="complete-feature.md",
+    parameters=[
+        ToolParameter("feature_id", "string", "The feature ID (e.g., FEAT-001) to complete", required=True),
+        ToolParameter("feature_path", "string", "Optional: Direct path to the feature folder if known", default="[Not provided - search in {MEMORY_BANK_PATH}/Features/ as defined in CLAUDE.md]"),
+        ToolParameter("workflow_mode", "string", "Optional: set to 'autonomous' to finalize without pausing for extra lessons-learned input", default="[Not provided - interactive default]"),
+    ],
+    context_folders=[
+        "{memory_bank}/Features/03_IN_PROGRESS/",
+        "{memory_bank}/LessonsLearned/"
+    ],
+    context_files=[
+        "CLAUDE.md"
+    ],
+    outputs=[
+        "feature-completion-report.md",
+        "{memory_bank}/LessonsLearned/{feature_id}/Feature-Completion-LessonsLearned.md",
+        "FeatureTasks.md updated with completion status",
+        "Feature folder moved to 04_COMPLETED/",
+        "Git commit with completion details"
+    ],
+    context_pack=True,
+    quality_gates=True,
+    message="Execute the complete-feature procedure. This validates all phases are complete, compiles Lessons Learned, creates completion reports, and moves the feature to 04_COMPLETED. In `workflow_mode=autonomous`, use auto-detected lessons only instead of pausing for extra user input. Running this command is confirmation to proceed (no extra yes/no gate)."
+))
 
-async def run_deep_dive(file_path: str) -> dict:
-    """
-    The Recipe for conducting a deep-dive interview about a spec file.
-    Guides the LLM through an intensive interview process to gather comprehensive
-    information about a specification, leaving no stone unturned:
-    1. Read and analyze the spec file
-    2. Identify file type (FeatureDescription, Phase, Overview, etc.)
-    3. Conduct thorough interview using AskUserQuestion tool
-    4. Probe deeply on vague answers
-    5. Read and incorporate referenced documents
-    6. Update the spec file with gathered information
-    """
-    # Load the procedure template
-    try:
-        with open(PROMPTS_DIR / "deep-dive.md", "r", encoding="utf-8") as f:
-            procedure_template = f.read()
-    except FileNotFoundError:
-        return {
-            "status": "error",
-            "message": "deep-dive.md prompt template not found in Prompts directory."
-        }
+TOOLS.register(Tool(
+    name="deep-dive",
+    description="Conduct an intensive interview about a spec file. Reads the file, interviews the user using AskUserQuestion tool to gather comprehensive details on technical implementation, UX, constraints, tradeoffs, and edge cases. Probes deeply until all ambiguity is resolved. Updates the spec file with gathered information.",
+    template="deep-dive.md",
+    parameters=[
+        ToolParameter("file_path", "string", "The path to the spec file to deep-dive into (e.g., {memory_bank}/Features/01_SUBMITTED/FEAT-001-feature-name/FeatureDescription.md)", required=True),
+    ],
+    context_folders=[
+        "{memory_bank}/Overview/",
+        "{memory_bank}/Architecture/",
+        "{memory_bank}/CodeGuidelines/",
+        "{memory_bank}/Features/"
+    ],
+    context_files=[
+        "CLAUDE.md"
+    ],
+    handler=run_deep_dive,
+    message="Execute the deep-dive procedure. This conducts an intensive interview about the spec file using AskUserQuestion, probing for comprehensive details on technical implementation, UX, constraints, and tradeoffs. The spec file will be updated with all gathered information."
+))
 
-    # Replace placeholders with actual values
-    procedure = procedure_template.replace("{{file_path}}", file_path or "")
+TOOLS.register(Tool(
+    name="get-procedure-section",
+    description="Fetch sections of a procedure on demand. Use after a tool call made with `sectionDelivery=relevant` to retrieve an omitted section (listed in `sections.omitted`), or call without `section_ids` to list every section of a procedure.",
+    parameters=[
+        ToolParameter("procedure", "string", "The procedure tool name (e.g., continue-implementation)", required=True),
+        ToolParameter("section_ids", "array", "Optional: Section ids to fetch (e.g., error-recovery). Omit to list all sections.", items={"type": "string"}),
+        ToolParameter("arguments", "object", "Optional: The arguments of the original procedure call, used to fill placeholders in the sections")
+    ],
+    handler=run_get_procedure_section
+))
 
-    return {
-        "status": "pending_execution",
-        "action": "execute_procedure",
-        "procedure_name": "deep-dive",
-        "instructions": procedure,
-        "context_folders": [
-            "{memory_bank}/Overview/",
-            "{memory_bank}/Architecture/",
-            "{memory_bank}/CodeGuidelines/",
-            "{memory_bank}/Features/"
-        ],
-        "context_files": [
-            "CLAUDE.md"
-        ],
-        "outputs": [
-            f"{file_path} (updated with new sections)"
-        ],
-        "message": "Execute the deep-dive procedure. This conducts an intensive interview about the spec file using AskUserQuestion, probing for comprehensive details on technical implementation, UX, constraints, and tradeoffs. The spec file will be updated with all gathered information."
-    }
+TOOLS.register(Tool(
+    name="list-features",
+    description="List features and epics from the server's MemoryBank index, with their state folder, status, parent epic and current phase. Filter by state, status, kind or epic; page with offset/limit. Use instead of reading the Features folders.",
+    parameters=[
+        ToolParameter("state", "string", "Optional: State folder to list (e.g., 03_IN_PROGRESS or IN_PROGRESS)"),
+        ToolParameter("status", "string", "Optional: Document status to match (e.g., READY_TO_DEVELOP)"),
+        ToolParameter("kind", "string", "Optional: 'feature' or 'epic'"),
+        ToolParameter("epic_id", "string", "Optional: Only features whose Parent Epic is this epic (e.g., EPIC-001)"),
+        ToolParameter("commit", "string", "Optional: Only items whose Git Commits tables reference this commit hash or prefix (requires the metadata store)"),
+        ToolParameter("project", "string", "Optional: List another project's items from the shared metadata store (requires the metadata store)"),
+        ToolParameter("offset", "integer", "Optional: Number of matches to skip (default 0)"),
+        ToolParameter("limit", "integer", f"Optional: Page size (default {DEFAULT_QUERY_LIMIT}, max {MAX_QUERY_LIMIT})"),
+    ],
+    handler=run_list_features
+))
+
+TOOLS.register(Tool(
+    name="search-memory-bank",
+    description="Full-text search (BM25) over the MemoryBank Markdown: Overview, Architecture, CodeGuidelines, Features and LessonsLearned. Returns the best-matching document sections with path and line, so you can read those instead of whole context folders.",
+    parameters=[
+        ToolParameter("query", "string", "Search terms (e.g., 'authentication token refresh', 'FEAT-123')", required=True),
+        ToolParameter("folder", "string", "Optional: Restrict to a MemoryBank sub-folder (e.g., CodeGuidelines or Features/04_COMPLETED)"),
+        ToolParameter("limit", "integer", f"Optional: Number of sections to return (default {DEFAULT_SEARCH_LIMIT}, max {MAX_SEARCH_LIMIT})"),
+    ],
+    handler=run_search_memory_bank,
+    indexes=["search"]
+))
+
+TOOLS.register(Tool(
+    name="epic-dependency-graph",
+    description="Server-computed feature dependency graph for an epic (or all features): topological order, critical path (longest chain of unfinished features with remaining estimated hours), dependency cycles, and ready/blocked features. Built from Features Breakdown tables and feature Dependencies sections.",
+    parameters=[
+        ToolParameter("epic_id", "string", "Optional: The epic ID (e.g., EPIC-001). Omit to analyze every feature."),
+    ],
+    handler=run_epic_dependency_graph
+))
+
+TOOLS.register(Tool(
+    name="epic-status-update",
+    description="Sync an epic's Features Breakdown, Progress Tracking, Progress Summary, Dependency Flow Diagram and status after a linked feature changes state. Feature counts per state, phase completion and time-tracking totals are computed server-side and returned as `rollup` with ready-to-paste Markdown.",
+    template="epic-status-update.md",
+    parameters=[
+        ToolParameter("feature_id", "string", "The feature ID (e.g., FEAT-001) whose state changed", required=True),
+        ToolParameter("epic_id", "string", "Optional: The epic ID (defaults to the feature's Parent Epic)"),
+        ToolParameter("epic_path", "string", "Optional: Direct path to the epic folder if known", default="[Not provided - search in {MEMORY_BANK_PATH}/Features/00_EPICS/ as defined in CLAUDE.md]"),
+    ],
+    context_files=[
+        "CLAUDE.md"
+    ],
+    handler=run_epic_status_update,
+    message="Execute the epic-status-update procedure. Write the precomputed rollup into the epic's EpicDescription.md; do not recount features from their folders."
+))
+
+TOOLS.register(Tool(
+    name="next-ready-feature",
+    description="Return the feature(s) that can be started next: not yet started, with all dependencies completed and not in a cycle. Refined (02_READY_TO_DEVELOP) and higher-priority features come first.",
+    parameters=[
+        ToolParameter("epic_id", "string", "Optional: Restrict to one epic's features (e.g., EPIC-001)"),
+        ToolParameter("limit", "integer", f"Optional: Number of features to return (default {DEFAULT_READY_LIMIT})"),
+    ],
+    handler=run_next_ready_feature
+))
+
+TOOLS.register(Tool(
+    name="verify-commits",
+    description="Verify a feature's commit tracking against the server-mounted git repository (requires DEVCYCLE_GIT_REPO_DIR): every hash in the phase files' Git Commits tables must resolve to a commit, with the branches containing it; commits on the feature's branches missing from every table are listed as untracked.",
+    parameters=[
+        ToolParameter("feature_id", "string", "The feature ID (e.g., FEAT-001)", required=True),
+        ToolParameter("phase_number", "integer", "Optional: Only verify the references of this phase (untracked commits are still checked against every phase)"),
+    ],
+    handler=run_verify_commits,
+    indexes=["git"]
+))
+
+TOOLS.register(Tool(
+    name="feature-status",
+    description="Get the state folder, status, phases and task statuses of a feature (or epic) from the server's MemoryBank index, without reading FeatureTasks.md or phase files.",
+    parameters=[
+        ToolParameter("feature_id", "string", "The feature or epic ID (e.g., FEAT-123)", required=True),
+        ToolParameter("include_tasks", "boolean", "Optional: Include per-task statuses for each phase (default true)"),
+        ToolParameter("project", "string", "Optional: Read the item from another project in the shared metadata store (requires the metadata store)"),
+    ],
+    handler=run_feature_status
+))
+
+TOOLS.register(Tool(
+    name="metadata-store",
+    description="Inspect or repair the server's SQLite metadata store (requires DEVCYCLE_METADATA_DB): list the projects it holds, check it against the MemoryBank index, or rebuild it from the Markdown.",
+    parameters=[
+        ToolParameter("action", "string", "Optional: 'status' (default), 'check' or 'rebuild'"),
+    ],
+    handler=run_metadata_store
+))
 
 # --- JSON-RPC Pydantic Models ---
 class JsonRpcRequest(BaseModel):
@@ -628,8 +1136,185 @@ class JsonRpcResponse(BaseModel):
     result: Optional[Any] = None
     error: Optional[Any] = None
 
+# --- Background Maintenance ---
+# Request handlers only read in-memory state; filesystem refreshes run on the bounded I/O pool
+EVENT_LOOP_LAG = EventLoopLagMonitor()
+
+# First index builds, run after the server starts listening (a tool waits only for the indexes it reads, see Tool.indexes)
+WARMUP = Warmup()
+# Cheapest first: the (slowest) full-text index should not hold up calls that only read the others
+WARMUP.add("features", FEATURE_INDEX.warm_up)
+WARMUP.add("lessons", LESSONS.refresh)
+if GIT_COMMITS is not None:
+    WARMUP.add("git", GIT_COMMITS.warm_up)
+WARMUP.add("search", SEARCH_INDEX.warm_up)
+
+def recovers(step: str) -> Callable[[Any], None]:
+    """on_result callback of a refresh task: its successful run clears a failed warm-up step."""
+    return lambda result: WARMUP.recovered(step)
+
+TEMPLATE_RELOADER = PeriodicTask(PROMPT_TEMPLATES.refresh, PROMPT_TEMPLATES.reload_interval)
+FEATURE_INDEXER = PeriodicTask(FEATURE_INDEX.refresh, FEATURE_INDEX.refresh_interval, on_result=recovers("features"))
+SEARCH_INDEXER = PeriodicTask(SEARCH_INDEX.refresh, SEARCH_INDEX.refresh_interval, on_result=recovers("search"))
+LESSONS_INDEXER = PeriodicTask(LESSONS.refresh, LESSONS.refresh_interval, on_result=recovers("lessons"))
+GIT_INDEXER = PeriodicTask(GIT_COMMITS.refresh, GIT_COMMITS.refresh_interval, on_result=recovers("git")) if GIT_COMMITS is not None else None
+# Refreshes of compiled state (prompt templates): in pre-fork mode a change re-forks the workers at once
+RELOAD_TASKS = [TEMPLATE_RELOADER]
+# Incremental index refreshes: in pre-fork mode changes are rolled out to the workers at most every few seconds
+INDEX_REFRESH_TASKS = [task for task in (FEATURE_INDEXER, SEARCH_INDEXER, LESSONS_INDEXER, GIT_INDEXER) if task is not None]
+REFRESH_TASKS = RELOAD_TASKS + INDEX_REFRESH_TASKS
+
+# Cleared in pre-fork workers (serve.py): the parent runs REFRESH_TASKS, as the only writer of the store and snapshots
+REFRESH_IN_PROCESS = True
+
+def start_refresh_tasks() -> None:
+    for task in REFRESH_TASKS:
+        task.start()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    EVENT_LOOP_LAG.start()
+    if REFRESH_IN_PROCESS:
+        # Polling starts once the first builds are done, so it never races them
+        WARMUP.on_ready.append(start_refresh_tasks)
+    WARMUP.start()
+    yield
+    await WARMUP.stop()
+    for task in reversed(REFRESH_TASKS):
+        await task.stop()
+    await EVENT_LOOP_LAG.stop()
+
+# --- Metrics ---
+# JSON-RPC methods reported under their own label (anything else is `unknown`)
+RPC_METHODS = ("initialize", "tools/list", "tools/call", "resources/list", "resources/read")
+
+# Per-method/tool latency, payload size and error counts, exported at /metrics
+METRICS = ServerMetrics(RPC_METHODS, TOOLS.names())
+
+# --- Profiling ---
+def open_profiler() -> Optional[RequestProfiler]:
+    """The request profiler when DEVCYCLE_PROFILING=1, or None; never enabled without DEVCYCLE_PROFILING_TOKEN."""
+    if not PROFILING_ENABLED:
+        return None
+    if not PROFILING_TOKEN:
+        print("[MCP SERVER] Profiling disabled: DEVCYCLE_PROFILING=1 requires DEVCYCLE_PROFILING_TOKEN")
+        return None
+    return RequestProfiler()
+
+# Opt-in per-call CPU and allocation profiles, served at /debug/profiles (None unless DEVCYCLE_PROFILING=1 with a token)
+PROFILER = open_profiler()
+
+# Formats of GET /debug/profiles/{id}: folded CPU stacks, folded allocation stacks, JSON summary
+PROFILE_FORMATS = ("folded", "allocations", "json")
+
+class ProfilingSettings(BaseModel):
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = Field(None, ge=0.0, le=1.0)
+
 # --- FastAPI App ---
-app = FastAPI(title="DevCycleManager (Remote Process)")
+app = FastAPI(title="DevCycleManager (Remote Process)", lifespan=lifespan)
+
+# Procedure payloads are large, repetitive Markdown: compress them on the JSON-RPC endpoint
+COMPRESSION_CACHE = CompressionCache()
+app.add_middleware(CompressionMiddleware, cache=COMPRESSION_CACHE, on_response=METRICS.observe_compression)
+
+@app.get("/health")
+async def health_handler():
+    """Liveness probe with event-loop lag statistics (stalls indicate blocking calls on the loop)."""
+    return {
+        "status": "ok",
+        "pid": os.getpid(),
+        "templates_loaded": len(PROMPT_TEMPLATES.names()),
+        "templates_bundled": PROMPT_TEMPLATES.bundled,
+        "features_indexed": len(FEATURE_INDEX),
+        "search_index": SEARCH_INDEX.stats(),
+        "context_packs": CONTEXT_PACKS.stats(),
+        "dependency_graph": DEPENDENCY_GRAPH.stats(),
+        "quality_gates": QUALITY_GATES.stats(),
+        "git_commits": GIT_COMMITS.stats() if GIT_COMMITS is not None else None,
+        "epic_rollup": EPIC_ROLLUP.stats(),
+        "metadata_store": METADATA_STORE.stats() if METADATA_STORE is not None else None,
+        "lessons": LESSONS.stats(),
+        "profiling": PROFILER.stats() if PROFILER is not None else None,
+        "warmup": WARMUP.snapshot(),
+        "event_loop_lag": EVENT_LOOP_LAG.snapshot()
+    }
+
+@app.get("/ready")
+async def ready_handler(response: Response):
+    """Readiness probe: 503 until every index is built, so traffic is routed only to warm instances."""
+    warmup = WARMUP.snapshot()
+    if not warmup["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"status": "ready" if warmup["ready"] else "warming", **warmup}
+
+def component_samples() -> List[Sample]:
+    """Gauges and counters read from the indexes and caches at scrape time."""
+    lag = EVENT_LOOP_LAG.snapshot()
+    samples = cache_samples({
+        "context_packs": CONTEXT_PACKS.stats(),
+        "dependency_graph": DEPENDENCY_GRAPH.stats(),
+        "epic_rollup": EPIC_ROLLUP.stats(),
+        "compression": {"hits": COMPRESSION_CACHE.hits, "misses": COMPRESSION_CACHE.misses},
+    })
+    samples.extend([
+        ("devcycle_compression_bytes_total", "Bytes passed through the compression cache, before (in) and after (out).", "counter",
+         {("in",): COMPRESSION_CACHE.bytes_in, ("out",): COMPRESSION_CACHE.bytes_out}, ("direction",)),
+        ("devcycle_features_indexed", "MemoryBank items per state folder.", "gauge",
+         {(state,): count for state, count in FEATURE_INDEX.counts().items()}, ("state",)),
+        ("devcycle_index_generation", "Change generation of the MemoryBank indexes.", "gauge",
+         {("features",): FEATURE_INDEX.generation, ("search",): SEARCH_INDEX.generation, ("lessons",): LESSONS.generation}, ("index",)),
+        ("devcycle_templates_loaded", "Procedure templates compiled in memory.", "gauge", {(): len(PROMPT_TEMPLATES.names())}, ()),
+        ("devcycle_event_loop_lag_seconds", "Event-loop wake-up lag (last, max and mean probe).", "gauge",
+         {(key,): lag[f"{key}_lag_ms"] / 1000 for key in ("last", "max", "mean")}, ("stat",)),
+        ("devcycle_event_loop_stalls_total", "Lag probes above the stall threshold.", "counter", {(): lag["stalls"]}, ()),
+    ])
+    return samples
+
+METRICS.collectors.append(component_samples)
+
+@app.get("/metrics")
+async def metrics_handler():
+    """Prometheus text exposition of request metrics and component gauges."""
+    return Response(content=METRICS.exposition(), media_type=EXPOSITION_CONTENT_TYPE)
+
+def require_profiler(http_request: Request) -> RequestProfiler:
+    """The profiler, or 404 when profiling is off and 403 without the profiling token."""
+    if PROFILER is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled: set DEVCYCLE_PROFILING=1 and DEVCYCLE_PROFILING_TOKEN.")
+    if not PROFILER.authorized(http_request.headers):
+        raise HTTPException(status_code=403, detail="Missing or invalid X-DevCycle-Profile-Token.")
+    return PROFILER
+
+@app.get("/debug/profiles")
+async def profiles_handler(http_request: Request):
+    """Profiling settings and the kept profiles, most recent first."""
+    profiler = require_profiler(http_request)
+    return {"settings": profiler.stats(), "profiles": profiler.profiles()}
+
+@app.get("/debug/profiles/{profile_id}")
+async def profile_handler(http_request: Request, profile_id: str, format: str = "folded"):
+    """
+    One profile: `folded` CPU stacks in microseconds and `allocations` (bytes
+    still held at the end of the call) for flamegraph tools, or a `json`
+    summary of the top functions and allocation sites.
+    """
+    profile = require_profiler(http_request).get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile not found: {profile_id}")
+    if format not in PROFILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format. Supported: {', '.join(PROFILE_FORMATS)}")
+    if format == "json":
+        return await run_blocking(profile.describe)
+    content = await run_blocking(profile.folded if format == "folded" else profile.folded_allocations)
+    return Response(content=content, media_type="text/plain; charset=utf-8")
+
+@app.post("/debug/profiling")
+async def profiling_settings_handler(http_request: Request, settings: ProfilingSettings):
+    """Turns profiling on or off and sets the fraction of calls profiled without the request header."""
+    profiler = require_profiler(http_request)
+    profiler.configure(settings.enabled, settings.sample_rate)
+    return profiler.stats()
 
 
 def enrich_execution_contract(result: dict, tool_name: str) -> dict:
@@ -668,279 +1353,311 @@ def enrich_execution_contract(result: dict, tool_name: str) -> dict:
 
     return result
 
+# --- tools/call Response Modes ---
+# "full"       -> structuredContent + indented JSON copy in content[0].text (default, backward-compatible)
+# "compact"    -> structuredContent + compact JSON copy in content[0].text
+# "structured" -> structuredContent only
+RESPONSE_MODES = ("full", "compact", "structured")
+DEFAULT_RESPONSE_MODE = "full"
+RESPONSE_MODE_HEADER = "x-devcycle-response-mode"
+
+def resolve_response_mode(params: Dict[str, Any], headers: Any) -> Optional[str]:
+    """
+    Picks the response mode for a `tools/call` request.
+    The `responseMode` request option wins over the connection-level header.
+    Returns None when the requested mode is not supported.
+    """
+    mode = params.get("responseMode") or headers.get(RESPONSE_MODE_HEADER) or DEFAULT_RESPONSE_MODE
+    return mode if mode in RESPONSE_MODES else None
+
+def build_tool_call_result(result: dict, response_mode: str) -> dict:
+    """
+    Wraps a recipe result in the MCP `tools/call` result shape for the negotiated mode.
+    """
+    if response_mode == "structured":
+        content = []
+    elif response_mode == "compact":
+        content = [{"type": "text", "text": json.dumps(result, ensure_ascii=False, separators=(",", ":"))}]
+    else:
+        content = [{"type": "text", "text": json.dumps(result, indent=2)}]
+
+    return {
+        "content": content,
+        "structuredContent": result,
+        "isError": result.get("status") == "error"
+    }
+
+# Result of the MCP `initialize` handshake
+INITIALIZE_RESULT = {
+    "protocolVersion": "2024-11-05",
+    "serverInfo": {"name": "DevCycleManager", "version": "0.2.1-remote"},
+    "capabilities": {
+        "tools": {"listChanged": False},
+        "resources": {"listChanged": False},
+        "experimental": {
+            "responseModes": {"supported": list(RESPONSE_MODES), "default": DEFAULT_RESPONSE_MODE},
+            "templateReferences": {"requestOption": "knownTemplateHash", "resourcePrefix": TEMPLATE_URI_PREFIX},
+            "sectionDelivery": {"requestOption": "sectionDelivery", "supported": list(SECTION_DELIVERY_MODES), "default": "full"},
+            "includeDelivery": {"requestOption": "includeDelivery", "supported": list(INCLUDE_DELIVERY_MODES), "default": "inline"}
+        }
+    }
+}
+
+# --- Pre-encoded Static Responses ---
+# POST responses are not cacheable, so a 304 reaches the client as an empty body: If-None-Match is honored only
+# with this header set to 1, sent by clients that keep the last static result and reuse it on 304
+CONDITIONAL_HEADER = "x-devcycle-conditional"
+class StaticResult:
+    """
+    A JSON-RPC result that never changes for the lifetime of the process.
+    The result is encoded to bytes once; each response only appends the
+    request id, which comes last so the compression cache can compress the
+    id-independent prefix once. The ETag lets reconnecting clients skip the body entirely.
+    """
+
+    def __init__(self, result: Any):
+        self.body = json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.prefix = b'{"jsonrpc":"2.0","result":' + self.body + b',"id":'
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self._headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate == "*" or candidate == self.etag:
+                return True
+        return False
+
+    def respond(self, request_id: Union[str, int], if_none_match: Optional[str] = None) -> Response:
+        if self.matches(if_none_match):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self._headers)
+        content = self.prefix + json.dumps(request_id, ensure_ascii=False).encode("utf-8") + b"}"
+        return Response(content=content, media_type="application/json", headers=self._headers)
+
+STATIC_RESULTS = {
+    "initialize": StaticResult(INITIALIZE_RESULT),
+    "tools/list": StaticResult({"tools": TOOLS.definitions()}),
+}
+for static_result in STATIC_RESULTS.values():
+    COMPRESSION_CACHE.register_prefix(static_result.prefix)
+
+# --- Template Resources ---
+# Raw procedure templates are published as MCP resources addressed by content hash.
+# Clients cache them by hash and send `knownTemplateHash` on `tools/call` to receive
+# only placeholder bindings while the template is unchanged.
+def list_template_resources() -> List[Dict[str, Any]]:
+    resources = []
+    for tool_name in TOOLS.names():
+        tool = TOOLS.get(tool_name)
+        template = PROMPT_TEMPLATES.get(tool.template) if tool.template else None
+        if template is None:
+            continue
+        resources.append({
+            "uri": template.uri,
+            "name": template.name,
+            "description": f"Procedure template for the {tool.name} tool",
+            "mimeType": "text/markdown",
+            "size": len(template.expanded_source().encode("utf-8")),
+            "_meta": {"hash": template.hash, "placeholders": template.placeholders, "includes": template.includes}
+        })
+    for fragment_name in PROMPT_TEMPLATES.fragment_names():
+        fragment = PROMPT_TEMPLATES.get_fragment(fragment_name)
+        resources.append({
+            "uri": fragment.uri,
+            "name": f"{FRAGMENTS_DIR_NAME}/{fragment.name}",
+            "description": f"Shared fragment included as {{{{> {fragment_name}}}}}",
+            "mimeType": "text/markdown",
+            "size": len(fragment.expanded_source().encode("utf-8")),
+            "_meta": {"hash": fragment.hash, "placeholders": fragment.placeholders, "includes": fragment.includes}
+        })
+    return resources
+
+def read_template_resource(uri: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolves `devcycle://prompts/<name>` or `devcycle://prompts/fragments/<name>.md`
+    (optionally pinned with `?hash=<hash>`). Includes are expanded unless
+    `?includes=reference` asks for the unexpanded source.
+    A pinned URI whose hash no longer matches is treated as not found.
+    """
+    if not uri.startswith(TEMPLATE_URI_PREFIX):
+        return None
+    name, _, query = uri[len(TEMPLATE_URI_PREFIX):].partition("?")
+    options = parse_qs(query)
+    fragment_prefix = FRAGMENTS_DIR_NAME + "/"
+    if name.startswith(fragment_prefix):
+        template = PROMPT_TEMPLATES.get_fragment(name[len(fragment_prefix):].removesuffix(".md"))
+    else:
+        template = PROMPT_TEMPLATES.get(name)
+    if template is None:
+        return None
+    pinned_hash = options.get("hash", [None])[0]
+    if pinned_hash is not None and pinned_hash != template.hash:
+        return None
+    by_reference = options.get("includes", [None])[0] == "reference"
+    return {
+        "uri": template.uri,
+        "mimeType": "text/markdown",
+        "text": template.source if by_reference else template.expanded_source(),
+        "_meta": {"hash": template.hash, "includes": template.includes}
+    }
+
+# --- JSON-RPC Dispatch ---
+# Upper bound on the number of calls accepted in a single batch array
+MAX_BATCH_SIZE = int(os.environ.get("DEVCYCLE_MAX_BATCH_SIZE", "50"))
+
+INVALID_REQUEST_BODY = b'{"jsonrpc":"2.0","id":null,"error":{"code":-32600,"message":"Invalid Request"}}'
+
+def encode_rpc_response(response: Union[JsonRpcResponse, Response]) -> bytes:
+    """Encodes a dispatch result exactly as the single-request endpoint would."""
+    if isinstance(response, JsonRpcResponse):
+        return json.dumps(
+            response.model_dump(mode="json", exclude_none=True), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+    return response.body
+
+async def dispatch_batch(batch: List[Any], headers: Any) -> Response:
+    """
+    Handles a JSON-RPC 2.0 batch array.
+    All calls are stateless, so they are dispatched concurrently; responses are
+    returned in request order. Notifications produce no entry, and a batch made
+    only of notifications returns 204 like a single notification does.
+    A call that fails unexpectedly gets its own -32603 error entry; the other
+    calls' results are still returned.
+    """
+    if not batch:
+        return Response(content=INVALID_REQUEST_BODY, media_type="application/json")
+    if len(batch) > MAX_BATCH_SIZE:
+        return Response(
+            content=json.dumps({
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": -32600, "message": f"Batch too large (max {MAX_BATCH_SIZE} calls)"}
+            }).encode("utf-8"),
+            media_type="application/json"
+        )
+
+    # Each slot is either pre-encoded bytes (invalid entry) or an index into `calls`
+    slots: List[Union[bytes, int]] = []
+    calls = []
+    requests: List[JsonRpcRequest] = []
+    for entry in batch:
+        try:
+            request = JsonRpcRequest.model_validate(entry)
+        except ValidationError:
+            slots.append(INVALID_REQUEST_BODY)
+            continue
+        if request.id is None:
+            continue
+        slots.append(len(calls))
+        requests.append(request)
+        calls.append(dispatch_observed(request, headers, allow_not_modified=False))
+
+    if not slots:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    for index, result in enumerate(results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            results[index] = JsonRpcResponse(id=requests[index].id, error={"code": -32603, "message": f"Internal error: {result}"})
+    parts = [slot if isinstance(slot, bytes) else encode_rpc_response(results[slot]) for slot in slots]
+    return Response(content=b"[" + b",".join(parts) + b"]", media_type="application/json")
+
 @app.post("/", response_model=JsonRpcResponse, response_model_exclude_none=True)
-async def json_rpc_handler(request: JsonRpcRequest):
-    if request.id is None:
+async def json_rpc_handler(http_request: Request, payload: Union[JsonRpcRequest, List[Any]] = Body(...)):
+    if isinstance(payload, list):
+        return await dispatch_batch(payload, http_request.headers)
+
+    if payload.id is None:
         return Response(status_code=status.HTTP_204_NO_CONTENT)
 
-    if request.method == "initialize":
-        return JsonRpcResponse(id=request.id, result={
-            "protocolVersion": "2024-11-05",
-            "serverInfo": {"name": "DevCycleManager", "version": "0.2.1-remote"},
-            "capabilities": {"tools": {"listChanged": False}}
-        })
+    return await dispatch_observed(payload, http_request.headers)
 
-    elif request.method == "tools/list":
-        return JsonRpcResponse(id=request.id, result={
-            "tools": [
-                {
-                    "name": "init-project",
-                    "description": "Initialize the memory bank folder structure (path configured in CLAUDE.md).",
-                    "inputSchema": {"type": "object", "properties": {}}
-                },
-                {
-                    "name": "submit-epic",
-                    "description": "Submit a new epic (large body of work containing multiple features). Returns a step-by-step procedure that creates an epic in 00_EPICS with EpicDescription.md. Use deep-dive afterward to refine details.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "description": {"type": "string", "description": "The epic description from the user - what strategic goal or major capability is being built"},
-                            "title": {"type": "string", "description": "Optional: A title for the epic. If not provided, LLM will generate one."},
-                            "external_id": {"type": "string", "description": "Optional: External reference ID (e.g., initiative ID, roadmap item)"}
-                        },
-                        "required": ["description"]
-                    }
-                },
-                {
-                    "name": "submit-feature",
-                    "description": "Submit a new feature idea. Returns a step-by-step procedure for the LLM to execute.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "description": {"type": "string", "description": "The feature description from the user"},
-                            "title": {"type": "string", "description": "Optional: A title for the feature. If not provided, LLM will generate one."},
-                            "external_id": {"type": "string", "description": "Optional: External reference ID (e.g., ticket number, user story ID)"},
-                            "epic_id": {"type": "string", "description": "Optional: Parent epic ID (e.g., EPIC-001) to link this feature to an epic"}
-                        },
-                        "required": ["description"]
-                    }
-                },
-                {
-                    "name": "create-epic-features",
-                    "description": "Batch-create all features defined in an epic's Features Breakdown table. Creates features with TBD IDs and updates the epic with actual FEAT-XXX IDs. Requires user confirmation.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "epic_id": {"type": "string", "description": "The epic ID (e.g., EPIC-001) containing the features to create"},
-                            "epic_path": {"type": "string", "description": "Optional: Direct path to the epic folder if known"}
-                        },
-                        "required": ["epic_id"]
-                    }
-                },
-                {
-                    "name": "link-feature-to-epic",
-                    "description": "Link an existing feature to an epic. Updates both the feature's Parent Epic field and the epic's Features Breakdown, Progress Tracking, and Dependency Diagram.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "feature_id": {"type": "string", "description": "The feature ID (e.g., FEAT-001) to link"},
-                            "epic_id": {"type": "string", "description": "The epic ID (e.g., EPIC-001) to link the feature to"},
-                            "feature_path": {"type": "string", "description": "Optional: Direct path to the feature folder if known"},
-                            "epic_path": {"type": "string", "description": "Optional: Direct path to the epic folder if known"}
-                        },
-                        "required": ["feature_id", "epic_id"]
-                    }
-                },
-                {
-                    "name": "design-feature",
-                    "description": "Design a feature with UX research, wireframes, and design summary. Returns a 3-phase procedure that creates UX-research-report.md, Wireframes-design.md, and design-summary.md.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "feature_id": {"type": "string", "description": "The feature ID (e.g., FEAT-001) to design"},
-                            "feature_path": {"type": "string", "description": "Optional: Direct path to the feature folder if known"}
-                        },
-                        "required": ["feature_id"]
-                    }
-                },
-                {
-                    "name": "refine-feature",
-                    "description": "Refine a feature into implementable tasks using the full feature folder plus linked epic/dependency context. Creates a phased implementation plan with tasks, unit tests, and quality checkpoints, then moves the feature from 01_SUBMITTED to 02_READY_TO_DEVELOP.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "feature_id": {"type": "string", "description": "The feature ID (e.g., FEAT-001) to refine"},
-                            "feature_path": {"type": "string", "description": "Optional: Direct path to the feature folder if known"}
-                        },
-                        "required": ["feature_id"]
-                    }
-                },
-                {
-                    "name": "start-feature",
-                    "description": "Start implementing a feature. Validates (pre + post), creates git branch, and moves from 02_READY_TO_DEVELOP to 03_IN_PROGRESS. Optionally launches autonomous end-to-end workflow when `workflow_mode` is set. Rejects if documentation is incomplete or ambiguous.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "feature_id": {"type": "string", "description": "The feature ID (e.g., FEAT-001) to start"},
-                            "feature_path": {"type": "string", "description": "Optional: Direct path to the feature folder if known"},
-                            "workflow_mode": {"type": "string", "description": "Optional: set to 'autonomous' to continue from start-feature through all phases to completion without routine user interaction"}
-                        },
-                        "required": ["feature_id"]
-                    }
-                },
-                {
-                    "name": "continue-implementation",
-                    "description": "Continue implementing an IN_PROGRESS feature. Phase 1 creates or refreshes the canonical `planning-analysis-report.md` using feature, epic, and dependency context; later phases must read and reuse it instead of re-planning. Also orchestrates task execution, quality gates (build/test/review), downstream-aware test coverage, phase completion, and LessonsLearned documents. With `workflow_mode=autonomous`, it continues through code review, phase acceptance, next phases, and final completion without routine user interaction.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "feature_id": {"type": "string", "description": "The feature ID (e.g., FEAT-001) to continue implementing"},
-                            "feature_path": {"type": "string", "description": "Optional: Direct path to the feature folder if known"},
-                            "mode": {"type": "string", "description": "Optional: set to 'finalize_current_phase' to force validation + phase-finalization reconciliation when tasks are done but statuses are not synchronized"},
-                            "workflow_mode": {"type": "string", "description": "Optional: set to 'autonomous' to continue through review, acceptance, next phases, and feature completion without routine user prompts"}
-                        },
-                        "required": ["feature_id"]
-                    }
-                },
-                {
-                    "name": "accept-phase",
-                    "description": "Accept a completed phase. Validates requirements, marks phase as COMPLETED in all files (phase file, FeatureTasks.md, start-feature-report), updates time tracking, creates git commit, and previews next phase. With `workflow_mode=autonomous`, it continues automatically to the next phase or feature completion when safe.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "feature_id": {"type": "string", "description": "The feature ID (e.g., FEAT-001)"},
-                            "phase_number": {"type": "integer", "description": "The phase number to accept (e.g., 1, 2, 3)"},
-                            "feature_path": {"type": "string", "description": "Optional: Direct path to the feature folder if known"},
-                            "workflow_mode": {"type": "string", "description": "Optional: set to 'autonomous' to continue the end-to-end workflow after acceptance without routine user prompts"}
-                        },
-                        "required": ["feature_id", "phase_number"]
-                    }
-                },
-                {
-                    "name": "code-review",
-                    "description": "Perform comprehensive code review of a phase. Reviews all changed files against CodeGuidelines, validates test quality, generates detailed report with APPROVED/APPROVED_WITH_NOTES/NEEDS_CHANGES status, and updates phase checkpoint.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "feature_id": {"type": "string", "description": "The feature ID (e.g., FEAT-001)"},
-                            "phase_number": {"type": "integer", "description": "The phase number to review (e.g., 2, 3, 4)"},
-                            "feature_path": {"type": "string", "description": "Optional: Direct path to the feature folder if known"}
-                        },
-                        "required": ["feature_id", "phase_number"]
-                    }
-                },
-                {
-                    "name": "complete-feature",
-                    "description": "Complete a feature and move to COMPLETED state. Validates all phases done, compiles Lessons Learned, creates completion reports, and moves feature to 04_COMPLETED. With `workflow_mode=autonomous`, it skips the extra lessons prompt and uses auto-detected lessons only. Invocation is treated as confirmation to proceed.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "feature_id": {"type": "string", "description": "The feature ID (e.g., FEAT-001) to complete"},
-                            "feature_path": {"type": "string", "description": "Optional: Direct path to the feature folder if known"},
-                            "workflow_mode": {"type": "string", "description": "Optional: set to 'autonomous' to finalize without pausing for extra lessons-learned input"}
-                        },
-                        "required": ["feature_id"]
-                    }
-                },
-                {
-                    "name": "deep-dive",
-                    "description": "Conduct an intensive interview about a spec file. Reads the file, interviews the user using AskUserQuestion tool to gather comprehensive details on technical implementation, UX, constraints, tradeoffs, and edge cases. Probes deeply until all ambiguity is resolved. Updates the spec file with gathered information.",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "file_path": {"type": "string", "description": "The path to the spec file to deep-dive into (e.g., {memory_bank}/Features/01_SUBMITTED/FEAT-001-feature-name/FeatureDescription.md)"}
-                        },
-                        "required": ["file_path"]
-                    }
-                }
-            ]
-        })
+async def dispatch_observed(request: JsonRpcRequest, headers: Any, allow_not_modified: bool = True) -> Response:
+    """
+    Executes a single JSON-RPC call and encodes its response, recording the
+    latency, encoded size and error code in METRICS. Calls selected by the
+    profiler run under it, and the response names the profile.
+    """
+    started = time.perf_counter()
+    labels = METRICS.labels(request.method, request.params)
+    profile = PROFILER.begin(*labels) if PROFILER is not None and PROFILER.wants(headers) else None
+    try:
+        response = await dispatch_rpc(request, headers, allow_not_modified)
+        error_code = tool_error = None
+        if isinstance(response, JsonRpcResponse):
+            if response.error is not None:
+                error_code = response.error.get("code")
+            elif isinstance(response.result, dict):
+                tool_error = response.result.get("isError")
+            response = Response(content=encode_rpc_response(response), media_type="application/json")
+    finally:
+        if profile is not None:
+            PROFILER.finish(profile)
+    if profile is not None:
+        response.headers[PROFILE_ID_HEADER] = profile.id
+    METRICS.observe_call(labels, time.perf_counter() - started, len(response.body), error_code, bool(tool_error))
+    return response
+
+async def dispatch_rpc(request: JsonRpcRequest, headers: Any, allow_not_modified: bool = True) -> Union[JsonRpcResponse, Response]:
+    """
+    Executes a single JSON-RPC call (notifications are filtered out by the caller).
+    """
+    if request.method in STATIC_RESULTS:
+        conditional = allow_not_modified and headers.get(CONDITIONAL_HEADER, "").strip().lower() in ("1", "true", "yes")
+        if_none_match = headers.get("if-none-match") if conditional else None
+        return STATIC_RESULTS[request.method].respond(request.id, if_none_match)
+
+    if request.method == "resources/list":
+        return JsonRpcResponse(id=request.id, result={"resources": list_template_resources()})
+
+    if request.method == "resources/read":
+        if not isinstance(request.params, dict) or not isinstance(request.params.get("uri"), str):
+            return JsonRpcResponse(id=request.id, error={"code": -32602, "message": "Invalid params: resources/read params must be an object with a string uri"})
+        uri = request.params["uri"]
+        contents = read_template_resource(uri)
+        if contents is None:
+            return JsonRpcResponse(id=request.id, error={"code": -32002, "message": f"Resource not found: {uri}"})
+        return JsonRpcResponse(id=request.id, result={"contents": [contents]})
 
-    elif request.method == "tools/call":
+    if request.method == "tools/call":
+        if not isinstance(request.params, dict):
+            return JsonRpcResponse(id=request.id, error={"code": -32602, "message": "Invalid params: tools/call params must be an object"})
         tool_name = request.params.get("name")
         tool_args = request.params.get("input", {})
 
+        response_mode = resolve_response_mode(request.params, headers)
+        if response_mode is None:
+            return JsonRpcResponse(id=request.id, error={
+                "code": -32602,
+                "message": f"Unsupported responseMode. Supported: {', '.join(RESPONSE_MODES)}"
+            })
+
         try:
-            if tool_name == "init-project":
-                result = await run_init_project()
-            elif tool_name == "submit-epic":
-                result = await run_submit_epic(
-                    description=tool_args.get("description"),
-                    title=tool_args.get("title"),
-                    external_id=tool_args.get("external_id")
-                )
-            elif tool_name == "submit-feature":
-                result = await run_submit_feature(
-                    description=tool_args.get("description"),
-                    title=tool_args.get("title"),
-                    external_id=tool_args.get("external_id"),
-                    epic_id=tool_args.get("epic_id")
-                )
-            elif tool_name == "create-epic-features":
-                result = await run_create_epic_features(
-                    epic_id=tool_args.get("epic_id"),
-                    epic_path=tool_args.get("epic_path")
-                )
-            elif tool_name == "link-feature-to-epic":
-                result = await run_link_feature_to_epic(
-                    feature_id=tool_args.get("feature_id"),
-                    epic_id=tool_args.get("epic_id"),
-                    feature_path=tool_args.get("feature_path"),
-                    epic_path=tool_args.get("epic_path")
-                )
-            elif tool_name == "design-feature":
-                result = await run_design_feature(
-                    feature_id=tool_args.get("feature_id"),
-                    feature_path=tool_args.get("feature_path")
-                )
-            elif tool_name == "refine-feature":
-                result = await run_refine_feature(
-                    feature_id=tool_args.get("feature_id"),
-                    feature_path=tool_args.get("feature_path")
-                )
-            elif tool_name == "start-feature":
-                result = await run_start_feature(
-                    feature_id=tool_args.get("feature_id"),
-                    feature_path=tool_args.get("feature_path"),
-                    workflow_mode=tool_args.get("workflow_mode")
-                )
-            elif tool_name == "continue-implementation":
-                result = await run_continue_implementation(
-                    feature_id=tool_args.get("feature_id"),
-                    feature_path=tool_args.get("feature_path"),
-                    mode=tool_args.get("mode"),
-                    workflow_mode=tool_args.get("workflow_mode")
-                )
-            elif tool_name == "accept-phase":
-                result = await run_accept_phase(
-                    feature_id=tool_args.get("feature_id"),
-                    phase_number=tool_args.get("phase_number"),
-                    feature_path=tool_args.get("feature_path"),
-                    workflow_mode=tool_args.get("workflow_mode")
-                )
-            elif tool_name == "code-review":
-                result = await run_code_review(
-                    feature_id=tool_args.get("feature_id"),
-                    phase_number=tool_args.get("phase_number"),
-                    feature_path=tool_args.get("feature_path")
-                )
-            elif tool_name == "complete-feature":
-                result = await run_complete_feature(
-                    feature_id=tool_args.get("feature_id"),
-                    feature_path=tool_args.get("feature_path"),
-                    workflow_mode=tool_args.get("workflow_mode")
-                )
-            elif tool_name == "deep-dive":
-                result = await run_deep_dive(
-                    file_path=tool_args.get("file_path")
-                )
-            else:
+            tool = TOOLS.get(tool_name)
+            if tool is None:
                 raise ValueError(f"Unknown tool: {tool_name}")
 
+            # Reject malformed arguments before any recipe work is done
+            arguments = tool.validate_arguments(tool_args)
+            await WARMUP.wait(tool.indexes)
+            result = await (tool.handler or run_procedure)(tool, arguments, CallOptions.from_params(request.params))
+
             result = enrich_execution_contract(result, tool_name)
 
-            # Backward compatible:
+            # Backward compatible by default:
             # - `content[0].text` keeps existing clients working.
             # - `structuredContent` gives deterministic machine-readable data for robust orchestration.
-            return JsonRpcResponse(
-                id=request.id,
-                result={
-                    "content": [{"type": "text", "text": json.dumps(result, indent=2)}],
-                    "structuredContent": result,
-                    "isError": result.get("status") == "error"
-                }
-            )
+            # Clients that negotiate `compact`/`structured` avoid receiving the payload twice.
+            return JsonRpcResponse(id=request.id, result=build_tool_call_result(result, response_mode))
         
+        except ToolArgumentError as e:
+            return JsonRpcResponse(id=request.id, error={"code": -32602, "message": f"Invalid params: {e}"})
         except Exception as e:
             return JsonRpcResponse(id=request.id, error={"code": -32603, "message": str(e)})
 
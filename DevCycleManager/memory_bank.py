@@ -0,0 +1,547 @@
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Optional, List, Any, Dict, Tuple
+
+# --- Constants & Configuration ---
+# Server-side location of the MemoryBank volume (mounted at /app/MemoryBank in the container)
+DEFAULT_MEMORY_BANK_DIR = Path(os.environ.get("DEVCYCLE_MEMORY_BANK_DIR", str(Path(__file__).parent / "MemoryBank")))
+
+# Seconds between mtime checks of the state folders (0 disables background refresh)
+DEFAULT_REFRESH_INTERVAL = float(os.environ.get("DEVCYCLE_MEMORY_BANK_REFRESH_INTERVAL", "2.0"))
+
+# Lifecycle state folders under `Features/`, in workflow order
+STATE_FOLDERS = (
+    "00_EPICS",
+    "01_SUBMITTED",
+    "02_READY_TO_DEVELOP",
+    "03_IN_PROGRESS",
+    "04_COMPLETED",
+    "05_CANCELLED",
+)
+
+# Documents of finished items rarely change: recheck them only every Nth refresh (and whenever their folder changes)
+TERMINAL_STATES = ("04_COMPLETED", "05_CANCELLED")
+TERMINAL_RECHECK_EVERY = int(os.environ.get("DEVCYCLE_MEMORY_BANK_TERMINAL_RECHECK_EVERY", "15"))
+
+# `FEAT-123-slug`, `FEAT-123-EXT-45-slug`, `EPIC-007-slug` -> `FEAT-123` / `EPIC-007`
+ITEM_ID_PATTERN = re.compile(r"^((?:FEAT|EPIC)-\d+)(?:-|$)", re.IGNORECASE)
+
+# Prefix the client resolves from `CLAUDE.md`; the server never assumes the client-side location
+CLIENT_ROOT = "{MEMORY_BANK_PATH}"
+
+# Documents parsed per item; phase files live in `Phases/` (`phase-<N>-<slug>.md`)
+DESCRIPTION_FILES = {"feature": "FeatureDescription.md", "epic": "EpicDescription.md"}
+TASKS_FILE = "FeatureTasks.md"
+# Written by design-feature; its presence marks a submitted feature as DESIGNED
+DESIGN_FILE = "design-summary.md"
+PHASES_DIR = "Phases"
+PHASE_FILE_PATTERN = re.compile(r"^phase-(\d+)-.*\.md$")
+
+# Markdown shapes written by the procedures (see submit-feature, submit-epic, refine-feature)
+TITLE_PATTERN = re.compile(r"^#\s+(?:Feature Tasks|Feature|(?:EPIC|FEAT)-\d+)\s*:\s*(?:(?:FEAT|EPIC)-\d+\s+-\s+)?(.+?)\s*$", re.MULTILINE)
+FIELD_PATTERN = re.compile(r"^(?:[-*]\s+)?\*\*([^*]+)\*\*\s*:\s*(.+?)\s*$")
+TABLE_FIELD_PATTERN = re.compile(r"^\|\s*\**([^|*]+?)\**\s*\|\s*([^|]+?)\s*\|\s*$")
+TASK_HEADING_PATTERN = re.compile(r"^#{2,4}\s+Task\s+(\d+(?:\.\d+)*)\s*:\s*(.+?)\s*$")
+EPIC_REFERENCE_PATTERN = re.compile(r"EPIC-\d+", re.IGNORECASE)
+FEATURE_REFERENCE_PATTERN = re.compile(r"FEAT-\d+", re.IGNORECASE)
+
+# Statuses counted as done when computing completion
+DONE_STATUSES = ("COMPLETED", "SKIPPED")
+
+# Phase Summary time columns -> Phase.hours keys; cells look like `2h`, `0.5h` or `-`
+HOUR_COLUMNS = {
+    "est. man/hour": "estimated_man",
+    "est. ai/hour": "estimated_ai",
+    "actual man": "actual_man",
+    "actual ai": "actual_ai",
+}
+HOURS_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*h?\b")
+
+
+def parse_hours(value: str) -> Optional[float]:
+    match = HOURS_PATTERN.search(value or "")
+    return float(match.group(1)) if match else None
+
+
+def normalize_status(value: str) -> str:
+    """`[IN_PROGRESS]`, `` `completed` ``, `Not Started` -> `IN_PROGRESS`, `COMPLETED`, `NOT_STARTED`."""
+    return re.sub(r"\s+", "_", value.strip().strip("`[]* ").strip()).upper()
+
+
+def read_text(path: Path) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except (FileNotFoundError, UnicodeDecodeError):
+        return ""
+
+
+class Phase:
+    """One row of the `FeatureTasks.md` Phase Summary, with the tasks of its phase file."""
+
+    def __init__(self, number: int, name: str, status: str, hours: Optional[Dict[str, float]] = None):
+        self.number = number
+        self.name = name
+        self.status = status
+        self.hours = hours or {}
+        self.file: Optional[str] = None
+        self.tasks: List[Dict[str, str]] = []
+
+    def describe(self, include_tasks: bool = False) -> Dict[str, Any]:
+        described: Dict[str, Any] = {"number": self.number, "name": self.name, "status": self.status}
+        if self.file is not None:
+            described["file"] = self.file
+        if self.hours:
+            described["hours"] = dict(self.hours)
+        done = sum(1 for task in self.tasks if task["status"] in DONE_STATUSES)
+        described["task_counts"] = {"total": len(self.tasks), "done": done}
+        if include_tasks:
+            described["tasks"] = list(self.tasks)
+        return described
+
+
+class FeatureEntry:
+    """
+    A feature or epic folder found in one of the state folders.
+    `path` is relative to the MemoryBank root, so it is valid on the client as
+    `{MEMORY_BANK_PATH}/<path>` whatever the server-side mount point is.
+    Title, status, parent epic, dependencies and phases are parsed from the
+    folder's documents (for epics, the Features Breakdown table);
+    `document_mtimes` records which versions were parsed.
+    """
+
+    def __init__(self, id: str, folder: str, state: str):
+        self.id = id
+        self.folder = folder
+        self.state = state
+        self.kind = "epic" if id.startswith("EPIC-") else "feature"
+        self.path = f"Features/{state}/{folder}/"
+        self.title = ""
+        self.status = ""
+        self.parent_epic: Optional[str] = None
+        self.dependencies: List[str] = []
+        self.breakdown: List[Dict[str, Any]] = []
+        self.phases: List[Phase] = []
+        self.document_mtimes: Dict[str, int] = {}
+
+    @property
+    def client_path(self) -> str:
+        return f"{CLIENT_ROOT}/{self.path}"
+
+    @property
+    def has_design(self) -> bool:
+        return DESIGN_FILE in self.document_mtimes
+
+    @property
+    def done(self) -> bool:
+        return self.state == "04_COMPLETED"
+
+    @property
+    def remaining_hours(self) -> float:
+        """Estimated man-hours of phases not yet completed or skipped."""
+        return sum(phase.hours.get("estimated_man", 0.0) for phase in self.phases if phase.status not in DONE_STATUSES)
+
+    @property
+    def current_phase(self) -> Optional[Phase]:
+        """The first phase that is not completed or skipped."""
+        for phase in self.phases:
+            if phase.status not in DONE_STATUSES:
+                return phase
+        return None
+
+    def describe(self) -> Dict[str, Any]:
+        described: Dict[str, Any] = {"id": self.id, "folder": self.folder, "state": self.state, "path": self.client_path}
+        described["kind"] = self.kind
+        described["title"] = self.title
+        described["status"] = self.status
+        if self.parent_epic is not None:
+            described["parent_epic"] = self.parent_epic
+        if self.dependencies:
+            described["dependencies"] = list(self.dependencies)
+        if self.phases:
+            current = self.current_phase
+            done = sum(1 for phase in self.phases if phase.status in DONE_STATUSES)
+            described["current_phase"] = current.describe() if current is not None else None
+            described["phase_counts"] = {"total": len(self.phases), "done": done}
+        return described
+
+    def detail(self, include_tasks: bool = True) -> Dict[str, Any]:
+        """`describe()` plus every phase (and its tasks), and an epic's Features Breakdown."""
+        detail = {**self.describe(), "phases": [phase.describe(include_tasks) for phase in self.phases]}
+        if self.kind == "epic":
+            detail["breakdown"] = [dict(row) for row in self.breakdown]
+        return detail
+
+    def load_documents(self, directory: Path, mtimes: Dict[str, int]) -> None:
+        """Parses the description, `FeatureTasks.md` and phase files of the folder at `directory`."""
+        self.document_mtimes = mtimes
+        description = read_text(directory / DESCRIPTION_FILES[self.kind])
+        tasks = read_text(directory / TASKS_FILE) if TASKS_FILE in mtimes else ""
+
+        title = TITLE_PATTERN.search(tasks) or TITLE_PATTERN.search(description)
+        self.title = title.group(1) if title else self.folder[len(self.id):].strip("-").replace("-", " ")
+
+        description_fields = parse_fields(description)
+        tasks_fields = parse_fields(tasks)
+        status = tasks_fields.get("status") or description_fields.get("status")
+        self.status = normalize_status(status) if status else ""
+        parent = EPIC_REFERENCE_PATTERN.search(description_fields.get("parent epic") or tasks_fields.get("parent epic") or "")
+        self.parent_epic = parent.group(0).upper() if parent else None
+        dependencies = parse_section(description, "dependencies") or description_fields.get("dependencies") or ""
+        self.dependencies = [item_id for item_id in feature_references(dependencies) if item_id != self.id]
+        if self.kind == "epic":
+            self.breakdown = [
+                {
+                    "feature_id": row.get("feature id", ""),
+                    "title": row.get("title", ""),
+                    "status": normalize_status(row.get("status", "")),
+                    "dependencies": feature_references(row.get("dependencies", "")),
+                }
+                for row in parse_table(description, "features breakdown")
+            ]
+
+        phase_files = {}
+        for name in mtimes:
+            match = PHASE_FILE_PATTERN.match(name.rpartition("/")[2])
+            if name.startswith(PHASES_DIR + "/") and match:
+                phase_files[int(match.group(1))] = name
+        self.phases = parse_phase_summary(tasks)
+        known = {phase.number for phase in self.phases}
+        for number in sorted(phase_files):
+            if number not in known:
+                # Phase file without a summary row: take name and status from the file itself
+                self.phases.append(Phase(number, "", ""))
+        self.phases.sort(key=lambda phase: phase.number)
+        for phase in self.phases:
+            name = phase_files.get(phase.number)
+            if name is None:
+                continue
+            phase.file = name
+            text = read_text(directory / name)
+            phase.tasks = parse_tasks(text)
+            if not phase.status:
+                status = parse_fields(text).get("status")
+                phase.status = normalize_status(status) if status else ""
+            if not phase.name:
+                heading = re.search(r"^#\s+Phase\s+\d+\s*:\s*(.+?)\s*$", text, re.MULTILINE)
+                phase.name = heading.group(1) if heading else ""
+
+
+def parse_fields(text: str) -> Dict[str, str]:
+    """
+    First value of each `**Field**: value` line or `| **Field** | value |` row,
+    keyed by lower-cased field name. Stops at the first `###` heading so
+    per-task fields do not shadow document-level ones.
+    """
+    fields: Dict[str, str] = {}
+    for line in text.splitlines():
+        if line.startswith("###"):
+            break
+        match = FIELD_PATTERN.match(line) or TABLE_FIELD_PATTERN.match(line)
+        if match:
+            fields.setdefault(match.group(1).strip().lower(), match.group(2))
+    return fields
+
+
+def parse_table(text: str, heading: str) -> List[Dict[str, str]]:
+    """Rows of the first table under the `## <heading>` section, keyed by lower-cased column name."""
+    rows: List[Dict[str, str]] = []
+    columns: Optional[List[str]] = None
+    in_section = False
+    for line in text.splitlines():
+        if line.startswith("## "):
+            if rows:
+                break
+            in_section = line[3:].strip().lower() == heading
+            columns = None
+            continue
+        if not in_section or not line.startswith("|"):
+            continue
+        cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+        if columns is None:
+            columns = [cell.lower() for cell in cells]
+            continue
+        if all(set(cell) <= set("-: ") for cell in cells):
+            continue
+        rows.append(dict(zip(columns, cells)))
+    return rows
+
+
+def parse_section(text: str, heading: str) -> str:
+    """Body of the first `##`-`####` section titled `heading` (case-insensitive), up to the next heading."""
+    lines: List[str] = []
+    in_section = False
+    for line in text.splitlines():
+        match = re.match(r"^#{2,4}\s+(.+?)\s*$", line)
+        if match:
+            if in_section:
+                break
+            in_section = match.group(1).lower() == heading
+            continue
+        if in_section:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def feature_references(text: str) -> List[str]:
+    """Distinct `FEAT-<n>` IDs mentioned in `text`, upper-cased, in order of appearance."""
+    return list(dict.fromkeys(match.upper() for match in FEATURE_REFERENCE_PATTERN.findall(text)))
+
+
+def parse_phase_summary(text: str) -> List[Phase]:
+    """Rows of the `## Phase Summary` table (`| Phase | Name | ... | Status | ...`)."""
+    phases = []
+    for row in parse_table(text, "phase summary"):
+        if not row.get("phase", "").isdigit():
+            continue
+        hours = {key: parse_hours(row.get(column, "")) for column, key in HOUR_COLUMNS.items()}
+        phases.append(Phase(
+            int(row["phase"]), row.get("name", ""), normalize_status(row.get("status", "")),
+            {key: value for key, value in hours.items() if value is not None}
+        ))
+    return phases
+
+
+def parse_tasks(text: str) -> List[Dict[str, str]]:
+    """`### Task N.M: Name` headings with the first `**Status**:` line below each."""
+    tasks: List[Dict[str, str]] = []
+    current: Optional[Dict[str, str]] = None
+    for line in text.splitlines():
+        heading = TASK_HEADING_PATTERN.match(line)
+        if heading:
+            current = {"id": heading.group(1), "title": heading.group(2), "status": ""}
+            tasks.append(current)
+            continue
+        if line.startswith("#"):
+            current = None
+            continue
+        if current is not None and not current["status"]:
+            field = FIELD_PATTERN.match(line)
+            if field and field.group(1).strip().lower() == "status":
+                current["status"] = normalize_status(field.group(2))
+    return tasks
+
+
+class FeatureIndex:
+    """
+    In-memory map of feature/epic ID -> folder, lifecycle state and parsed
+    documents (title, status, parent epic, phases and tasks).
+    Built once at startup; afterwards `refresh()` rescans only the state
+    folders whose directory mtime changed (a feature moving between states
+    touches both folders) and reparses only folders whose documents changed.
+    Lookups and queries never touch the filesystem, so the server runs
+    `refresh()` every `refresh_interval` seconds off the event loop.
+    With a metadata `store`, the index starts from the stored entries (only
+    folders changed since they were stored are reparsed) and every refresh
+    that changes something is written back to it.
+    With `warm=False` the index starts empty and is built by `warm_up()`,
+    so the server can accept connections before the MemoryBank is scanned.
+    """
+
+    def __init__(self, root: Path, refresh_interval: float = DEFAULT_REFRESH_INTERVAL, store: Optional[Any] = None, warm: bool = True):
+        self.root = Path(root)
+        self.refresh_interval = refresh_interval
+        self.store = store
+        # Bumped on every change, so clients and caches can tell whether results are stale
+        self.generation = 0
+        self._passes = 0
+        self._states: Dict[str, Tuple[int, Dict[str, FeatureEntry]]] = {}
+        # Stored entries per state folder, used as the previous scan of each folder on the first refresh
+        self._seeded: Dict[str, Dict[str, FeatureEntry]] = {}
+        self._by_id: Dict[str, FeatureEntry] = {}
+        self._by_state: Dict[str, List[FeatureEntry]] = {}
+        self._by_epic: Dict[str, List[FeatureEntry]] = {}
+        self._lock = threading.Lock()
+        if warm:
+            self.warm_up()
+
+    def warm_up(self) -> List[str]:
+        """Builds the index for the first time, starting from the store's entries if there is a store."""
+        with self._lock:
+            if self._passes == 0 and self.store is not None:
+                for entry in self.store.load_entries().values():
+                    self._seeded.setdefault(entry.state, {})[entry.id] = entry
+        return self.refresh()
+
+    def refresh(self) -> List[str]:
+        """
+        Rescans state folders that were modified, added or removed, and
+        reparses items whose documents changed.
+        Returns the IDs of the items that changed (and names of removed state folders).
+        """
+        with self._lock:
+            changed: List[str] = []
+            first = self._passes == 0
+            features_dir = self.root / "Features"
+            recheck_terminal = self._passes % max(1, TERMINAL_RECHECK_EVERY) == 0
+            self._passes += 1
+            for state in STATE_FOLDERS:
+                try:
+                    mtime_ns = os.stat(features_dir / state).st_mtime_ns
+                except FileNotFoundError:
+                    if self._states.pop(state, None) is not None:
+                        changed.append(state)
+                    continue
+                current = self._states.get(state)
+                if current is None or current[0] != mtime_ns:
+                    entries, state_changed = self._scan_state(features_dir / state, state, current[1] if current else self._seeded.pop(state, {}))
+                elif state not in TERMINAL_STATES or recheck_terminal:
+                    entries, state_changed = self._refresh_documents(features_dir / state, current[1])
+                else:
+                    continue
+                self._states[state] = (mtime_ns, entries)
+                changed.extend(state_changed)
+
+            if changed or first:
+                # Later states win, so a feature copied forward before its old folder is removed resolves to the new one
+                by_id: Dict[str, FeatureEntry] = {}
+                for state in STATE_FOLDERS:
+                    if state in self._states:
+                        by_id.update(self._states[state][1])
+                self._by_id = by_id
+                self._by_state = {
+                    state: sorted(self._states[state][1].values(), key=item_sort_key)
+                    for state in STATE_FOLDERS if state in self._states
+                }
+                by_epic: Dict[str, List[FeatureEntry]] = {}
+                for entry in sorted(by_id.values(), key=item_sort_key):
+                    if entry.parent_epic is not None:
+                        by_epic.setdefault(entry.parent_epic, []).append(entry)
+                self._by_epic = by_epic
+                self.generation += 1
+                if self.store is not None:
+                    self.store.sync(by_id, self.generation)
+            return changed
+
+    def reload(self) -> List[str]:
+        """Forgets every parsed item and rebuilds the index (and the store) from the Markdown."""
+        with self._lock:
+            self._states = {}
+            self._seeded = {}
+            self._passes = 0
+            if self.store is not None:
+                self.store.reset()
+        return self.refresh()
+
+    def _scan_state(self, directory: Path, state: str, previous: Dict[str, FeatureEntry]) -> Tuple[Dict[str, FeatureEntry], List[str]]:
+        entries: Dict[str, FeatureEntry] = {}
+        changed: List[str] = []
+        try:
+            listing = list(os.scandir(directory))
+        except FileNotFoundError:
+            listing = []
+        for entry in sorted(listing, key=lambda entry: entry.name):
+            match = ITEM_ID_PATTERN.match(entry.name)
+            if match is None or not entry.is_dir():
+                continue
+            item_id = match.group(1).upper()
+            if item_id in entries:
+                continue
+            known = previous.get(item_id)
+            entries[item_id] = self._load(directory, entry.name, state, known if known is not None and known.folder == entry.name else None)
+            if entries[item_id] is not known:
+                changed.append(item_id)
+        changed.extend(item_id for item_id in previous if item_id not in entries)
+        return entries, changed
+
+    def _refresh_documents(self, directory: Path, entries: Dict[str, FeatureEntry]) -> Tuple[Dict[str, FeatureEntry], List[str]]:
+        refreshed: Dict[str, FeatureEntry] = {}
+        changed: List[str] = []
+        for item_id, known in entries.items():
+            refreshed[item_id] = self._load(directory, known.folder, known.state, known)
+            if refreshed[item_id] is not known:
+                changed.append(item_id)
+        return refreshed, changed
+
+    @staticmethod
+    def _load(directory: Path, folder: str, state: str, known: Optional[FeatureEntry]) -> FeatureEntry:
+        """Returns `known` if its documents are unchanged, otherwise a freshly parsed entry."""
+        item_directory = directory / folder
+        mtimes = document_mtimes(item_directory)
+        if known is not None and known.document_mtimes == mtimes:
+            return known
+        # Entries are replaced rather than mutated, so concurrent readers never see a half-parsed item
+        entry = FeatureEntry(ITEM_ID_PATTERN.match(folder).group(1).upper(), folder, state)
+        entry.load_documents(item_directory, mtimes)
+        return entry
+
+    def get(self, item_id: str) -> Optional[FeatureEntry]:
+        """Returns the folder for `item_id` (e.g. `FEAT-123`, case-insensitive), or None if not indexed."""
+        if not item_id:
+            return None
+        match = ITEM_ID_PATTERN.match(item_id.strip())
+        return self._by_id.get(match.group(1).upper()) if match else None
+
+    def query(
+        self,
+        state: Optional[str] = None,
+        status: Optional[str] = None,
+        kind: Optional[str] = None,
+        parent_epic: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Tuple[List[FeatureEntry], int]:
+        """
+        Items matching every given filter, in state then ID order.
+        `state` accepts the folder name or its suffix (`03_IN_PROGRESS` or `in_progress`).
+        Returns one page of entries and the total number of matches.
+        """
+        by_state = self._by_state
+        states = [name for name in by_state if state is None or matches_state(name, state)]
+        wanted_status = normalize_status(status) if status else None
+        wanted_epic = parent_epic.strip().upper() if parent_epic else None
+
+        matches: List[FeatureEntry] = []
+        for name in states:
+            for entry in by_state[name]:
+                if wanted_status is not None and entry.status != wanted_status:
+                    continue
+                if kind is not None and entry.kind != kind:
+                    continue
+                if wanted_epic is not None and entry.parent_epic != wanted_epic:
+                    continue
+                matches.append(entry)
+        return matches[offset:offset + limit], len(matches)
+
+    def epic_features(self, epic_id: str) -> List[FeatureEntry]:
+        """Features whose Parent Epic is `epic_id`, in ID order."""
+        return self._by_epic.get(epic_id.strip().upper(), [])
+
+    def entries(self) -> List[FeatureEntry]:
+        """Every indexed feature and epic, in state then ID order."""
+        return [entry for entries in self._by_state.values() for entry in entries]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of items per state folder."""
+        return {state: len(entries) for state, entries in self._by_state.items()}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+
+def matches_state(folder: str, state: str) -> bool:
+    wanted = normalize_status(state)
+    return folder == wanted or folder.split("_", 1)[1] == wanted
+
+
+def item_sort_key(entry: FeatureEntry) -> Tuple[int, str]:
+    return int(entry.id.split("-", 1)[1]), entry.id
+
+
+def document_mtimes(directory: Path) -> Dict[str, int]:
+    """mtimes of the documents parsed for an item folder, keyed by path relative to the folder."""
+    mtimes: Dict[str, int] = {}
+    for name in (*DESCRIPTION_FILES.values(), TASKS_FILE, DESIGN_FILE):
+        try:
+            mtimes[name] = os.stat(directory / name).st_mtime_ns
+        except FileNotFoundError:
+            pass
+    try:
+        for entry in os.scandir(directory / PHASES_DIR):
+            if entry.is_file() and PHASE_FILE_PATTERN.match(entry.name):
+                mtimes[f"{PHASES_DIR}/{entry.name}"] = entry.stat().st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+    return mtimes
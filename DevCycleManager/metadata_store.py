@@ -0,0 +1,377 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, List, Any, Dict, Tuple, Iterable
+
+from memory_bank import STATE_FOLDERS, FeatureEntry, Phase, normalize_status, matches_state, read_text
+from quality_gates import PhaseDocument
+
+# --- Constants & Configuration ---
+# Optional: SQLite file mirroring the MemoryBank metadata (empty disables the store)
+DEFAULT_METADATA_DB = os.environ.get("DEVCYCLE_METADATA_DB", "")
+
+# Name this server's MemoryBank is stored under; several projects can share one database file
+DEFAULT_PROJECT = os.environ.get("DEVCYCLE_METADATA_PROJECT", "default")
+
+# Bumped whenever the schema or the parsed fields change, so stale databases are rebuilt
+SCHEMA_VERSION = 1
+
+# Seconds a connection waits for another writer (another server sharing the file) before failing
+BUSY_TIMEOUT = 5.0
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS projects (
+        project TEXT PRIMARY KEY,
+        root TEXT NOT NULL,
+        generation INTEGER NOT NULL,
+        synced_at REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS items (
+        project TEXT NOT NULL,
+        id TEXT NOT NULL,
+        number INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        state TEXT NOT NULL,
+        folder TEXT NOT NULL,
+        title TEXT NOT NULL,
+        status TEXT NOT NULL,
+        parent_epic TEXT,
+        breakdown TEXT NOT NULL,
+        document_mtimes TEXT NOT NULL,
+        PRIMARY KEY (project, id)
+    )""",
+    "CREATE INDEX IF NOT EXISTS items_by_state ON items (project, state, number)",
+    "CREATE INDEX IF NOT EXISTS items_by_status ON items (project, status)",
+    "CREATE INDEX IF NOT EXISTS items_by_epic ON items (project, parent_epic)",
+    """CREATE TABLE IF NOT EXISTS dependencies (
+        project TEXT NOT NULL,
+        id TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        depends_on TEXT NOT NULL,
+        PRIMARY KEY (project, id, position)
+    )""",
+    "CREATE INDEX IF NOT EXISTS dependencies_by_target ON dependencies (project, depends_on)",
+    """CREATE TABLE IF NOT EXISTS phases (
+        project TEXT NOT NULL,
+        id TEXT NOT NULL,
+        number INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        file TEXT,
+        hours TEXT NOT NULL,
+        PRIMARY KEY (project, id, number)
+    )""",
+    "CREATE INDEX IF NOT EXISTS phases_by_status ON phases (project, status)",
+    """CREATE TABLE IF NOT EXISTS tasks (
+        project TEXT NOT NULL,
+        id TEXT NOT NULL,
+        phase INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        task_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        status TEXT NOT NULL,
+        PRIMARY KEY (project, id, phase, position)
+    )""",
+    "CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (project, status)",
+    """CREATE TABLE IF NOT EXISTS commits (
+        project TEXT NOT NULL,
+        id TEXT NOT NULL,
+        phase INTEGER NOT NULL,
+        hash TEXT NOT NULL,
+        task_id TEXT,
+        line INTEGER NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS commits_by_item ON commits (project, id)",
+    "CREATE INDEX IF NOT EXISTS commits_by_hash ON commits (hash)",
+)
+
+# Tables holding per-item rows, deleted together when an item changes or disappears
+ITEM_TABLES = ("items", "dependencies", "phases", "tasks", "commits")
+
+
+class MetadataStore:
+    """
+    Embedded SQLite (WAL) mirror of the feature index: items, dependencies,
+    phases, tasks and the commits of their Git Commits tables, keyed by
+    project so several MemoryBanks can share one file. `sync()` writes only
+    the items whose index entry was replaced since the last sync;
+    `load_entries()` hands the stored entries back to a restarting index,
+    so only folders changed since then are reparsed. Queries use the
+    indexes on state, status, parent epic and commit hash.
+    """
+
+    def __init__(self, db_path: str, root: Path, project: str = DEFAULT_PROJECT):
+        self.db_path = db_path
+        self.root = Path(root)
+        self.project = project
+        self.generation = 0
+        self.synced = 0
+        self.errors = 0
+        self._synced: Dict[str, FeatureEntry] = {}
+        self._inherited: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = self._connect()
+        self._migrate()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def reopen(self) -> None:
+        """
+        Gives a forked worker a connection of its own. SQLite connections must
+        not be used across fork(); the inherited one is kept open but unused,
+        since closing it in the child could disturb the parent's locks.
+        """
+        with self._lock:
+            self._inherited.append(self._connection)
+            self._connection = self._connect()
+
+    def _migrate(self) -> None:
+        with self._lock, self._connection:
+            version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                for table in ("projects", *ITEM_TABLES):
+                    self._connection.execute(f"DROP TABLE IF EXISTS {table}")
+            for statement in SCHEMA:
+                self._connection.execute(statement)
+            self._connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def load_entries(self) -> Dict[str, FeatureEntry]:
+        """
+        The entries stored for this project, if they were synced from the same
+        MemoryBank root; a restarting index reuses those whose documents are unchanged.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT root FROM projects WHERE project = ?", (self.project,)).fetchone()
+            if row is None or row["root"] != str(self.root.resolve()):
+                return {}
+            entries = {entry.id: entry for entry in self._entries(self.project, "", ())}
+            self._synced = dict(entries)
+        return entries
+
+    def sync(self, entries: Dict[str, FeatureEntry], generation: int) -> int:
+        """
+        Writes the entries that were replaced since the last sync and deletes
+        the ones that are gone, in one transaction; returns the number of items written.
+        """
+        with self._lock:
+            changed = [entry for item_id, entry in entries.items() if self._synced.get(item_id) is not entry]
+            removed = [item_id for item_id in self._synced if item_id not in entries]
+            if not changed and not removed and self.generation == generation:
+                return 0
+            try:
+                with self._connection:
+                    if self._synced:
+                        self._delete([entry.id for entry in changed] + removed)
+                    else:
+                        # Nothing loaded or synced yet (new root, or a rebuild): replace every row of the project
+                        for table in ITEM_TABLES:
+                            self._connection.execute(f"DELETE FROM {table} WHERE project = ?", (self.project,))
+                    self._insert(changed)
+                    self._mark(generation)
+            except sqlite3.Error as e:
+                # The in-memory index stays authoritative; the next refresh retries the same items
+                self.errors += 1
+                print(f"[MCP SERVER] Could not sync metadata store {self.db_path}: {e}")
+                return 0
+            self._synced = dict(entries)
+            self.generation = generation
+            self.synced += len(changed) + len(removed)
+            return len(changed) + len(removed)
+
+    def reset(self) -> None:
+        """Forgets what was synced, so the next `sync()` replaces every stored row of this project."""
+        with self._lock:
+            self._synced = {}
+            self.generation = 0
+
+    def check(self, entries: Dict[str, FeatureEntry]) -> Dict[str, Any]:
+        """
+        Consistency of the stored rows with the in-memory index: SQLite's own
+        integrity check, items missing from or extra in the store, and items
+        whose state, documents, phases or tasks differ.
+        """
+        with self._lock:
+            integrity = [row[0] for row in self._connection.execute("PRAGMA quick_check")]
+            stored = {entry.id: entry for entry in self._entries(self.project, "", ())}
+        missing = sorted(item_id for item_id in entries if item_id not in stored)
+        extra = sorted(item_id for item_id in stored if item_id not in entries)
+        stale = sorted(
+            item_id for item_id, entry in entries.items()
+            if item_id in stored and fingerprint(stored[item_id]) != fingerprint(entry)
+        )
+        return {
+            "consistent": integrity == ["ok"] and not missing and not extra and not stale,
+            "integrity": integrity,
+            "items": {"index": len(entries), "store": len(stored)},
+            "missing": missing,
+            "extra": extra,
+            "stale": stale,
+        }
+
+    def query(
+        self,
+        project: Optional[str] = None,
+        state: Optional[str] = None,
+        status: Optional[str] = None,
+        kind: Optional[str] = None,
+        parent_epic: Optional[str] = None,
+        commit: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Tuple[List[FeatureEntry], int]:
+        """
+        Same filters and order as `FeatureIndex.query()`, over any project in
+        the file, plus `commit`: items whose Git Commits tables reference a
+        hash starting with it. Returns one page of entries and the total.
+        """
+        project = project or self.project
+        clauses: List[str] = []
+        parameters: List[Any] = []
+        if state is not None:
+            states = [name for name in STATE_FOLDERS if matches_state(name, state)]
+            clauses.append(f"state IN ({', '.join('?' * len(states))})" if states else "0")
+            parameters.extend(states)
+        if status:
+            clauses.append("status = ?")
+            parameters.append(normalize_status(status))
+        if kind is not None:
+            clauses.append("kind = ?")
+            parameters.append(kind)
+        if parent_epic:
+            clauses.append("parent_epic = ?")
+            parameters.append(parent_epic.strip().upper())
+        if commit:
+            prefix = commit.strip().lower()
+            clauses.append("id IN (SELECT id FROM commits WHERE project = ? AND hash >= ? AND hash < ?)")
+            parameters.extend([project, prefix, prefix + "\uffff"])
+        where = "".join(f" AND {clause}" for clause in clauses)
+        with self._lock:
+            total = self._connection.execute(f"SELECT COUNT(*) FROM items WHERE project = ?{where}", (project, *parameters)).fetchone()[0]
+            page = self._entries(project, f"{where} ORDER BY state, number, id LIMIT ? OFFSET ?", (*parameters, limit, offset))
+        return page, total
+
+    def get(self, item_id: str, project: Optional[str] = None) -> Optional[FeatureEntry]:
+        """The stored entry for `item_id` in `project` (default: this server's), or None."""
+        with self._lock:
+            entries = self._entries(project or self.project, " AND id = ?", (item_id.strip().upper(),))
+        return entries[0] if entries else None
+
+    def projects(self) -> List[Dict[str, Any]]:
+        """Every project in the file, with its item counts per state and last sync time."""
+        with self._lock:
+            counts: Dict[str, Dict[str, int]] = {}
+            for row in self._connection.execute("SELECT project, state, COUNT(*) AS items FROM items GROUP BY project, state"):
+                counts.setdefault(row["project"], {})[row["state"]] = row["items"]
+            rows = self._connection.execute("SELECT project, generation, synced_at FROM projects ORDER BY project").fetchall()
+        return [
+            {"project": row["project"], "state_counts": counts.get(row["project"], {}), "generation": row["generation"], "synced_at": row["synced_at"]}
+            for row in rows
+        ]
+
+    def _entries(self, project: str, where: str, parameters: Iterable[Any]) -> List[FeatureEntry]:
+        """Entries for `SELECT ... FROM items WHERE project = ?<where>`, with their phases and tasks."""
+        rows = self._connection.execute(f"SELECT * FROM items WHERE project = ?{where}", (project, *parameters)).fetchall()
+        entries: Dict[str, FeatureEntry] = {}
+        for row in rows:
+            entry = FeatureEntry(row["id"], row["folder"], row["state"])
+            entry.title = row["title"]
+            entry.status = row["status"]
+            entry.parent_epic = row["parent_epic"]
+            entry.breakdown = json.loads(row["breakdown"])
+            entry.document_mtimes = json.loads(row["document_mtimes"])
+            entries[entry.id] = entry
+        if not entries:
+            return []
+        # Small pages filter on the IDs; whole-project loads read every child row once
+        if len(entries) <= 500:
+            scope = f" AND id IN ({', '.join('?' * len(entries))})"
+            scope_parameters: Tuple[Any, ...] = (project, *entries)
+        else:
+            scope, scope_parameters = "", (project,)
+        for row in self._connection.execute(f"SELECT id, depends_on FROM dependencies WHERE project = ?{scope} ORDER BY id, position", scope_parameters):
+            if row["id"] in entries:
+                entries[row["id"]].dependencies.append(row["depends_on"])
+        phases: Dict[Tuple[str, int], Phase] = {}
+        for row in self._connection.execute(f"SELECT * FROM phases WHERE project = ?{scope} ORDER BY id, number", scope_parameters):
+            if row["id"] in entries:
+                phase = Phase(row["number"], row["name"], row["status"], json.loads(row["hours"]))
+                phase.file = row["file"]
+                phases[(row["id"], row["number"])] = phase
+                entries[row["id"]].phases.append(phase)
+        for row in self._connection.execute(f"SELECT * FROM tasks WHERE project = ?{scope} ORDER BY id, phase, position", scope_parameters):
+            phase = phases.get((row["id"], row["phase"]))
+            if phase is not None:
+                phase.tasks.append({"id": row["task_id"], "title": row["title"], "status": row["status"]})
+        return list(entries.values())
+
+    def _delete(self, item_ids: List[str]) -> None:
+        for table in ITEM_TABLES:
+            self._connection.executemany(f"DELETE FROM {table} WHERE project = ? AND id = ?", [(self.project, item_id) for item_id in item_ids])
+
+    def _insert(self, entries: List[FeatureEntry]) -> None:
+        project = self.project
+        self._connection.executemany(
+            "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    project, entry.id, int(entry.id.split("-", 1)[1]), entry.kind, entry.state, entry.folder, entry.title,
+                    entry.status, entry.parent_epic, json.dumps(entry.breakdown), json.dumps(entry.document_mtimes),
+                )
+                for entry in entries
+            ],
+        )
+        self._connection.executemany(
+            "INSERT INTO dependencies VALUES (?, ?, ?, ?)",
+            [(project, entry.id, position, item_id) for entry in entries for position, item_id in enumerate(entry.dependencies)],
+        )
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO phases VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(project, entry.id, phase.number, phase.name, phase.status, phase.file, json.dumps(phase.hours)) for entry in entries for phase in entry.phases],
+        )
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (project, entry.id, phase.number, position, task["id"], task["title"], task["status"])
+                for entry in entries for phase in entry.phases for position, task in enumerate(phase.tasks)
+            ],
+        )
+        self._connection.executemany("INSERT INTO commits VALUES (?, ?, ?, ?, ?, ?)", [row for entry in entries for row in self._commits(entry)])
+
+    def _commits(self, entry: FeatureEntry) -> List[Tuple[Any, ...]]:
+        """Commit rows of the entry's phase files (task tables and the Phase Summary table)."""
+        rows: List[Tuple[Any, ...]] = []
+        for phase in entry.phases:
+            if phase.file is None:
+                continue
+            document = PhaseDocument(read_text(self.root / entry.path / phase.file))
+            for task in document.tasks:
+                rows.extend((self.project, entry.id, phase.number, commit.lower(), task["id"], line) for commit, line in task["commits"])
+            rows.extend((self.project, entry.id, phase.number, commit.lower(), None, line) for commit, _, line in document.summary_commits)
+        return rows
+
+    def _mark(self, generation: int) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?)",
+            (self.project, str(self.root.resolve()), generation, time.time()),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {"project": self.project, "items": len(self._synced), "generation": self.generation, "synced": self.synced, "errors": self.errors}
+
+
+def fingerprint(entry: FeatureEntry) -> Tuple[Any, ...]:
+    """What the store must agree on with the index for an item to be consistent."""
+    return (
+        entry.state, entry.folder, entry.title, entry.status, entry.parent_epic, tuple(entry.dependencies), entry.document_mtimes,
+        tuple((phase.number, phase.name, phase.status, phase.file, tuple(sorted(phase.hours.items())), tuple((task["id"], task["status"]) for task in phase.tasks)) for phase in entry.phases),
+    )
@@ -0,0 +1,183 @@
+import os
+import bisect
+import threading
+from typing import Optional, List, Any, Dict, Tuple, Callable, Iterable
+
+# --- Constants & Configuration ---
+# Set to 0 to turn request instrumentation off (`/metrics` then only carries the collected gauges)
+METRICS_ENABLED = os.environ.get("DEVCYCLE_METRICS_ENABLED", "1") not in ("0", "false", "no")
+
+# Histogram bucket upper bounds: seconds for latencies, bytes for payload sizes
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Prometheus text exposition format
+EXPOSITION_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (name, help, type, {label tuple: value}, label names): one metric family reported by a collector
+Sample = Tuple[str, str, str, Dict[Tuple[str, ...], float], Tuple[str, ...]]
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Histogram:
+    """
+    A histogram family with fixed buckets, one series per label tuple.
+    `observe()` is a bisect and three additions under a lock, so it can be
+    called on every request.
+    """
+
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self, lines: List[str]) -> None:
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} histogram")
+        with self._lock:
+            series = sorted((labels, (list(counts), total, count)) for labels, (counts, total, count) in self._series.items())
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = 'le="{}"'.format(bound if bound == "+Inf" else format_value(bound))
+                lines.append(f"{self.name}_bucket{format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.label_names, labels)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(self.label_names, labels)} {count}")
+
+
+class Counter:
+    """A counter family, one value per label tuple."""
+
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self, lines: List[str]) -> None:
+        with self._lock:
+            values = dict(self._values)
+        render_family(lines, (self.name, self.help, "counter", values, self.label_names))
+
+
+def render_family(lines: List[str], sample: Sample) -> None:
+    name, help, kind, values, label_names = sample
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in sorted(values.items()):
+        lines.append(f"{name}{format_labels(label_names, labels)} {format_value(value)}")
+
+
+class ServerMetrics:
+    """
+    Request metrics of the JSON-RPC server: latency and response size per
+    method and tool, JSON-RPC error codes, tool results flagged `isError`,
+    template render time and template reference outcomes, and bytes before
+    and after compression per encoding. Component gauges (cache hits, index
+    sizes, event-loop lag) are read from `collectors` at scrape time, so
+    nothing is computed for them on the request path.
+    """
+
+    def __init__(self, methods: Iterable[str] = (), tool_names: Iterable[str] = (), enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        # Unknown methods and tool names share one series each, so clients cannot grow the label set
+        self.methods = frozenset(methods)
+        self.tool_names = frozenset(tool_names)
+        self.collectors: List[Callable[[], List[Sample]]] = []
+        self.rpc_duration = Histogram("devcycle_rpc_duration_seconds", "JSON-RPC call latency, from dispatch to encoded response.", ("method", "tool"), LATENCY_BUCKETS)
+        self.rpc_response_size = Histogram("devcycle_rpc_response_bytes", "Encoded JSON-RPC response size before compression.", ("method", "tool"), SIZE_BUCKETS)
+        self.rpc_errors = Counter("devcycle_rpc_errors_total", "JSON-RPC error responses by error code.", ("method", "tool", "code"))
+        self.tool_errors = Counter("devcycle_tool_errors_total", "tools/call results with isError set.", ("tool",))
+        self.render_duration = Histogram("devcycle_template_render_seconds", "Procedure template render time.", ("template",), LATENCY_BUCKETS)
+        self.template_refs = Counter("devcycle_template_refs_total", "Procedure responses by template_ref status (unchanged = client copy reused).", ("status",))
+        self.http_body_size = Histogram("devcycle_http_response_bytes", "JSON-RPC endpoint response size before compression, per negotiated encoding.", ("encoding",), SIZE_BUCKETS)
+        self.http_sent_size = Histogram("devcycle_http_sent_bytes", "JSON-RPC endpoint response size as sent, per negotiated encoding.", ("encoding",), SIZE_BUCKETS)
+
+    def labels(self, method: str, params: Any) -> Tuple[str, str]:
+        """(method, tool) labels of a call; tool is empty outside `tools/call`."""
+        if method not in self.methods:
+            return "unknown", ""
+        if method != "tools/call":
+            return method, ""
+        name = params.get("name") if isinstance(params, dict) else None
+        return method, name if name in self.tool_names else "unknown"
+
+    def observe_call(self, labels: Tuple[str, str], seconds: float, size: int, error_code: Optional[int] = None, tool_error: bool = False) -> None:
+        if not self.enabled:
+            return
+        self.rpc_duration.observe(labels, seconds)
+        self.rpc_response_size.observe(labels, size)
+        if error_code is not None:
+            self.rpc_errors.inc((*labels, str(error_code)))
+        if tool_error:
+            self.tool_errors.inc((labels[1],))
+
+    def observe_render(self, template: str, seconds: float) -> None:
+        if self.enabled:
+            self.render_duration.observe((template,), seconds)
+
+    def observe_template_ref(self, status: str) -> None:
+        if self.enabled:
+            self.template_refs.inc((status,))
+
+    def observe_compression(self, encoding: str, body_size: int, sent_size: int) -> None:
+        if self.enabled:
+            self.http_body_size.observe((encoding,), body_size)
+            self.http_sent_size.observe((encoding,), sent_size)
+
+    def exposition(self) -> str:
+        """Every metric family in the Prometheus text format."""
+        lines: List[str] = []
+        for family in (
+            self.rpc_duration, self.rpc_response_size, self.rpc_errors, self.tool_errors,
+            self.render_duration, self.template_refs, self.http_body_size, self.http_sent_size,
+        ):
+            family.render(lines)
+        for collector in self.collectors:
+            for sample in collector():
+                render_family(lines, sample)
+        return "\n".join(lines) + "\n"
+
+
+def cache_samples(caches: Dict[str, Dict[str, Any]]) -> List[Sample]:
+    """`devcycle_cache_hits_total`/`_misses_total` from component `stats()` dicts with `hits` and `misses`."""
+    hits = {(name,): stats.get("hits", 0) for name, stats in caches.items()}
+    misses = {(name,): stats.get("misses", 0) for name, stats in caches.items()}
+    return [
+        ("devcycle_cache_hits_total", "Cache hits per server-side cache.", "counter", hits, ("cache",)),
+        ("devcycle_cache_misses_total", "Cache misses per server-side cache.", "counter", misses, ("cache",)),
+    ]
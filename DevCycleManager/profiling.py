@@ -0,0 +1,293 @@
+import os
+import time
+import hmac
+import random
+import itertools
+import threading
+import contextvars
+from collections import deque
+from typing import Optional, List, Any, Dict, Tuple, Callable
+
+# --- Constants & Configuration ---
+# Set to 1 to make profiling available (header trigger and /debug/profiles); off, the request path is untouched
+PROFILING_ENABLED = os.environ.get("DEVCYCLE_PROFILING", "0") in ("1", "true", "yes")
+
+# Fraction of calls profiled without the header (0 = only on request); adjustable at runtime
+DEFAULT_SAMPLE_RATE = float(os.environ.get("DEVCYCLE_PROFILING_SAMPLE_RATE", "0.0"))
+
+# Profiles kept in memory, most recent first
+MAX_PROFILES = int(os.environ.get("DEVCYCLE_PROFILING_MAX_PROFILES", "20"))
+
+# Shared secret required by the header trigger and the admin endpoints; profiling stays off without one
+PROFILING_TOKEN = os.environ.get("DEVCYCLE_PROFILING_TOKEN", "")
+
+# Request header asking for a profile, header carrying the token, response header with the profile ID
+PROFILE_HEADER = "x-devcycle-profile"
+TOKEN_HEADER = "x-devcycle-profile-token"
+PROFILE_ID_HEADER = "X-DevCycle-Profile-Id"
+
+# Frames kept per allocation traceback, allocation sites and functions listed in the JSON summary
+ALLOCATION_FRAMES = 32
+TOP_ENTRIES = 25
+
+# Folded stacks: deepest stack emitted, and paths below this many seconds are pruned
+MAX_STACK_DEPTH = 64
+MIN_STACK_SECONDS = 1e-6
+
+# The profile of the call the current task is serving; `run_blocking` profiles worker threads under it
+ACTIVE_PROFILE: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar("devcycle_active_profile", default=None)
+
+# pstats key: (filename, line, function name)
+FunctionKey = Tuple[str, int, str]
+
+
+def frame_label(function: FunctionKey) -> str:
+    """`name (file.py:12)`; `;` is the folded-stack separator, so it never appears in a label."""
+    filename, line, name = function
+    if filename == "~":
+        return name.replace(";", ",")
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ",")
+
+
+def folded_cpu_stacks(stats: Dict[FunctionKey, Tuple[Any, ...]]) -> Dict[str, float]:
+    """
+    Folded stacks (`root;caller;callee` -> self seconds) rebuilt from the
+    caller/callee edges of a cProfile run. A function's time is split among
+    its callers in proportion to each edge's cumulative time, as flameprof
+    does; the result is exact for call trees and an estimate where a
+    function is reached through several paths.
+    """
+    callees: Dict[FunctionKey, List[Tuple[FunctionKey, float]]] = {}
+    for function, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((function, edge[3]))
+    folded: Dict[str, float] = {}
+
+    def walk(function: FunctionKey, path: Tuple[str, ...], on_stack: frozenset, fraction: float) -> None:
+        _, _, self_seconds, total_seconds, _ = stats[function]
+        path = path + (frame_label(function),)
+        key = ";".join(path)
+        if self_seconds * fraction > 0:
+            folded[key] = folded.get(key, 0.0) + self_seconds * fraction
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        on_stack = on_stack | {function}
+        for callee, edge_seconds in callees.get(function, ()):
+            callee_total = stats[callee][3]
+            if callee in on_stack or not callee_total or fraction * edge_seconds < MIN_STACK_SECONDS:
+                continue
+            walk(callee, path, on_stack, fraction * edge_seconds / callee_total)
+
+    for function, (_, _, _, _, callers) in stats.items():
+        if not callers or all(caller == function for caller in callers):
+            walk(function, (), frozenset(), 1.0)
+    return folded
+
+
+class RequestProfile:
+    """
+    CPU profile and allocation diff of one JSON-RPC call: cProfile of the
+    event-loop thread plus every `run_blocking` call made for it, and the
+    tracemalloc difference between the start and the end of the call.
+    Profiled calls run one at a time, but a coroutine awaits on a shared
+    loop, so work of concurrent unprofiled calls can appear in the profile.
+    """
+
+    def __init__(self, profile_id: str, method: str, tool: str):
+        # Imported on first use: profiling is opt-in, and these would otherwise load on every server start
+        import cProfile
+        self.id = profile_id
+        self.method = method
+        self.tool = tool
+        self.created = time.time()
+        self.duration = 0.0
+        self.peak_bytes = 0
+        self.stats: Dict[FunctionKey, Tuple[Any, ...]] = {}
+        self.allocations: List[Tuple[Tuple[str, ...], int, int]] = []
+        self.threads = 0
+        self._profiler = cProfile.Profile()
+        self._thread_profilers: List[Any] = []
+        self._lock = threading.Lock()
+        self._started_tracing = False
+        self._snapshot: Optional[Any] = None
+        self._baseline = 0
+        self._started = 0.0
+        self._token: Optional[contextvars.Token] = None
+
+    def start(self) -> None:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(ALLOCATION_FRAMES)
+            self._started_tracing = True
+        self._snapshot = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        self._token = ACTIVE_PROFILE.set(self)
+        self._started = time.perf_counter()
+        self._profiler.enable()
+
+    def run_in_thread(self, func: Callable[[], Any]) -> Any:
+        """Runs `func` on a worker thread under its own profiler, merged into this profile at the end."""
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+: the call's profiler is process-wide and already sees this thread
+            return func()
+        try:
+            return func()
+        finally:
+            profiler.disable()
+            with self._lock:
+                self._thread_profilers.append(profiler)
+
+    def stop(self) -> None:
+        import pstats
+        import tracemalloc
+        self._profiler.disable()
+        self.duration = time.perf_counter() - self._started
+        ACTIVE_PROFILE.reset(self._token)
+        peak = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot()
+        if self._started_tracing:
+            tracemalloc.stop()
+        ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        before = self._snapshot.filter_traces(ignored)
+        self._snapshot = None
+        self.peak_bytes = max(0, peak - self._baseline)
+        differences = snapshot.filter_traces(ignored).compare_to(before, "traceback")
+        self.allocations = [
+            (tuple(f"{os.path.basename(frame.filename)}:{frame.lineno}" for frame in difference.traceback), difference.size_diff, difference.count_diff)
+            for difference in differences if difference.size_diff > 0
+        ]
+        with self._lock:
+            profilers = list(self._thread_profilers)
+        self.threads = len(profilers)
+        merged = pstats.Stats(self._profiler)
+        if profilers:
+            merged.add(*profilers)
+        self.stats = merged.stats
+        self._profiler = None
+        self._thread_profilers = []
+
+    def folded(self) -> str:
+        """CPU time as folded stacks in microseconds (flamegraph.pl, speedscope, inferno)."""
+        stacks = folded_cpu_stacks(self.stats)
+        return "".join(f"{stack} {round(seconds * 1e6)}\n" for stack, seconds in sorted(stacks.items()) if round(seconds * 1e6) > 0)
+
+    def folded_allocations(self) -> str:
+        """Bytes allocated and still held at the end of the call, as folded stacks (oldest frame first)."""
+        return "".join(f"{';'.join(frames)} {size}\n" for frames, size, _ in sorted(self.allocations))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "tool": self.tool or None,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.created)),
+            "duration_ms": round(self.duration * 1000, 3),
+            "peak_alloc_bytes": self.peak_bytes,
+            "worker_threads": self.threads,
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        """The summary with the top functions by cumulative and own time and the top allocation sites."""
+
+        def function(key: FunctionKey) -> Dict[str, Any]:
+            calls, _, self_seconds, total_seconds, _ = self.stats[key]
+            return {"function": frame_label(key), "calls": calls, "self_ms": round(self_seconds * 1000, 3), "cumulative_ms": round(total_seconds * 1000, 3)}
+
+        by_site: Dict[str, List[int]] = {}
+        for frames, size, count in self.allocations:
+            totals = by_site.setdefault(frames[-1] if frames else "?", [0, 0])
+            totals[0] += size
+            totals[1] += count
+        described = self.summary()
+        described["cumulative"] = [function(key) for key in sorted(self.stats, key=lambda key: self.stats[key][3], reverse=True)[:TOP_ENTRIES]]
+        described["self"] = [function(key) for key in sorted(self.stats, key=lambda key: self.stats[key][2], reverse=True)[:TOP_ENTRIES]]
+        described["allocations"] = [
+            {"site": site, "bytes": size, "blocks": count}
+            for site, (size, count) in sorted(by_site.items(), key=lambda item: item[1][0], reverse=True)[:TOP_ENTRIES]
+        ]
+        return described
+
+
+class RequestProfiler:
+    """
+    Opt-in per-call profiling. A call is profiled when it carries the
+    `X-DevCycle-Profile: 1` header or falls in the `sample_rate` fraction;
+    at most one call is profiled at a time (the others run unprofiled), and
+    the last `max_profiles` profiles are kept for `/debug/profiles`.
+    """
+
+    def __init__(self, sample_rate: float = DEFAULT_SAMPLE_RATE, max_profiles: int = MAX_PROFILES, token: str = PROFILING_TOKEN):
+        self.enabled = True
+        self.sample_rate = sample_rate
+        self.token = token
+        self.profiled = 0
+        self.skipped_busy = 0
+        self._profiles: deque = deque(maxlen=max_profiles)
+        self._ids = itertools.count(1)
+        self._busy = False
+        self._lock = threading.Lock()
+
+    def authorized(self, headers: Any) -> bool:
+        # No token configured authorizes nobody: the profiles expose arguments and code paths
+        return bool(self.token) and hmac.compare_digest(headers.get(TOKEN_HEADER, ""), self.token)
+
+    def wants(self, headers: Any) -> bool:
+        """Whether this call should be profiled: requested by header (with the token) or sampled."""
+        if not self.enabled:
+            return False
+        requested = headers.get(PROFILE_HEADER)
+        if requested is not None:
+            return requested.strip().lower() in ("1", "true", "yes") and self.authorized(headers)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def begin(self, method: str, tool: str = "") -> Optional[RequestProfile]:
+        """Starts profiling a call; None when another call is being profiled."""
+        with self._lock:
+            if self._busy:
+                self.skipped_busy += 1
+                return None
+            self._busy = True
+        profile = RequestProfile(str(next(self._ids)), method, tool)
+        try:
+            profile.start()
+        except ValueError:
+            # Another profiler (a debugger, coverage) holds the interpreter's profiling hook
+            with self._lock:
+                self._busy = False
+            return None
+        return profile
+
+    def finish(self, profile: RequestProfile) -> None:
+        try:
+            profile.stop()
+        finally:
+            with self._lock:
+                self._busy = False
+                self.profiled += 1
+                self._profiles.appendleft(profile)
+
+    def configure(self, enabled: Optional[bool] = None, sample_rate: Optional[float] = None) -> None:
+        if enabled is not None:
+            self.enabled = bool(enabled)
+        if sample_rate is not None:
+            self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        return next((profile for profile in list(self._profiles) if profile.id == profile_id), None)
+
+    def profiles(self) -> List[Dict[str, Any]]:
+        return [profile.summary() for profile in list(self._profiles)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "profiled": self.profiled,
+            "skipped_busy": self.skipped_busy,
+            "kept": len(self._profiles),
+        }
@@ -0,0 +1,419 @@
+import os
+import re
+import json
+import pickle
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, List, Any, Dict, Iterable, Tuple, Union
+
+# --- Constants & Configuration ---
+# `{{name}}` placeholders and `{{> fragment-name}}` includes inside prompt templates
+TOKEN_PATTERN = re.compile(r"\{\{(?:(\w+)|>\s*([\w.-]+)\s*)\}\}")
+
+# Markdown headings that delimit addressable sections (`#` is the document title)
+HEADING_PATTERN = re.compile(r"^(#{2,6})\s+(.+?)\s*#*\s*$")
+SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
+
+# File types served from the Prompts directory
+TEMPLATE_SUFFIXES = (".md", ".json")
+
+# Sub-directory of Prompts holding shared fragments (`{{> name}}` -> fragments/name.md)
+FRAGMENTS_DIR_NAME = "fragments"
+
+# MCP resource URI prefix under which raw templates are published
+TEMPLATE_URI_PREFIX = "devcycle://prompts/"
+
+# Seconds between mtime checks of the Prompts directory (0 disables hot reload)
+DEFAULT_RELOAD_INTERVAL = float(os.environ.get("PROMPTS_RELOAD_INTERVAL", "2.0"))
+
+# Templates precompiled at image build time (`python prompt_templates.py`); empty disables the bundle
+DEFAULT_BUNDLE_PATH = os.environ.get("DEVCYCLE_TEMPLATE_BUNDLE", str(Path(__file__).parent / "template-bundle.pickle"))
+
+# Bumped whenever compiled templates change shape; bundles of another version (or another build of this module) are ignored
+BUNDLE_VERSION = 1
+
+
+class Section:
+    """
+    A heading-delimited part of a template.
+    `id` is the slugified heading path (e.g. `phase-7-acceptance-handoff/if-workflow-mode-autonomous`);
+    the section spans chunks [first_chunk, last_chunk) including its subsections.
+    """
+
+    def __init__(self, id: str, title: str, level: int, first_chunk: int):
+        self.id = id
+        self.title = title
+        self.level = level
+        self.first_chunk = first_chunk
+        self.last_chunk = first_chunk + 1
+        self.size = 0
+
+    def describe(self) -> Dict[str, Any]:
+        return {"id": self.id, "title": self.title, "level": self.level, "size": self.size}
+
+
+def slugify(title: str) -> str:
+    return SLUG_PATTERN.sub("-", title.lower()).strip("-")
+
+
+class PromptTemplate:
+    """
+    A prompt file compiled into alternating literal and placeholder segments.
+    Rendering joins the segments in a single pass instead of chaining
+    `str.replace()` calls over the whole document. `hash` addresses the
+    expanded (include-resolved, unrendered) text, so clients can cache a
+    template and receive only the placeholder bindings while it stays unchanged.
+
+    Markdown templates are also indexed by heading (`##` and deeper, outside
+    code fences): the document is split into one chunk per heading, so any
+    subset of sections renders in a single pass as well.
+
+    `{{> name}}` includes are resolved at compile time to the shared compiled
+    fragment, so fragment text is held in memory once for all templates.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        source: str,
+        mtime_ns: int = 0,
+        fragments: Optional[Dict[str, "PromptTemplate"]] = None,
+        uri_prefix: str = TEMPLATE_URI_PREFIX,
+        index_sections: bool = True,
+    ):
+        self.name = name
+        self.source = source
+        self.mtime_ns = mtime_ns
+        self.uri = uri_prefix + name
+        # chunks[i] = (literals, tokens); literals[j] precedes tokens[j], the last literal closes the chunk.
+        # A token is a placeholder name (str) or an included fragment (PromptTemplate).
+        self.chunks: List[Tuple[List[str], List[Union[str, "PromptTemplate"]]]] = []
+        self.sections: List[Section] = []
+        self.section_index: Dict[str, Section] = {}
+        self.includes: List[str] = []
+        self.missing_includes: List[str] = []
+        self._json: Any = None
+        self._compile(fragments or {}, index_sections and name.endswith(".md"))
+        self.hash = hashlib.sha256(self.expanded_source().encode("utf-8")).hexdigest()[:32]
+
+    def _compile(self, fragments: Dict[str, "PromptTemplate"], index_sections: bool) -> None:
+        boundaries = [0]
+        headings = []
+        if index_sections:
+            in_fence = False
+            offset = 0
+            for line in self.source.splitlines(keepends=True):
+                if line.lstrip().startswith(("```", "~~~")):
+                    in_fence = not in_fence
+                elif not in_fence:
+                    match = HEADING_PATTERN.match(line)
+                    if match:
+                        if offset > 0:
+                            boundaries.append(offset)
+                        headings.append((len(boundaries) - 1, len(match.group(1)), match.group(2).strip()))
+                offset += len(line)
+        boundaries.append(len(self.source))
+
+        for chunk_start, chunk_end in zip(boundaries, boundaries[1:]):
+            self.chunks.append(self._compile_chunk(self.source[chunk_start:chunk_end], fragments))
+
+        # Build the section tree: a section ends where a heading of the same or higher level starts
+        open_sections: List[Section] = []
+        for chunk_index, level, title in headings:
+            while open_sections and open_sections[-1].level >= level:
+                open_sections.pop().last_chunk = chunk_index
+            parent = open_sections[-1].id + "/" if open_sections else ""
+            section_id = parent + slugify(title)
+            if section_id in self.section_index:
+                suffix = 2
+                while f"{section_id}-{suffix}" in self.section_index:
+                    suffix += 1
+                section_id = f"{section_id}-{suffix}"
+            section = Section(section_id, title, level, chunk_index)
+            self.sections.append(section)
+            self.section_index[section_id] = section
+            open_sections.append(section)
+        for section in open_sections:
+            section.last_chunk = len(self.chunks)
+
+        # Sizes are measured on the expanded text the client actually receives
+        chunk_sizes = [len("".join(self._render_chunks([index], {}, set()))) for index in range(len(self.chunks))]
+        for section in self.sections:
+            section.size = sum(chunk_sizes[section.first_chunk:section.last_chunk])
+
+    def _compile_chunk(self, text: str, fragments: Dict[str, "PromptTemplate"]) -> Tuple[List[str], List[Union[str, "PromptTemplate"]]]:
+        literals: List[str] = []
+        tokens: List[Union[str, PromptTemplate]] = []
+        pending = ""
+        position = 0
+        for match in TOKEN_PATTERN.finditer(text):
+            placeholder, include = match.group(1), match.group(2)
+            if include is not None:
+                fragment = fragments.get(include)
+                if fragment is None:
+                    # Unknown fragment: keep the marker visible rather than dropping content silently
+                    self.missing_includes.append(include)
+                    pending += text[position:match.end()]
+                    position = match.end()
+                    continue
+                if include not in self.includes:
+                    self.includes.append(include)
+                token: Union[str, PromptTemplate] = fragment
+            else:
+                token = placeholder
+            literals.append(pending + text[position:match.start()])
+            tokens.append(token)
+            pending = ""
+            position = match.end()
+        literals.append(pending + text[position:])
+        return literals, tokens
+
+    @property
+    def placeholders(self) -> List[str]:
+        """Distinct placeholder names (including those of included fragments) in order of first appearance."""
+        names: List[str] = []
+        for _, tokens in self.chunks:
+            for token in tokens:
+                names.extend([token] if isinstance(token, str) else token.placeholders)
+        return list(dict.fromkeys(names))
+
+    def expanded_source(self) -> str:
+        """The template text with includes resolved and placeholders left as `{{name}}`."""
+        return self.render({})
+
+    def render(self, values: Dict[str, str], omit: Optional[Iterable[str]] = None, inline_includes: bool = True) -> str:
+        """
+        Substitutes `values` into the template in one pass.
+        Placeholders without a value are left untouched, matching the
+        behavior of the previous `str.replace()` chains. Sections whose ids
+        are listed in `omit` (with their subsections) are left out.
+        With `inline_includes=False`, `{{> name}}` markers are kept for the
+        client to resolve from its cached fragment resources.
+        """
+        return "".join(self._render_chunks(range(len(self.chunks)), values, self._omitted_chunks(omit), inline_includes))
+
+    def render_section(self, section_id: str, values: Dict[str, str]) -> Optional[str]:
+        """Renders a single section (with its subsections), or None if the id is unknown."""
+        section = self.section_index.get(section_id)
+        if section is None:
+            return None
+        return "".join(self._render_chunks(range(section.first_chunk, section.last_chunk), values, set()))
+
+    def _omitted_chunks(self, omit: Optional[Iterable[str]]) -> set:
+        skipped = set()
+        for section_id in omit or ():
+            section = self.section_index.get(section_id)
+            if section is not None:
+                skipped.update(range(section.first_chunk, section.last_chunk))
+        return skipped
+
+    def _render_chunks(self, indexes: Iterable[int], values: Dict[str, str], skipped: set, inline_includes: bool = True) -> List[str]:
+        parts: List[str] = []
+        for index in indexes:
+            if index in skipped:
+                continue
+            literals, tokens = self.chunks[index]
+            parts.append(literals[0])
+            for token, literal in zip(tokens, literals[1:]):
+                if isinstance(token, str):
+                    value = values.get(token)
+                    parts.append("{{" + token + "}}" if value is None else value)
+                elif inline_includes:
+                    parts.extend(token._render_chunks(range(len(token.chunks)), values, set()))
+                else:
+                    parts.append("{{> " + token.name[:-len(".md")] + "}}")
+                parts.append(literal)
+        return parts
+
+    def json(self) -> Any:
+        """Parsed JSON document (for `.json` configuration files)."""
+        if self._json is None:
+            self._json = json.loads(self.source)
+        return self._json
+
+
+class PromptTemplateRegistry:
+    """
+    In-memory cache of every file in the Prompts directory.
+    All templates are loaded and compiled once; afterwards `refresh()` re-reads
+    only files whose mtime changed. Lookups never touch the filesystem, so the
+    server runs `refresh()` every `reload_interval` seconds off the event loop.
+    Shared fragments live in `Prompts/fragments/`; when one changes, every
+    template including it is recompiled.
+    A precompiled bundle (see `save_bundle()`) seeds the cache at startup;
+    the first `refresh()` then recompiles only files whose mtime differs
+    from the bundled copy.
+    """
+
+    def __init__(self, directory: Path, reload_interval: float = DEFAULT_RELOAD_INTERVAL, bundle_path: Optional[str] = DEFAULT_BUNDLE_PATH):
+        self.directory = Path(directory)
+        self.reload_interval = reload_interval
+        self.bundle_path = Path(bundle_path) if bundle_path else None
+        self.bundled = 0
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._fragments: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+        self._load_bundle()
+        self.refresh()
+
+    def refresh(self) -> List[str]:
+        """
+        Re-reads added or modified template files and drops deleted ones.
+        Returns the names of the templates (and fragments) that changed.
+        """
+        with self._lock:
+            fragment_sources, changed_fragments = self._scan(
+                self.directory / FRAGMENTS_DIR_NAME, {name + ".md": fragment for name, fragment in self._fragments.items()}, (".md",)
+            )
+            if changed_fragments:
+                self._compile_fragments(fragment_sources)
+
+            template_sources, changed = self._scan(self.directory, self._templates, TEMPLATE_SUFFIXES)
+            for name, (source, mtime_ns) in template_sources.items():
+                current = self._templates.get(name)
+                stale_include = (
+                    changed_fragments and current is not None
+                    and (current.includes or current.missing_includes)
+                )
+                if current is None or current.mtime_ns != mtime_ns or stale_include:
+                    if source is None:
+                        with open(self.directory / name, "r", encoding="utf-8") as f:
+                            source = f.read()
+                    template = PromptTemplate(name, source, mtime_ns, self._fragments)
+                    if template.missing_includes:
+                        print(f"[MCP SERVER] {name}: unknown fragment(s) {', '.join(template.missing_includes)}")
+                    self._templates[name] = template
+                    if name not in changed:
+                        changed.append(name)
+            for name in [name for name in self._templates if name not in template_sources]:
+                del self._templates[name]
+
+            return [FRAGMENTS_DIR_NAME + "/" + name for name in changed_fragments] + changed
+
+    def _scan(self, directory: Path, current: Dict[str, PromptTemplate], suffixes: Tuple[str, ...]) -> Tuple[Dict[str, Tuple[Optional[str], int]], List[str]]:
+        """
+        Lists `directory` and reads only files whose mtime changed.
+        Returns {file name: (source or None if unchanged, mtime_ns)} and the changed names.
+        """
+        sources: Dict[str, Tuple[Optional[str], int]] = {}
+        changed: List[str] = []
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            entries = []
+
+        for entry in entries:
+            if not entry.is_file() or not entry.name.endswith(suffixes):
+                continue
+            mtime_ns = entry.stat().st_mtime_ns
+            known = current.get(entry.name)
+            if known is not None and known.mtime_ns == mtime_ns:
+                sources[entry.name] = (None, mtime_ns)
+                continue
+            with open(entry.path, "r", encoding="utf-8") as f:
+                sources[entry.name] = (f.read(), mtime_ns)
+            changed.append(entry.name)
+
+        changed.extend(name for name in current if name not in sources)
+        return sources, changed
+
+    def _compile_fragments(self, sources: Dict[str, Tuple[Optional[str], int]]) -> None:
+        """
+        Recompiles every fragment (fragments may include other fragments).
+        Fragments are compiled in dependency order; include cycles are left unresolved.
+        """
+        raw: Dict[str, Tuple[str, int]] = {}
+        for file_name, (source, mtime_ns) in sources.items():
+            name = file_name[:-len(".md")]
+            if source is None:
+                with open(self.directory / FRAGMENTS_DIR_NAME / file_name, "r", encoding="utf-8") as f:
+                    source = f.read()
+            raw[name] = (source, mtime_ns)
+
+        compiled: Dict[str, PromptTemplate] = {}
+        visiting = set()
+
+        def compile_fragment(name: str) -> None:
+            if name in compiled or name in visiting or name not in raw:
+                return
+            visiting.add(name)
+            source, mtime_ns = raw[name]
+            # The include marker sits on its own line, so the file's final newline is not repeated
+            if source.endswith("\n"):
+                source = source[:-1]
+            for match in TOKEN_PATTERN.finditer(source):
+                if match.group(2):
+                    compile_fragment(match.group(2))
+            compiled[name] = PromptTemplate(
+                name + ".md", source, mtime_ns, compiled,
+                uri_prefix=TEMPLATE_URI_PREFIX + FRAGMENTS_DIR_NAME + "/", index_sections=False
+            )
+            visiting.discard(name)
+
+        for name in raw:
+            compile_fragment(name)
+        self._fragments = compiled
+
+    def _bundle_key(self) -> Dict[str, Any]:
+        return {
+            "version": BUNDLE_VERSION,
+            "module_mtime_ns": os.stat(__file__).st_mtime_ns,
+            "directory": str(self.directory.resolve()),
+        }
+
+    def _load_bundle(self) -> None:
+        if self.bundle_path is None:
+            return
+        try:
+            with open(self.bundle_path, "rb") as f:
+                bundle = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            # A truncated or foreign bundle only costs the compile it was meant to save
+            print(f"[MCP SERVER] Ignoring template bundle {self.bundle_path}: {e}")
+            return
+        if not isinstance(bundle, dict) or bundle.get("key") != self._bundle_key():
+            return
+        self._fragments = bundle["fragments"]
+        self._templates = bundle["templates"]
+        self.bundled = len(self._templates)
+
+    def save_bundle(self, path: Optional[Path] = None) -> Path:
+        """Writes the compiled templates and fragments for `_load_bundle()` (run at image build time, next to the Prompts it was built from)."""
+        path = Path(path or self.bundle_path)
+        with self._lock:
+            bundle = {"key": self._bundle_key(), "fragments": self._fragments, "templates": self._templates}
+            temporary = path.with_name(path.name + ".tmp")
+            with open(temporary, "wb") as f:
+                pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+        return path
+
+    def get(self, name: str) -> Optional[PromptTemplate]:
+        """Returns the compiled template for `name`, or None if it does not exist."""
+        return self._templates.get(name)
+
+    def get_fragment(self, name: str) -> Optional[PromptTemplate]:
+        """Returns the compiled fragment included as `{{> name}}`, or None if it does not exist."""
+        return self._fragments.get(name)
+
+    def names(self) -> List[str]:
+        return sorted(self._templates)
+
+    def fragment_names(self) -> List[str]:
+        return sorted(self._fragments)
+
+
+if __name__ == "__main__":
+    import argparse
+    # Compiled through the importable module, so the bundle refers to `prompt_templates.PromptTemplate`, not `__main__`
+    import prompt_templates
+    parser = argparse.ArgumentParser(description="Precompile the Prompts directory into a template bundle loaded at server startup.")
+    parser.add_argument("--prompts", default=str(Path(__file__).parent / "Prompts"))
+    parser.add_argument("--output", default=DEFAULT_BUNDLE_PATH or str(Path(__file__).parent / "template-bundle.pickle"))
+    arguments = parser.parse_args()
+    registry = prompt_templates.PromptTemplateRegistry(Path(arguments.prompts), bundle_path=None)
+    written = registry.save_bundle(Path(arguments.output))
+    print(f"Wrote {len(registry.names())} templates and {len(registry.fragment_names())} fragments to {written}")
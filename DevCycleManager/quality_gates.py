@@ -0,0 +1,376 @@
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Optional, List, Any, Dict, Tuple
+
+from memory_bank import (
+    CLIENT_ROOT, DONE_STATUSES, FIELD_PATTERN, PHASE_FILE_PATTERN, PHASES_DIR, TASK_HEADING_PATTERN, TASKS_FILE,
+    FeatureIndex, normalize_status, read_text,
+)
+
+# --- Constants & Configuration ---
+# Task statuses written by continue-implementation and accept-phase
+TASK_STATUSES = ("PENDING", "IN_PROGRESS", "COMPLETED", "SKIPPED")
+
+# Phase file status -> Phase Summary statuses that agree with it (besides the same status)
+COMPATIBLE_SUMMARY_STATUSES = {
+    "AWAITING_USER_ACCEPTANCE": ("IN_PROGRESS",),
+}
+
+# Checkpoint statuses meaning the checkpoint was never filled
+UNFILLED_CHECKPOINT = ("", "NOT_STARTED", "NOTSTARTED")
+FILLED_CHECKPOINT = ("COMPLETE", "COMPLETED")
+
+# Code Review History statuses that let a phase complete; `NOT_STARTED` rows are template placeholders
+APPROVED_REVIEWS = ("APPROVED", "APPROVED_WITH_NOTES")
+PLACEHOLDER_REVIEWS = ("", "-", "NOT_STARTED")
+
+# Short or full commit hashes in Git Commits tables (`-` rows are placeholders)
+COMMIT_HASH_PATTERN = re.compile(r"^[0-9a-f]{7,40}$", re.IGNORECASE)
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*$")
+
+# Gates in report order; each maps to a row of the accept-phase validation table
+GATES = (
+    "phase-status",
+    "summary-agreement",
+    "tasks",
+    "skip-justification",
+    "task-commits",
+    "summary-commits",
+    "checkpoint",
+    "code-review",
+)
+
+
+class PhaseDocument:
+    """
+    The parts of a phase file the quality gates look at, with 1-based line
+    numbers: header status, tasks (status, skip reason, Git Commits rows),
+    the Phase Checkpoint status, the Phase Summary commits and the Code
+    Review History rows.
+    """
+
+    def __init__(self, text: str):
+        self.status = ""
+        self.status_line: Optional[int] = None
+        self.tasks: List[Dict[str, Any]] = []
+        self.checkpoint_line: Optional[int] = None
+        self.checkpoint_status = ""
+        self.checkpoint_status_line: Optional[int] = None
+        self.summary_commits: List[Tuple[str, str, int]] = []
+        self.declared_commits: Optional[int] = None
+        self.declared_commits_line: Optional[int] = None
+        self.reviews: List[Tuple[str, int]] = []
+        self._parse(text)
+
+    def _parse(self, text: str) -> None:
+        section: Optional[str] = "header"
+        task: Optional[Dict[str, Any]] = None
+        columns: Optional[List[str]] = None
+        in_fence = False
+        for number, line in enumerate(text.splitlines(), start=1):
+            if line.lstrip().startswith("```"):
+                in_fence = not in_fence
+                continue
+            if in_fence:
+                continue
+            heading = HEADING_PATTERN.match(line)
+            if heading:
+                columns = None
+                level, title = len(heading.group(1)), heading.group(2).lower()
+                if level == 1:
+                    continue
+                task_heading = TASK_HEADING_PATTERN.match(line)
+                if task_heading:
+                    task = {"id": task_heading.group(1), "title": task_heading.group(2), "line": number,
+                            "status": "", "status_line": None, "skip_reason": None, "commits": []}
+                    self.tasks.append(task)
+                    section = "task"
+                elif title.startswith("phase checkpoint"):
+                    task, section = None, "checkpoint"
+                    self.checkpoint_line = number
+                elif "git commits (phase summary)" in title:
+                    section = "summary-commits"
+                elif "code review history" in title:
+                    section = "reviews"
+                elif level <= 3 or section == "task":
+                    task = None
+                    section = "checkpoint-body" if self.checkpoint_line is not None and level > 2 else None
+                continue
+
+            if line.startswith("|"):
+                cells = [cell.strip().strip("`") for cell in line.strip().strip("|").split("|")]
+                if columns is None:
+                    columns = [cell.lower() for cell in cells]
+                elif not all(set(cell) <= set("-: ") for cell in cells):
+                    self._row(section, task, dict(zip(columns, cells)), number)
+                continue
+            columns = None
+
+            field = FIELD_PATTERN.match(line)
+            if field is None:
+                continue
+            name, value = field.group(1).strip().lower(), field.group(2)
+            if name == "total commits in phase":
+                digits = re.search(r"\d+", value)
+                self.declared_commits = int(digits.group(0)) if digits else None
+                self.declared_commits_line = number
+            elif name == "status" and section == "header" and not self.status_line:
+                self.status, self.status_line = normalize_status(value), number
+            elif name == "status" and section == "checkpoint" and not self.checkpoint_status_line:
+                self.checkpoint_status, self.checkpoint_status_line = normalize_status(value), number
+            elif task is not None and name == "status" and task["status_line"] is None:
+                task["status"], task["status_line"] = normalize_status(value), number
+            elif task is not None and name == "skip reason":
+                task["skip_reason"] = value
+
+    def _row(self, section: Optional[str], task: Optional[Dict[str, Any]], row: Dict[str, str], number: int) -> None:
+        commit = row.get("commit hash")
+        if commit is not None and COMMIT_HASH_PATTERN.match(commit):
+            if section == "task" and task is not None:
+                task["commits"].append((commit.lower(), number))
+            elif section == "summary-commits":
+                self.summary_commits.append((commit.lower(), row.get("task", ""), number))
+        elif section == "reviews" and "status" in row:
+            self.reviews.append((normalize_status(row["status"]), number))
+
+
+class QualityGateValidator:
+    """
+    Deterministic checks of a phase's Markdown before acceptance (and of every
+    phase before completion): phase file vs `FeatureTasks.md` status agreement,
+    task statuses and skip justifications, task and Phase Summary Git Commits
+    tables, the Phase Checkpoint and the Code Review History.
+    Every finding carries the client path and line to fix. Parsed documents are
+    cached by (mtime_ns, size), so unchanged files are parsed once.
+    Validation stats and reads files, so callers run it off the event loop.
+    Build, lint and test gates still need the client to run its commands.
+    """
+
+    def __init__(self, root: Path, feature_index: FeatureIndex):
+        self.root = Path(root)
+        self.feature_index = feature_index
+        # absolute path -> (mtime_ns, size, parsed document)
+        self._documents: Dict[str, Tuple[int, int, Any]] = {}
+        self._lock = threading.Lock()
+        self.runs = 0
+
+    def validate_phase(self, feature_id: str, phase_number: int) -> Optional[Dict[str, Any]]:
+        """
+        Gate report for accepting phase `phase_number` of `feature_id` (the phase
+        must be AWAITING_USER_ACCEPTANCE), or None if the feature is not indexed.
+        """
+        entry = self.feature_index.get(feature_id)
+        if entry is None:
+            return None
+        self.runs += 1
+        report = self._phase_report(entry.path, int(phase_number), expected=("AWAITING_USER_ACCEPTANCE",))
+        return {"feature_id": entry.id, **report}
+
+    def validate_feature(self, feature_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Gate report for completing `feature_id`: every phase of the Phase Summary
+        (and every phase file) must be COMPLETED or SKIPPED and pass its gates.
+        """
+        entry = self.feature_index.get(feature_id)
+        if entry is None:
+            return None
+        self.runs += 1
+        numbers = sorted(set(self._phase_files(entry.path)) | set(self._summary_rows(entry.path)))
+        phases = [self._phase_report(entry.path, number, expected=DONE_STATUSES) for number in numbers]
+        findings = [finding for phase in phases for finding in phase["findings"]]
+        return {
+            "feature_id": entry.id,
+            "passed": bool(phases) and all(phase["passed"] for phase in phases),
+            "gates": {gate: worst(phase["gates"][gate] for phase in phases) if phases else "fail" for gate in GATES},
+            "phases": [
+                {key: phase[key] for key in ("phase", "file", "status", "passed", "tasks")}
+                for phase in phases
+            ],
+            "findings": findings if phases else [self._finding("phase-status", "fail", "No phases found in FeatureTasks.md or Phases/", entry.path + TASKS_FILE)],
+        }
+
+    def commit_references(self, feature_id: str, phase_number: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Commit hashes written in the Git Commits tables of one phase (or of every
+        phase), as `{"commit", "path", "line", "table"}`; None if the feature is not indexed.
+        """
+        entry = self.feature_index.get(feature_id)
+        if entry is None:
+            return None
+        references: List[Dict[str, Any]] = []
+        for number, phase_file in sorted(self._phase_files(entry.path).items()):
+            if phase_number is not None and number != int(phase_number):
+                continue
+            path = entry.path + phase_file
+            document = self._document(path)
+            for task in document.tasks:
+                references.extend(
+                    {"commit": commit, "path": f"{CLIENT_ROOT}/{path}", "line": line, "table": f"Task {task['id']}"}
+                    for commit, line in task["commits"]
+                )
+            references.extend(
+                {"commit": commit, "path": f"{CLIENT_ROOT}/{path}", "line": line, "table": "Phase Summary"}
+                for commit, _, line in document.summary_commits
+            )
+        return references
+
+    def _phase_report(self, feature_path: str, number: int, expected: Tuple[str, ...]) -> Dict[str, Any]:
+        findings: List[Dict[str, Any]] = []
+
+        def add(gate: str, result: str, message: str, path: str, line: Optional[int] = None) -> None:
+            findings.append(self._finding(gate, result, message, path, line))
+
+        tasks_path = feature_path + TASKS_FILE
+        summary = self._summary_rows(feature_path).get(number)
+        phase_file = self._phase_files(feature_path).get(number)
+        if phase_file is None:
+            add("phase-status", "fail", f"Phase file {PHASES_DIR}/phase-{number}-*.md not found", feature_path + PHASES_DIR + "/")
+            return self._summarize(number, None, summary[0] if summary else "", findings, [])
+
+        path = feature_path + phase_file
+        document = self._document(path)
+        status = document.status
+        if not status:
+            add("phase-status", "fail", "Phase file has no **Status** field", path, 1)
+        elif status not in expected:
+            add("phase-status", "fail", f"Phase status is {status}, expected {' or '.join(expected)}", path, document.status_line)
+
+        if summary is None:
+            add("summary-agreement", "fail", f"No Phase Summary row for phase {number}", tasks_path)
+        elif status and summary[0] != status and summary[0] not in COMPATIBLE_SUMMARY_STATUSES.get(status, ()):
+            add("summary-agreement", "fail", f"Phase Summary says {summary[0] or '(empty)'} but the phase file says {status} (line {document.status_line})", tasks_path, summary[1])
+
+        if status == "SKIPPED":
+            return self._summarize(number, phase_file, status, findings, document.tasks)
+
+        if not document.tasks:
+            add("tasks", "warn", "No `### Task N.M:` headings found", path, 1)
+        for task in document.tasks:
+            label = f"Task {task['id']}"
+            if task["status_line"] is None:
+                add("tasks", "fail", f"{label} has no **Status** field", path, task["line"])
+            elif task["status"] not in TASK_STATUSES:
+                add("tasks", "fail", f"{label} has unknown status {task['status']} (expected {', '.join(TASK_STATUSES)})", path, task["status_line"])
+            elif task["status"] not in DONE_STATUSES:
+                add("tasks", "fail", f"{label} is {task['status']}: must be COMPLETED or SKIPPED", path, task["status_line"])
+            if task["status"] == "SKIPPED" and not task["skip_reason"]:
+                add("skip-justification", "fail", f"{label} is SKIPPED without a **Skip Reason**", path, task["status_line"])
+            if task["status"] == "COMPLETED" and not task["commits"]:
+                add("task-commits", "warn", f"{label} is COMPLETED with no commits in its Git Commits table (required if it changed code)", path, task["line"])
+
+        summary_hashes = {commit for commit, _, _ in document.summary_commits}
+        for task in document.tasks:
+            for commit, line in task["commits"]:
+                if not any(known.startswith(commit) or commit.startswith(known) for known in summary_hashes):
+                    add("summary-commits", "fail", f"Commit {commit} of Task {task['id']} is missing from Git Commits (Phase Summary)", path, line)
+        if document.declared_commits is not None and document.declared_commits != len(document.summary_commits):
+            add("summary-commits", "fail", f"**Total Commits in Phase** is {document.declared_commits} but the Phase Summary lists {len(document.summary_commits)}", path, document.declared_commits_line)
+
+        if document.checkpoint_line is None:
+            add("checkpoint", "fail", "No `## Phase Checkpoint` section", path)
+        elif document.checkpoint_status in UNFILLED_CHECKPOINT:
+            add("checkpoint", "fail", "Checkpoint not filled (status NOT STARTED)", path, document.checkpoint_status_line or document.checkpoint_line)
+        elif document.checkpoint_status not in FILLED_CHECKPOINT:
+            add("checkpoint", "warn", f"Checkpoint status is {document.checkpoint_status}, expected Complete", path, document.checkpoint_status_line)
+
+        reviews = [review for review in document.reviews if review[0] not in PLACEHOLDER_REVIEWS]
+        if not reviews:
+            add("code-review", "warn", "No code review recorded (required for phases with code changes)", path, document.checkpoint_line)
+        elif reviews[-1][0] not in APPROVED_REVIEWS:
+            add("code-review", "fail", f"Latest code review is {reviews[-1][0]}: must be APPROVED or APPROVED_WITH_NOTES", path, reviews[-1][1])
+
+        report = self._summarize(number, phase_file, status, findings, document.tasks)
+        report["commits"] = {
+            "tasks": sum(len(task["commits"]) for task in document.tasks),
+            "summary": len(document.summary_commits),
+            "declared": document.declared_commits,
+        }
+        return report
+
+    def _summarize(self, number: int, phase_file: Optional[str], status: str, findings: List[Dict[str, Any]], tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        gates = {gate: worst(finding["result"] for finding in findings if finding["gate"] == gate) for gate in GATES}
+        counts = {status: 0 for status in TASK_STATUSES}
+        for task in tasks:
+            counts[task["status"]] = counts.get(task["status"], 0) + 1
+        return {
+            "phase": number,
+            "file": phase_file,
+            "status": status,
+            "passed": all(result != "fail" for result in gates.values()),
+            "gates": gates,
+            "tasks": {"total": len(tasks), **{status.lower(): count for status, count in counts.items()}},
+            "findings": findings,
+        }
+
+    @staticmethod
+    def _finding(gate: str, result: str, message: str, path: str, line: Optional[int] = None) -> Dict[str, Any]:
+        finding: Dict[str, Any] = {"gate": gate, "result": result, "message": message, "path": f"{CLIENT_ROOT}/{path}"}
+        if line is not None:
+            finding["line"] = line
+        return finding
+
+    def _phase_files(self, feature_path: str) -> Dict[int, str]:
+        try:
+            names = os.listdir(self.root / feature_path / PHASES_DIR)
+        except FileNotFoundError:
+            return {}
+        files: Dict[int, str] = {}
+        for name in sorted(names):
+            match = PHASE_FILE_PATTERN.match(name)
+            if match:
+                files.setdefault(int(match.group(1)), f"{PHASES_DIR}/{name}")
+        return files
+
+    def _summary_rows(self, feature_path: str) -> Dict[int, Tuple[str, int]]:
+        """Phase number -> (status, line) of the `FeatureTasks.md` Phase Summary rows."""
+        return self._parsed(feature_path + TASKS_FILE, parse_summary_rows)
+
+    def _document(self, path: str) -> PhaseDocument:
+        return self._parsed(path, PhaseDocument)
+
+    def _parsed(self, path: str, parse: Any) -> Any:
+        full_path = self.root / path
+        try:
+            stat = os.stat(full_path)
+        except FileNotFoundError:
+            return parse("")
+        key = f"{parse.__name__}:{full_path}"
+        cached = self._documents.get(key)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        parsed = parse(read_text(full_path))
+        with self._lock:
+            self._documents[key] = (stat.st_mtime_ns, stat.st_size, parsed)
+        return parsed
+
+    def stats(self) -> Dict[str, int]:
+        return {"runs": self.runs, "cached_documents": len(self._documents)}
+
+
+def parse_summary_rows(text: str) -> Dict[int, Tuple[str, int]]:
+    rows: Dict[int, Tuple[str, int]] = {}
+    columns: Optional[List[str]] = None
+    in_section = False
+    for number, line in enumerate(text.splitlines(), start=1):
+        if line.startswith("## "):
+            in_section = line[3:].strip().lower() == "phase summary"
+            columns = None
+            continue
+        if not in_section or not line.startswith("|"):
+            continue
+        cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+        if columns is None:
+            columns = [cell.lower() for cell in cells]
+            continue
+        row = dict(zip(columns, cells))
+        if row.get("phase", "").isdigit():
+            rows.setdefault(int(row["phase"]), (normalize_status(row.get("status", "")), number))
+    return rows
+
+
+def worst(results: Any) -> str:
+    """`fail` over `warn` over `pass`."""
+    results = set(results)
+    return "fail" if "fail" in results else "warn" if "warn" in results else "pass"
@@ -0,0 +1,230 @@
+import os
+import time
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Callable, Any, Dict, List, Tuple, Iterable
+
+from profiling import ACTIVE_PROFILE
+
+# --- Constants & Configuration ---
+# Upper bound on threads used for filesystem access off the event loop
+IO_WORKERS = int(os.environ.get("DEVCYCLE_IO_WORKERS", "4"))
+
+# Seconds between event-loop lag probes
+LAG_PROBE_INTERVAL = float(os.environ.get("DEVCYCLE_LAG_PROBE_INTERVAL", "0.5"))
+
+# Lag (seconds) above which a probe counts as a stall
+LAG_STALL_THRESHOLD = float(os.environ.get("DEVCYCLE_LAG_STALL_THRESHOLD", "0.1"))
+
+# Bounded pool shared by every blocking call on the request path
+IO_EXECUTOR = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="devcycle-io")
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Runs a blocking (filesystem) call on the bounded I/O pool so a slow
+    volume never stalls the single event loop serving every client.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    profile = ACTIVE_PROFILE.get()
+    if profile is not None:
+        # The call being profiled continues on the worker thread
+        call = functools.partial(profile.run_in_thread, call)
+    return await loop.run_in_executor(IO_EXECUTOR, call)
+
+
+class EventLoopLagMonitor:
+    """
+    Measures how late the event loop wakes up from a fixed-interval sleep.
+    Any lag is time during which no request could make progress.
+    """
+
+    def __init__(self, interval: float = LAG_PROBE_INTERVAL, stall_threshold: float = LAG_STALL_THRESHOLD):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.samples = 0
+        self.stalls = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, time.perf_counter() - started - self.interval))
+
+    def record(self, lag: float) -> None:
+        self.samples += 1
+        self.last_lag = lag
+        self.total_lag += lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+        if lag >= self.stall_threshold:
+            self.stalls += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "stalls": self.stalls,
+            "last_lag_ms": round(self.last_lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+            "mean_lag_ms": round(self.total_lag / self.samples * 1000, 3) if self.samples else 0.0,
+            "stall_threshold_ms": round(self.stall_threshold * 1000, 3),
+        }
+
+
+class PeriodicTask:
+    """
+    Calls a blocking function on the I/O pool every `interval` seconds.
+    Used for background refreshes (e.g. template hot reload) so that request
+    handlers only ever read in-memory state.
+    """
+
+    def __init__(self, func: Callable[[], Any], interval: float, on_result: Optional[Callable[[Any], None]] = None):
+        self.func = func
+        self.interval = interval
+        self.on_result = on_result
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                result = await run_blocking(self.func)
+            except Exception as e:
+                print(f"[MCP SERVER] Background task {getattr(self.func, '__name__', self.func)} failed: {e}")
+                continue
+            if self.on_result is not None:
+                self.on_result(result)
+
+
+
+class Warmup:
+    """
+    Named start-up steps (index builds, snapshot loads) run in order on the
+    I/O pool once the server is up, instead of at import: the process accepts
+    connections and answers calls that need none of them at once. A call
+    `wait()`s only for the steps it reads; `ready` turns true when every step
+    ran without failing (a failed step counts once `recovered()` reports its
+    periodic refresh succeeded), and `on_ready` callbacks (e.g. starting the periodic refreshes) run
+    then. `run_sync()` runs the remaining steps in the calling thread, for a
+    pre-fork parent that warms up before forking its workers.
+    """
+
+    def __init__(self) -> None:
+        self.steps: List[Tuple[str, Callable[[], Any]]] = []
+        self.timings: Dict[str, float] = {}
+        self.failures: Dict[str, str] = {}
+        self.on_ready: List[Callable[[], None]] = []
+        self._events: Dict[str, asyncio.Event] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, name: str, func: Callable[[], Any]) -> None:
+        self.steps.append((name, func))
+
+    @property
+    def ready(self) -> bool:
+        return len(self.timings) == len(self.steps) and not self.failures
+
+    def recovered(self, name: str) -> None:
+        """Clears a failed step once a later (periodic) rebuild of its index succeeded."""
+        if self.failures.pop(name, None) is not None:
+            print(f"[MCP SERVER] Warm-up step {name} recovered")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            # Events are bound to the loop being stopped
+            self._events = {}
+
+    async def wait(self, names: Iterable[str]) -> None:
+        """Returns once the named steps ran (unknown names are ignored); starts the warm-up if nothing did."""
+        pending = [name for name in names if name not in self.timings and any(name == step for step, _ in self.steps)]
+        if not pending:
+            return
+        self.start()
+        for name in pending:
+            await self._event(name).wait()
+
+    def run_sync(self) -> None:
+        for name, func in self.steps:
+            if name not in self.timings:
+                self._run_step(name, func)
+        self._notify_ready()
+
+    async def _run(self) -> None:
+        for name, func in self.steps:
+            if name not in self.timings:
+                await run_blocking(self._run_step, name, func)
+            self._event(name).set()
+        self._notify_ready()
+
+    def _run_step(self, name: str, func: Callable[[], Any]) -> None:
+        started = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            # The step's index stays partial until its periodic refresh succeeds
+            self.failures[name] = str(e)
+            print(f"[MCP SERVER] Warm-up step {name} failed: {e}")
+        self.timings[name] = time.perf_counter() - started
+
+    def _event(self, name: str) -> asyncio.Event:
+        event = self._events.get(name)
+        if event is None:
+            event = self._events[name] = asyncio.Event()
+            if name in self.timings:
+                event.set()
+        return event
+
+    def _notify_ready(self) -> None:
+        callbacks, self.on_ready = self.on_ready, []
+        for callback in callbacks:
+            callback()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "pending": [name for name, _ in self.steps if name not in self.timings],
+            "steps_ms": {name: round(seconds * 1000, 3) for name, seconds in self.timings.items()},
+            "failed": dict(self.failures),
+        }
@@ -0,0 +1,275 @@
+import os
+import re
+import json
+import math
+import heapq
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional, List, Any, Dict, Tuple
+
+from memory_bank import CLIENT_ROOT
+from prompt_templates import slugify
+
+# --- Constants & Configuration ---
+# Seconds between mtime checks of the MemoryBank Markdown files (0 disables background refresh)
+DEFAULT_REFRESH_INTERVAL = float(os.environ.get("DEVCYCLE_SEARCH_REFRESH_INTERVAL", "10.0"))
+
+# On-disk snapshot used to skip re-tokenizing unchanged files on restart (empty disables it)
+DEFAULT_SNAPSHOT_PATH = os.environ.get("DEVCYCLE_SEARCH_SNAPSHOT", str(Path(tempfile.gettempdir()) / "devcycle-search-index.json"))
+
+# Bumped whenever the tokenizer or snapshot layout changes, so stale snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+# BM25 parameters (Robertson/Sparck Jones defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Every Markdown heading level delimits a searchable section (documents are not titled uniformly)
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+# Characters of section text kept as a preview in search results
+PREVIEW_LENGTH = 160
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class IndexedSection:
+    """
+    A heading-delimited part of a MemoryBank document, the unit of retrieval.
+    `id` is the slugified heading path, as for prompt template sections.
+    """
+
+    __slots__ = ("path", "id", "title", "line", "length", "preview", "terms")
+
+    def __init__(self, path: str, id: str, title: str, line: int, length: int, preview: str, terms: Dict[str, int]):
+        self.path = path
+        self.id = id
+        self.title = title
+        self.line = line
+        self.length = length
+        self.preview = preview
+        self.terms = terms
+
+    def to_snapshot(self) -> List[Any]:
+        return [self.id, self.title, self.line, self.length, self.preview, self.terms]
+
+    @classmethod
+    def from_snapshot(cls, path: str, data: List[Any]) -> "IndexedSection":
+        return cls(path, *data)
+
+
+def split_sections(path: str, text: str) -> List[IndexedSection]:
+    """Splits a document at `#`-`######` headings outside code fences and tokenizes each part."""
+    sections: List[IndexedSection] = []
+    heading_path: List[Tuple[int, str]] = []
+    title = ""
+    start_line = 1
+    lines: List[str] = []
+    in_fence = False
+
+    def close() -> None:
+        body = "\n".join(lines)
+        terms = Counter(tokenize(title + "\n" + body))
+        if terms:
+            section_id = "/".join(slug for _, slug in heading_path)
+            preview = " ".join(body.split())[:PREVIEW_LENGTH]
+            sections.append(IndexedSection(path, section_id, title, start_line, sum(terms.values()), preview, dict(terms)))
+
+    for number, line in enumerate(text.splitlines(), start=1):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        heading = None if in_fence else HEADING_PATTERN.match(line)
+        if heading is None:
+            lines.append(line)
+            continue
+        close()
+        level = len(heading.group(1))
+        while heading_path and heading_path[-1][0] >= level:
+            heading_path.pop()
+        heading_path.append((level, slugify(heading.group(2))))
+        title = heading.group(2)
+        start_line = number
+        lines = []
+    close()
+    return sections
+
+
+class SearchIndex:
+    """
+    In-process inverted index over the MemoryBank Markdown files, ranked with BM25.
+    Each document is split into heading sections; postings map a term to the
+    sections containing it with their term frequency. `refresh()` re-tokenizes
+    only files whose mtime changed and swaps their postings in under the lock,
+    so queries never touch the filesystem. The tokenized files are written to
+    an on-disk snapshot; on restart only files changed since then are re-read.
+    With `warm=False`, the snapshot load and first scan wait for `warm_up()`.
+    """
+
+    def __init__(self, root: Path, snapshot_path: Optional[str] = DEFAULT_SNAPSHOT_PATH, refresh_interval: float = DEFAULT_REFRESH_INTERVAL, warm: bool = True):
+        self.root = Path(root)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.refresh_interval = refresh_interval
+        self.generation = 0
+        # path -> (mtime_ns, sections); paths are relative to the MemoryBank root
+        self._files: Dict[str, Tuple[int, List[IndexedSection]]] = {}
+        self._postings: Dict[str, Dict[IndexedSection, int]] = {}
+        self._total_length = 0
+        self._section_count = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        if warm:
+            self.warm_up()
+
+    def warm_up(self) -> List[str]:
+        """Restores the snapshot and indexes the files changed since it was taken."""
+        if not self._files:
+            self._load_snapshot()
+        return self.refresh()
+
+    def refresh(self) -> List[str]:
+        """
+        Re-indexes added or modified Markdown files and drops deleted ones.
+        Returns the relative paths that changed.
+        """
+        with self._refresh_lock:
+            current = self._scan()
+            changed = {}
+            for path, mtime_ns in current.items():
+                known = self._files.get(path)
+                if known is not None and known[0] == mtime_ns:
+                    continue
+                try:
+                    with open(self.root / path, "r", encoding="utf-8") as f:
+                        text = f.read()
+                except (FileNotFoundError, UnicodeDecodeError):
+                    continue
+                changed[path] = (mtime_ns, split_sections(path, text))
+            removed = [path for path in self._files if path not in current]
+            if not changed and not removed:
+                return []
+
+            # Files are tokenized above without the lock; only the postings swap blocks queries
+            with self._lock:
+                for path in removed:
+                    self._remove(path)
+                for path, entry in changed.items():
+                    self._remove(path)
+                    self._add(path, entry)
+                self.generation += 1
+            self._save_snapshot()
+            return sorted(changed) + removed
+
+    def _scan(self) -> Dict[str, int]:
+        files: Dict[str, int] = {}
+        for directory, subdirectories, names in os.walk(self.root):
+            subdirectories[:] = [name for name in subdirectories if not name.startswith(".")]
+            for name in names:
+                if not name.endswith(".md"):
+                    continue
+                full_path = os.path.join(directory, name)
+                try:
+                    files[os.path.relpath(full_path, self.root).replace(os.sep, "/")] = os.stat(full_path).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+        return files
+
+    def _add(self, path: str, entry: Tuple[int, List[IndexedSection]]) -> None:
+        self._files[path] = entry
+        for section in entry[1]:
+            self._section_count += 1
+            self._total_length += section.length
+            for term, frequency in section.terms.items():
+                self._postings.setdefault(term, {})[section] = frequency
+
+    def _remove(self, path: str) -> None:
+        entry = self._files.pop(path, None)
+        if entry is None:
+            return
+        for section in entry[1]:
+            self._section_count -= 1
+            self._total_length -= section.length
+            for term in section.terms:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(section, None)
+                    if not postings:
+                        del self._postings[term]
+
+    def search(self, query: str, limit: int = 10, path_prefix: Optional[str] = None, exclude_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Top `limit` sections for `query` by BM25 score, optionally restricted to
+        paths starting with `path_prefix` (e.g. `CodeGuidelines/`) and skipping
+        paths starting with `exclude_prefix` (e.g. a feature folder already in context).
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            if not terms or not self._section_count:
+                return []
+            average_length = self._total_length / self._section_count
+            scores: Dict[IndexedSection, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (self._section_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for section, frequency in postings.items():
+                    if path_prefix and not section.path.startswith(path_prefix):
+                        continue
+                    if exclude_prefix and section.path.startswith(exclude_prefix):
+                        continue
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * section.length / average_length)
+                    scores[section] = scores.get(section, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [
+            {
+                "path": f"{CLIENT_ROOT}/{section.path}",
+                "section_id": section.id,
+                "title": section.title,
+                "line": section.line,
+                "score": round(score, 4),
+                "preview": section.preview,
+            }
+            for section, score in top
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        return {"files": len(self._files), "sections": self._section_count, "terms": len(self._postings), "generation": self.generation}
+
+    def _load_snapshot(self) -> None:
+        if self.snapshot_path is None:
+            return
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("root") != str(self.root.resolve()):
+            return
+        with self._lock:
+            for path, (mtime_ns, sections) in snapshot.get("files", {}).items():
+                self._add(path, (mtime_ns, [IndexedSection.from_snapshot(path, data) for data in sections]))
+
+    def _save_snapshot(self) -> None:
+        if self.snapshot_path is None:
+            return
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "root": str(self.root.resolve()),
+            "files": {path: [mtime_ns, [section.to_snapshot() for section in sections]] for path, (mtime_ns, sections) in self._files.items()},
+        }
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write a uniquely named file then rename, so neither a crash nor a concurrent writer leaves a truncated snapshot
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.snapshot_path.parent, prefix=self.snapshot_path.name + ".", suffix=".tmp", delete=False) as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(f.name, self.snapshot_path)
+        except OSError as e:
+            print(f"[MCP SERVER] Could not write search index snapshot {self.snapshot_path}: {e}")
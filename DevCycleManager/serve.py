@@ -0,0 +1,249 @@
+import os
+import gc
+import sys
+import time
+import random
+import signal
+import socket
+import argparse
+from typing import Optional, List, Any, Dict, Set, Callable
+
+import uvicorn
+
+# Importing the server builds the template cache and tool schemas; the parent then runs main.WARMUP before forking
+import main
+
+# --- Constants & Configuration ---
+# Worker processes forked from the preloaded parent (each serves on the shared listening socket); 0 = no parent.
+# Defaults to 0: the parent warms up before forking, so a pre-fork server starts answering only once every index is built
+DEFAULT_WORKERS = int(os.environ.get("DEVCYCLE_WORKERS", "0"))
+
+# Minimum seconds between re-forks for MemoryBank, lessons or repository changes (edits in between roll out together);
+# template changes and SIGHUP re-fork at once
+INDEX_RELOAD_INTERVAL = float(os.environ.get("DEVCYCLE_WORKER_INDEX_RELOAD_INTERVAL", "30"))
+
+# Seconds a retiring worker gets to finish in-flight requests before it is killed
+GRACEFUL_TIMEOUT = float(os.environ.get("DEVCYCLE_WORKER_GRACEFUL_TIMEOUT", "30"))
+
+# Seconds between supervisor passes: signals, exited workers, due refreshes
+SUPERVISOR_TICK = 0.5
+
+# Pending connections queued on the shared socket
+LISTEN_BACKLOG = 2048
+
+
+class PreforkServer:
+    """
+    Serves `main.app` from several worker processes forked from one
+    preloaded parent. The parent builds every template, schema and index
+    (running `main.WARMUP` itself), freezes them out of the cyclic GC
+    (`gc.freeze()`) so workers do not dirty the shared pages while
+    collecting, and only then forks: workers share that state copy-on-write
+    and start serving at once, already warm.
+
+    Workers run no background refreshes and never write shared state (the
+    metadata store, index snapshots): the parent runs `main.REFRESH_TASKS`
+    on their intervals and re-forks the workers one by one, each retiring
+    worker finishing its in-flight requests, so every worker serves the same
+    state and none holds a private copy of it. A template change re-forks at
+    once; index changes are batched into at most one re-fork every
+    `INDEX_RELOAD_INTERVAL` seconds, so ongoing MemoryBank editing does not
+    keep re-forking. SIGHUP rebuilds the feature index (and the store) and
+    re-forks; SIGTERM/SIGINT stop every worker gracefully.
+    """
+
+    def __init__(self, host: str, port: int, workers: int = DEFAULT_WORKERS, log_level: str = "info", index_reload_interval: float = INDEX_RELOAD_INTERVAL):
+        self.host = host
+        self.port = port
+        self.worker_count = max(1, workers)
+        self.log_level = log_level
+        self.index_reload_interval = index_reload_interval
+        self.reloads = 0
+        self._workers: Set[int] = set()
+        self._retiring: Dict[int, float] = {}
+        self._due = {id(task): time.monotonic() + task.interval for task in main.REFRESH_TASKS}
+        # When the next re-fork is due (None: the workers serve the parent's current state)
+        self._roll_at: Optional[float] = None
+        self._rolled_at = time.monotonic()
+        self._stopping = False
+        self._reload_requested = False
+        self._socket = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((host, port))
+        self._socket.listen(LISTEN_BACKLOG)
+        self._socket.set_inheritable(True)
+        # Actual port, when `port` is 0
+        self.port = self._socket.getsockname()[1]
+
+    def run(self) -> int:
+        main.REFRESH_IN_PROCESS = False
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        print(f"[MCP SERVER] Pre-fork server on {self.host}:{self.port} with {self.worker_count} worker(s), parent pid {os.getpid()}")
+        main.WARMUP.run_sync()
+        self._freeze()
+        for _ in range(self.worker_count):
+            self._spawn()
+        while not self._stopping:
+            time.sleep(SUPERVISOR_TICK)
+            self._reap()
+            if self._stopping:
+                break
+            self._refresh(force=self._reload_requested)
+            self._reload_requested = False
+            if self._roll_at is not None and time.monotonic() >= self._roll_at:
+                self._roll()
+            while len(self._workers) < self.worker_count:
+                self._spawn()
+            self._kill_overdue()
+        return self._shutdown()
+
+    def _on_stop(self, signum: int, frame: Optional[object]) -> None:
+        self._stopping = True
+
+    def _on_reload(self, signum: int, frame: Optional[object]) -> None:
+        self._reload_requested = True
+
+    def _freeze(self) -> None:
+        """Moves every object built so far out of the cyclic GC's reach, so workers never write to those pages."""
+        gc.collect()
+        gc.freeze()
+
+    def _refresh(self, force: bool = False) -> None:
+        """Runs the refreshes that are due (all of them when forced) and schedules the re-fork their changes call for."""
+        now = time.monotonic()
+        if force:
+            self._run_task(main.FEATURE_INDEX.reload)
+            self._schedule(now)
+        failures = len(main.WARMUP.failures)
+        for task in main.REFRESH_TASKS:
+            if not force and (task.interval <= 0 or now < self._due[id(task)]):
+                continue
+            if self._run_task(task.func, task.on_result):
+                self._schedule(now if task in main.RELOAD_TASKS else self._rolled_at + self.index_reload_interval)
+            self._due[id(task)] = time.monotonic() + task.interval
+        if len(main.WARMUP.failures) < failures:
+            # A recovered warm-up step changes what the workers' /ready reports
+            self._schedule(self._rolled_at + self.index_reload_interval)
+
+    def _schedule(self, at: float) -> None:
+        self._roll_at = at if self._roll_at is None else min(self._roll_at, at)
+
+    def _run_task(self, func: Callable[[], Any], on_result: Optional[Callable[[Any], None]] = None) -> bool:
+        """Runs a refresh function once in the parent; True when it reported a change."""
+        try:
+            result = func()
+        except Exception as e:
+            print(f"[MCP SERVER] Background task {getattr(func, '__name__', func)} failed: {e}")
+            return False
+        if on_result is not None:
+            on_result(result)
+        return bool(result)
+
+    def _spawn(self) -> int:
+        # Buffered output would otherwise be written again by the child
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                self._serve()
+                code = 0
+            finally:
+                os._exit(code)
+        self._workers.add(pid)
+        return pid
+
+    def _serve(self) -> None:
+        """Worker: a uvicorn server on the inherited socket, with the state it was forked with."""
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        random.seed()
+        # The parent is the only writer of the metadata store and the index snapshots
+        main.FEATURE_INDEX.store = None
+        main.SEARCH_INDEX.snapshot_path = None
+        if main.GIT_COMMITS is not None:
+            main.GIT_COMMITS.snapshot_path = None
+        if main.METADATA_STORE is not None:
+            main.METADATA_STORE.reopen()
+        config = uvicorn.Config(main.app, log_level=self.log_level, timeout_graceful_shutdown=GRACEFUL_TIMEOUT)
+        uvicorn.Server(config).run(sockets=[self._socket])
+
+    def _roll(self) -> None:
+        """Replaces every worker with one forked from the refreshed parent, one at a time."""
+        self.reloads += 1
+        self._roll_at = None
+        self._rolled_at = time.monotonic()
+        print(f"[MCP SERVER] MemoryBank or templates changed: re-forking {len(self._workers)} worker(s) (reload {self.reloads})")
+        # Unfreezing (which touches every object) only here: the new workers share whatever it dirties
+        gc.unfreeze()
+        self._freeze()
+        for pid in list(self._workers):
+            self._spawn()
+            self._retire(pid)
+
+    def _retire(self, pid: int) -> None:
+        self._workers.discard(pid)
+        self._retiring[pid] = time.monotonic() + GRACEFUL_TIMEOUT
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self._retiring.pop(pid, None)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self._workers:
+                print(f"[MCP SERVER] Worker {pid} exited unexpectedly (status {status}); starting a replacement")
+                self._workers.discard(pid)
+            self._retiring.pop(pid, None)
+
+    def _kill_overdue(self) -> None:
+        now = time.monotonic()
+        for pid, deadline in list(self._retiring.items()):
+            if now >= deadline:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    self._retiring.pop(pid, None)
+
+    def _shutdown(self) -> int:
+        for pid in list(self._workers):
+            self._retire(pid)
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        while self._retiring and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self._retiring):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self._socket.close()
+        return 0
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve DevCycleManager from several pre-forked workers sharing the preloaded state.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Worker processes (default: DEVCYCLE_WORKERS or 0); 0 serves in-process, answering while the indexes warm up")
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    if arguments.workers < 1 or not hasattr(os, "fork"):
+        # A single in-process server with its own warm-up and background refreshes (also where fork() is unavailable)
+        uvicorn.run(main.app, host=arguments.host, port=arguments.port, log_level=arguments.log_level)
+        sys.exit(0)
+    sys.exit(PreforkServer(arguments.host, arguments.port, arguments.workers, arguments.log_level).run())
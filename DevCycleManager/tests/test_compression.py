@@ -0,0 +1,162 @@
+import gzip
+import zlib
+import asyncio
+
+import pytest
+
+import compression
+from compression import FRAMED_CODECS, MAX_FRAMED_TAIL, CompressionCache, CompressionMiddleware, negotiate_encoding
+
+PREFIX = b'{"jsonrpc":"2.0","result":' + b'{"tools":[' + b'{"name":"tool","description":"a repetitive description"},' * 200 + b'{}]},"id":'
+
+
+def decompress_gzip(data):
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    out = decompressor.decompress(data) + decompressor.flush()
+    assert decompressor.eof and not decompressor.unused_data
+    return out
+
+
+def decompress_brotli(data):
+    return compression.brotli.decompress(data)
+
+
+def decompress_zstd(data):
+    decompressor = compression.zstandard.ZstdDecompressor().decompressobj()
+    out = decompressor.decompress(data)
+    assert decompressor.eof
+    return out
+
+
+DECOMPRESSORS = {"gzip": decompress_gzip, "br": decompress_brotli, "zstd": decompress_zstd}
+MODULES = {"gzip": "gzip", "br": "brotli", "zstd": "zstandard"}
+
+
+@pytest.fixture(params=["gzip", "br", "zstd"])
+def encoding(request):
+    if request.param not in FRAMED_CODECS:
+        pytest.skip(f"{MODULES[request.param]} is not installed")
+    return request.param
+
+
+@pytest.mark.parametrize("tail_length", [1, 255, 256, 65535])
+def test_framed_codecs_round_trip(encoding, tail_length):
+    make_head, make_tail = FRAMED_CODECS[encoding]
+    tail = (b"1234567890}" * (tail_length // 11 + 1))[:tail_length]
+    assert DECOMPRESSORS[encoding](make_head(PREFIX) + make_tail(PREFIX, tail)) == PREFIX + tail
+
+
+@pytest.mark.parametrize("tail_length", [1, MAX_FRAMED_TAIL, MAX_FRAMED_TAIL + 1])
+def test_cache_frames_registered_prefixes_and_falls_back_for_long_tails(encoding, tail_length):
+    cache = CompressionCache()
+    cache.register_prefix(PREFIX)
+    body = PREFIX + b"7" * (tail_length - 1) + b"}"
+    compressed = cache.compress(body, encoding)
+    assert DECOMPRESSORS[encoding](compressed) == body
+    framed_head = FRAMED_CODECS[encoding][0](PREFIX)
+    assert compressed.startswith(framed_head) == (tail_length <= MAX_FRAMED_TAIL)
+
+
+def test_framed_heads_are_shared_across_request_ids(encoding):
+    cache = CompressionCache()
+    cache.register_prefix(PREFIX)
+    for request_id in (b"1", b"2", b'"abc"', b"null"):
+        body = PREFIX + request_id + b"}"
+        assert DECOMPRESSORS[encoding](cache.compress(body, encoding)) == body
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_unregistered_bodies_are_cached_by_content():
+    cache = CompressionCache(size=1)
+    body = b"x" * 4096
+    assert gzip.decompress(cache.compress(body, "gzip")) == body
+    cache.compress(body, "gzip")
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.compress(b"y" * 4096, "gzip")
+    cache.compress(body, "gzip")
+    assert cache.misses == 3
+
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    monkeypatch.setattr(compression, "PREFERRED_ENCODINGS", ["zstd", "br", "gzip"])
+    monkeypatch.setattr(compression, "CODECS", {"gzip": compression.CODECS["gzip"], "br": None, "zstd": None})
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("GZIP", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "zstd"),
+    ("*;q=0", None),
+    ("*;q=0, gzip", "gzip"),
+    ("gzip;q=0.5, br;q=0.8", "br"),
+    ("gzip;q=1.0, br;q=0.8", "gzip"),
+    ("gzip, br, zstd", "zstd"),
+    ("zstd;q=0, *", "br"),
+    ("br;q=bogus, gzip;q=0.1", "gzip"),
+])
+def test_negotiate_encoding(gzip_only, header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def run_middleware(body, headers=(), status=200, accept_encoding="gzip", minimum_size=1024):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-length", str(len(body)).encode()), *headers]})
+        await send({"type": "http.response.body", "body": body[:10], "more_body": True})
+        await send({"type": "http.response.body", "body": body[10:]})
+
+    observed = []
+    middleware = CompressionMiddleware(app, minimum_size=minimum_size, on_response=lambda *args: observed.append(args))
+    scope = {"type": "http", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []}
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(middleware(scope, None, send))
+    start = messages[0]
+    sent = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], dict(start["headers"]), sent, observed
+
+
+def test_middleware_respects_the_size_threshold():
+    small = b"s" * 1023
+    _, headers, sent, observed = run_middleware(small)
+    assert sent == small
+    assert b"content-encoding" not in headers
+    assert observed == [("identity", 1023, 1023)]
+
+    large = b"l" * 1024
+    _, headers, sent, observed = run_middleware(large)
+    assert headers[b"content-encoding"] == b"gzip"
+    assert gzip.decompress(sent) == large
+    assert headers[b"content-length"] == str(len(sent)).encode()
+    assert observed == [("gzip", 1024, len(sent))]
+
+
+def test_middleware_weakens_the_etag_and_varies_on_accept_encoding():
+    body = b"b" * 4096
+    _, headers, _, _ = run_middleware(body, headers=[(b"etag", b'"abc"')])
+    assert headers[b"etag"] == b'W/"abc"'
+    assert headers[b"vary"] == b"Accept-Encoding"
+
+    _, headers, _, _ = run_middleware(body, headers=[(b"etag", b'W/"abc"')])
+    assert headers[b"etag"] == b'W/"abc"'
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"status": 304},
+    {"headers": [(b"content-encoding", b"br")]},
+    {"accept_encoding": None},
+    {"accept_encoding": "identity"},
+])
+def test_middleware_passes_through(kwargs):
+    body = b"p" * 4096
+    _, headers, sent, _ = run_middleware(body, **kwargs)
+    assert sent == body
+    assert headers.get(b"content-encoding") in (None, b"br")
+    assert b"vary" not in headers
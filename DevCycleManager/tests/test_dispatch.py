@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import main
+from main import JsonRpcResponse
+
+
+def run_batch(batch, headers=None):
+    response = asyncio.run(main.dispatch_batch(batch, headers or {}))
+    return response.status_code, json.loads(response.body) if response.body else None
+
+
+def call(request_id, method="initialize", **params):
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+
+
+@pytest.fixture
+def slow_echo(monkeypatch):
+    """Replaces the dispatcher with one that finishes later calls first and fails on `boom`."""
+    started = []
+
+    async def dispatch_rpc(request, headers, allow_not_modified=True):
+        started.append(request.id)
+        await asyncio.sleep(request.params.get("delay", 0))
+        if request.method == "boom":
+            raise RuntimeError("exploded")
+        return JsonRpcResponse(id=request.id, result={"echo": request.id})
+
+    monkeypatch.setattr(main, "dispatch_rpc", dispatch_rpc)
+    return started
+
+
+def test_batch_results_keep_request_order_under_concurrent_dispatch(slow_echo):
+    batch = [call(i, method="echo", delay=(5 - i) * 0.02) for i in range(5)]
+    status_code, body = run_batch(batch)
+    assert status_code == 200
+    assert [entry["id"] for entry in body] == [0, 1, 2, 3, 4]
+    assert [entry["result"]["echo"] for entry in body] == [0, 1, 2, 3, 4]
+    assert sorted(slow_echo) == [0, 1, 2, 3, 4]
+
+
+def test_batch_isolates_an_exception_in_one_call(slow_echo):
+    status_code, body = run_batch([call(1, method="echo"), call(2, method="boom"), call(3, method="echo")])
+    assert status_code == 200
+    assert body[0] == {"jsonrpc": "2.0", "id": 1, "result": {"echo": 1}}
+    assert body[1]["id"] == 2
+    assert body[1]["error"]["code"] == -32603
+    assert "exploded" in body[1]["error"]["message"]
+    assert body[2] == {"jsonrpc": "2.0", "id": 3, "result": {"echo": 3}}
+
+
+def test_notification_only_batch_returns_204_without_body():
+    response = asyncio.run(main.dispatch_batch([call(None), {"jsonrpc": "2.0", "method": "initialize"}], {}))
+    assert response.status_code == 204
+    assert response.body == b""
+
+
+def test_notifications_produce_no_entry():
+    status_code, body = run_batch([call(None), call("a")])
+    assert status_code == 200
+    assert [entry["id"] for entry in body] == ["a"]
+
+
+def test_empty_batch_is_an_invalid_request():
+    status_code, body = run_batch([])
+    assert status_code == 200
+    assert body == {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
+
+
+def test_non_object_entries_are_rejected_per_entry():
+    status_code, body = run_batch([1, call(7), "initialize", {"id": 8}])
+    assert status_code == 200
+    assert len(body) == 4
+    invalid = {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
+    assert body[0] == invalid
+    assert body[1]["id"] == 7 and body[1]["result"] == main.INITIALIZE_RESULT
+    assert body[2] == invalid
+    assert body[3] == invalid
+
+
+def test_max_batch_size_is_enforced(monkeypatch):
+    monkeypatch.setattr(main, "MAX_BATCH_SIZE", 3)
+    status_code, body = run_batch([call(i) for i in range(3)])
+    assert status_code == 200
+    assert len(body) == 3
+
+    status_code, body = run_batch([call(i) for i in range(4)])
+    assert status_code == 200
+    assert body["id"] is None
+    assert body["error"]["code"] == -32600
+    assert "max 3" in body["error"]["message"]
+
+
+def test_max_batch_size_reads_the_environment():
+    env = dict(os.environ, DEVCYCLE_MAX_BATCH_SIZE="2")
+    output = subprocess.run(
+        [sys.executable, "-c", "import main; print(main.MAX_BATCH_SIZE)"],
+        cwd=Path(main.__file__).parent, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    assert output.strip() == "2"
@@ -0,0 +1,116 @@
+import shutil
+import subprocess
+
+import pytest
+
+from git_commits import GitCommitIndex, ObjectStore, apply_delta, parse_commit
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs the git binary to build fixture repositories")
+
+# Large, nearly identical file versions, so repacking stores most of them as deltas
+BASE_TEXT = "".join(f"line {number}: the quick brown fox jumps over the lazy dog\n" for number in range(400))
+
+
+def git(repo, *args):
+    return subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=repo, check=True, capture_output=True,
+    ).stdout
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    for number in range(6):
+        (repo / "notes.txt").write_text(BASE_TEXT + f"revision {number}\n", encoding="utf-8")
+        git(repo, "add", "notes.txt")
+        git(repo, "commit", "-q", "-m", f"FEAT-001: revision {number}\n\nBody of revision {number}.")
+    git(repo, "checkout", "-q", "-b", "feature/FEAT-002-search")
+    (repo / "search.txt").write_text("search\n", encoding="utf-8")
+    git(repo, "add", "search.txt")
+    git(repo, "commit", "-q", "-m", "FEAT-002: add search")
+    return repo
+
+
+def all_objects(repo):
+    """(sha, type, raw content) of every object, as git itself reads them."""
+    objects = []
+    for line in git(repo, "cat-file", "--batch-all-objects", "--batch-check").decode().splitlines():
+        sha, kind, _ = line.split()
+        objects.append((sha, kind, git(repo, "cat-file", kind, sha)))
+    return objects
+
+
+def assert_store_matches_git(repo):
+    store = ObjectStore(repo / ".git")
+    objects = all_objects(repo)
+    assert objects
+    for sha, kind, data in objects:
+        assert store.read(sha) == (kind, data), sha
+        assert store.find(sha[:7]) == [sha]
+    return store
+
+
+def delta_count(repo):
+    """Objects stored as deltas in the repository's packs (`git verify-pack` lists their depth)."""
+    count = 0
+    for idx in (repo / ".git" / "objects" / "pack").glob("*.idx"):
+        for line in git(repo, "verify-pack", "-v", str(idx)).decode().splitlines():
+            fields = line.split()
+            if len(fields) == 7 and len(fields[0]) == 40:
+                count += 1
+    return count
+
+
+def test_reads_loose_objects(repo):
+    store = assert_store_matches_git(repo)
+    assert store.stats() == {"packs": 0, "packed_objects": 0}
+    assert store.read("0" * 40) is None
+
+
+@pytest.mark.parametrize("delta_base_offset", ["true", "false"], ids=["ofs-delta", "ref-delta"])
+def test_reads_packed_objects_with_deltas(repo, delta_base_offset):
+    git(repo, "-c", f"repack.useDeltaBaseOffset={delta_base_offset}", "repack", "-a", "-d", "-f", "-q", "--window=50", "--depth=50")
+    git(repo, "prune-packed")
+    assert delta_count(repo) > 0
+    store = assert_store_matches_git(repo)
+    assert store.stats()["packs"] == 1
+
+
+def test_store_picks_up_new_packs_on_refresh(repo):
+    store = ObjectStore(repo / ".git")
+    git(repo, "repack", "-a", "-d", "-q")
+    git(repo, "prune-packed")
+    head = git(repo, "rev-parse", "HEAD").decode().strip()
+    store.refresh()
+    assert store.stats()["packs"] == 1
+    assert store.read(head)[0] == "commit"
+
+
+def test_apply_delta_copies_and_inserts():
+    base = b"0123456789abcdef"
+    # Header: base size 16, result size 9; copy 4 bytes at offset 2, insert "XY", copy 3 bytes at offset 13
+    delta = bytes([16, 9, 0x91, 2, 4, 2]) + b"XY" + bytes([0x91, 13, 3])
+    assert apply_delta(base, delta) == b"2345XYdef"
+
+
+def test_parse_commit_reads_parents_time_and_subject(repo):
+    head = git(repo, "rev-parse", "HEAD").decode().strip()
+    parent = git(repo, "rev-parse", "HEAD~1").decode().strip()
+    info = parse_commit(git(repo, "cat-file", "commit", head))
+    assert info.parents == (parent,)
+    assert info.subject == "FEAT-002: add search"
+    assert info.time == int(git(repo, "log", "-1", "--format=%ct", head).decode())
+
+
+@pytest.mark.parametrize("packed", [False, True], ids=["loose", "packed"])
+def test_commit_index_separates_branch_from_mainline(repo, packed):
+    if packed:
+        git(repo, "gc", "-q", "--aggressive")
+    index = GitCommitIndex(repo, snapshot_path=None)
+    branch_tip = git(repo, "rev-parse", "feature/FEAT-002-search").decode().strip()
+    assert index.branch_commits("feature/FEAT-002-search") == [branch_tip]
+    assert index.feature_branches("FEAT-002") == ["feature/FEAT-002-search"]
+    assert index.resolve(branch_tip[:8])[0] == branch_tip
@@ -0,0 +1,132 @@
+import os
+import shutil
+
+import pytest
+
+import memory_bank
+from memory_bank import FeatureIndex
+from metadata_store import MetadataStore
+
+
+def write_feature(root, state, folder, status="IN_PROGRESS", commit="abc1234", parent_epic="EPIC-001", mtime_ns=None):
+    directory = root / "Features" / state / folder
+    (directory / "Phases").mkdir(parents=True, exist_ok=True)
+    (directory / "FeatureDescription.md").write_text(
+        f"# Feature: {folder}\n\n**Parent Epic**: {parent_epic}\n\n## Dependencies\n\n- FEAT-001\n", encoding="utf-8"
+    )
+    (directory / "FeatureTasks.md").write_text(
+        f"# Feature Tasks: {folder}\n\n**Status**: {status}\n\n## Phase Summary\n\n"
+        "| Phase | Name | Status | Est. Man/Hour |\n|---|---|---|---|\n| 1 | Backend | IN_PROGRESS | 4h |\n",
+        encoding="utf-8",
+    )
+    (directory / "Phases" / "phase-1-backend.md").write_text(
+        "# Phase 1: Backend\n\n**Status**: IN_PROGRESS\n\n### Task 1.1: Endpoint\n\n**Status**: COMPLETED\n\n"
+        f"| Commit Hash | Message |\n|---|---|\n| `{commit}` | Endpoint |\n",
+        encoding="utf-8",
+    )
+    if mtime_ns is not None:
+        for path in directory.rglob("*.md"):
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def bank(tmp_path):
+    root = tmp_path / "MemoryBank"
+    write_feature(root, "03_IN_PROGRESS", "FEAT-001-login", commit="abc1234")
+    write_feature(root, "03_IN_PROGRESS", "FEAT-002-search", commit="def5678")
+    write_feature(root, "01_SUBMITTED", "FEAT-003-export", status="SUBMITTED", commit="0123abc")
+    return root
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "store" / "metadata.db")
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Item IDs parsed from Markdown, in order."""
+    parsed = []
+    load_documents = memory_bank.FeatureEntry.load_documents
+
+    def counting(entry, directory, mtimes):
+        parsed.append(entry.id)
+        return load_documents(entry, directory, mtimes)
+
+    monkeypatch.setattr(memory_bank.FeatureEntry, "load_documents", counting)
+    return parsed
+
+
+def test_sync_writes_every_item_and_queries_match_the_index(bank, db_path):
+    store = MetadataStore(db_path, bank)
+    index = FeatureIndex(bank, store=store)
+    assert store.stats()["items"] == 3
+    assert store.check({entry.id: entry for entry in index.entries()})["consistent"]
+
+    page, total = store.query(state="in_progress")
+    assert total == 2
+    assert [entry.id for entry in page] == ["FEAT-001", "FEAT-002"]
+    assert [entry.id for entry in store.query(commit="def5")[0]] == ["FEAT-002"]
+    stored = store.get("feat-001")
+    assert stored.parent_epic == "EPIC-001"
+    assert stored.phases[0].hours == {"estimated_man": 4.0}
+    assert stored.phases[0].tasks == [{"id": "1.1", "title": "Endpoint", "status": "COMPLETED"}]
+
+
+def test_restart_reuses_stored_entries_and_reparses_only_changed_folders(bank, db_path, parses):
+    FeatureIndex(bank, store=MetadataStore(db_path, bank))
+    assert sorted(parses) == ["FEAT-001", "FEAT-002", "FEAT-003"]
+    parses.clear()
+
+    write_feature(bank, "03_IN_PROGRESS", "FEAT-002-search", status="AWAITING_USER_ACCEPTANCE", commit="fedcba9", mtime_ns=1)
+    store = MetadataStore(db_path, bank)
+    index = FeatureIndex(bank, store=store)
+    assert parses == ["FEAT-002"]
+    assert index.get("FEAT-002").status == "AWAITING_USER_ACCEPTANCE"
+    assert store.get("FEAT-002").status == "AWAITING_USER_ACCEPTANCE"
+    assert store.query(commit="def5678")[1] == 0
+    assert store.check({entry.id: entry for entry in index.entries()})["consistent"]
+
+
+def test_refresh_syncs_only_changed_and_removed_items(bank, db_path):
+    store = MetadataStore(db_path, bank)
+    index = FeatureIndex(bank, store=store)
+    synced = store.synced
+
+    write_feature(bank, "03_IN_PROGRESS", "FEAT-001-login", status="BLOCKED", mtime_ns=1)
+    shutil.rmtree(bank / "Features" / "01_SUBMITTED" / "FEAT-003-export")
+    os.utime(bank / "Features" / "01_SUBMITTED", ns=(2, 2))
+
+    index.refresh()
+    assert store.synced - synced == 2
+    assert store.get("FEAT-001").status == "BLOCKED"
+    assert store.get("FEAT-003") is None
+    assert store.check({entry.id: entry for entry in index.entries()})["consistent"]
+
+
+def test_reopen_gives_a_fresh_connection_that_keeps_syncing(bank, db_path):
+    store = MetadataStore(db_path, bank)
+    index = FeatureIndex(bank, store=store)
+    inherited = store._connection
+    store.reopen()
+    assert store._connection is not inherited
+    assert store.query()[1] == 3
+
+    write_feature(bank, "03_IN_PROGRESS", "FEAT-002-search", status="COMPLETED", mtime_ns=1)
+    os.utime(bank / "Features" / "03_IN_PROGRESS", ns=(3, 3))
+    index.refresh()
+    assert MetadataStore(db_path, bank).get("FEAT-002").status == "COMPLETED"
+
+
+def test_projects_are_isolated_and_other_roots_are_not_loaded(bank, db_path, tmp_path):
+    FeatureIndex(bank, store=MetadataStore(db_path, bank, project="alpha"))
+    other = tmp_path / "OtherBank"
+    write_feature(other, "02_READY_TO_DEVELOP", "FEAT-010-billing")
+    beta = MetadataStore(db_path, other, project="beta")
+    FeatureIndex(other, store=beta)
+
+    assert [project["project"] for project in beta.projects()] == ["alpha", "beta"]
+    assert beta.query(project="alpha")[1] == 3
+    assert beta.query()[1] == 1
+    # Same project name, different MemoryBank: the stored entries must not seed the index
+    assert MetadataStore(db_path, other, project="alpha").load_entries() == {}
@@ -0,0 +1,121 @@
+import os
+import re
+import pickle
+from pathlib import Path
+
+import pytest
+
+import prompt_templates
+from prompt_templates import PromptTemplateRegistry
+
+PROMPTS_DIR = Path(prompt_templates.__file__).parent / "Prompts"
+PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+INCLUDE = re.compile(r"\{\{>\s*([\w.-]+)\s*\}\}")
+
+
+def replace_chain(source, values):
+    """The rendering the server did before templates were compiled: inline fragments, then one `str.replace` per placeholder."""
+    def include(match):
+        fragment = (PROMPTS_DIR / "fragments" / (match.group(1) + ".md")).read_text(encoding="utf-8")
+        return fragment[:-1] if fragment.endswith("\n") else fragment
+
+    procedure = INCLUDE.sub(include, source)
+    for name, value in values.items():
+        procedure = procedure.replace("{{" + name + "}}", value)
+    return procedure
+
+
+def write(path, text, mtime_ns):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def prompts(tmp_path):
+    directory = tmp_path / "Prompts"
+    write(directory / "fragments" / "shared.md", "Shared for {{feature_id}}\n", 1_000_000_000)
+    write(directory / "one.md", "# One\n\n## Step\n\n{{feature_id}}\n{{> shared}}\n", 1_000_000_000)
+    write(directory / "two.md", "# Two\n\n{{epic_id}}\n", 1_000_000_000)
+    write(directory / "three.md", "# Three\n\n{{> shared}}\n", 1_000_000_000)
+    return directory
+
+
+TEMPLATE_NAMES = sorted(path.name for path in PROMPTS_DIR.iterdir() if path.name.endswith(prompt_templates.TEMPLATE_SUFFIXES))
+
+
+@pytest.fixture(scope="module")
+def registry():
+    return PromptTemplateRegistry(PROMPTS_DIR, reload_interval=0, bundle_path=None)
+
+
+@pytest.mark.parametrize("name", TEMPLATE_NAMES)
+def test_render_matches_replace_chain_byte_for_byte(registry, name):
+    source = (PROMPTS_DIR / name).read_text(encoding="utf-8")
+    template = registry.get(name)
+    values = {placeholder: f"<{placeholder}: value \\1 $0 é>" for placeholder in dict.fromkeys(PLACEHOLDER.findall(replace_chain(source, {})))}
+    assert template.placeholders == list(values)
+    assert template.render(values).encode("utf-8") == replace_chain(source, values).encode("utf-8")
+    # Placeholders without a value are left in place, as an unmatched `str.replace` would
+    partial = dict(list(values.items())[1:])
+    assert template.render(partial).encode("utf-8") == replace_chain(source, partial).encode("utf-8")
+
+
+def test_touching_one_file_reloads_only_that_template(prompts):
+    registry = PromptTemplateRegistry(prompts, reload_interval=0, bundle_path=None)
+    one, two, three = registry.get("one.md"), registry.get("two.md"), registry.get("three.md")
+    assert registry.refresh() == []
+
+    write(prompts / "two.md", "# Two\n\nEpic {{epic_id}}\n", 2_000_000_000)
+    assert registry.refresh() == ["two.md"]
+    assert registry.get("one.md") is one and registry.get("three.md") is three
+    assert registry.get("two.md").render({"epic_id": "EPIC-001"}) == "# Two\n\nEpic EPIC-001\n"
+
+
+def test_touching_a_fragment_reloads_only_its_includers(prompts):
+    registry = PromptTemplateRegistry(prompts, reload_interval=0, bundle_path=None)
+    two = registry.get("two.md")
+
+    write(prompts / "fragments" / "shared.md", "Updated for {{feature_id}}\n", 2_000_000_000)
+    assert sorted(registry.refresh()) == ["fragments/shared.md", "one.md", "three.md"]
+    assert registry.get("two.md") is two
+    assert registry.get("three.md").render({"feature_id": "FEAT-001"}) == "# Three\n\nUpdated for FEAT-001\n"
+
+
+def test_deleted_templates_are_dropped(prompts):
+    registry = PromptTemplateRegistry(prompts, reload_interval=0, bundle_path=None)
+    (prompts / "two.md").unlink()
+    assert registry.refresh() == ["two.md"]
+    assert registry.get("two.md") is None
+
+
+def test_current_bundle_seeds_the_registry(prompts, tmp_path):
+    bundle_path = tmp_path / "bundle.pickle"
+    PromptTemplateRegistry(prompts, reload_interval=0, bundle_path=None).save_bundle(bundle_path)
+    registry = PromptTemplateRegistry(prompts, reload_interval=0, bundle_path=str(bundle_path))
+    assert registry.bundled == 3
+    assert registry.refresh() == []
+
+
+@pytest.mark.parametrize("field, value", [("version", prompt_templates.BUNDLE_VERSION + 1), ("module_mtime_ns", 1)])
+def test_stale_bundle_is_ignored(prompts, tmp_path, field, value):
+    bundle_path = tmp_path / "bundle.pickle"
+    PromptTemplateRegistry(prompts, reload_interval=0, bundle_path=None).save_bundle(bundle_path)
+    bundle = pickle.loads(bundle_path.read_bytes())
+    bundle["key"][field] = value
+    bundle_path.write_bytes(pickle.dumps(bundle))
+
+    registry = PromptTemplateRegistry(prompts, reload_interval=0, bundle_path=str(bundle_path))
+    assert registry.bundled == 0
+    assert registry.names() == ["one.md", "three.md", "two.md"]
+
+
+def test_bundled_template_with_a_stale_file_mtime_is_recompiled(prompts, tmp_path):
+    bundle_path = tmp_path / "bundle.pickle"
+    PromptTemplateRegistry(prompts, reload_interval=0, bundle_path=None).save_bundle(bundle_path)
+    write(prompts / "two.md", "# Two\n\nChanged {{epic_id}}\n", 2_000_000_000)
+
+    registry = PromptTemplateRegistry(prompts, reload_interval=0, bundle_path=str(bundle_path))
+    assert registry.bundled == 3
+    assert registry.get("two.md").render({"epic_id": "EPIC-002"}) == "# Two\n\nChanged EPIC-002\n"
+    assert registry.refresh() == []
@@ -0,0 +1,158 @@
+import pytest
+
+from memory_bank import FeatureIndex
+from quality_gates import GATES, PhaseDocument, QualityGateValidator
+
+FEATURE_DIR = "Features/03_IN_PROGRESS/FEAT-001-login"
+
+TASKS = """# Feature Tasks: Login
+
+## Phase Summary
+
+| Phase | Name | Status |
+|-------|------|--------|
+| 1 | Backend | IN_PROGRESS |
+| 2 | Frontend | PENDING |
+"""
+
+# Malformed on purpose: a task without a status, a skip without a reason,
+# a commit missing from the Phase Summary, a wrong commit total, an unfilled
+# checkpoint and a rejected review
+MALFORMED_PHASE = """# Phase 1: Backend
+
+**Status**: AWAITING_USER_ACCEPTANCE
+
+### Task 1.1: Add the endpoint
+
+**Status**: COMPLETED
+
+| Commit Hash | Message |
+|-------------|---------|
+| `abc1234` | Add endpoint |
+
+### Task 1.2: Add the migration
+
+Nothing recorded here.
+
+### Task 1.3: Add the cache
+
+**Status**: SKIPPED
+
+## Git Commits (Phase Summary)
+
+**Total Commits in Phase**: 2
+
+| Commit Hash | Task |
+|-------------|------|
+| `def5678` | 1.1 |
+
+## Phase Checkpoint
+
+**Status**: NOT STARTED
+
+## Code Review History
+
+| Date | Status |
+|------|--------|
+| 2026-01-02 | CHANGES_REQUESTED |
+"""
+
+VALID_PHASE = """# Phase 1: Backend
+
+**Status**: AWAITING_USER_ACCEPTANCE
+
+### Task 1.1: Add the endpoint
+
+**Status**: COMPLETED
+
+| Commit Hash | Message |
+|-------------|---------|
+| `abc1234` | Add endpoint |
+
+## Git Commits (Phase Summary)
+
+**Total Commits in Phase**: 1
+
+| Commit Hash | Task |
+|-------------|------|
+| `abc1234` | 1.1 |
+
+## Phase Checkpoint
+
+**Status**: Complete
+
+## Code Review History
+
+| Date | Status |
+|------|--------|
+| 2026-01-02 | APPROVED |
+"""
+
+
+def make_validator(root, phase_text):
+    feature = root / FEATURE_DIR
+    (feature / "Phases").mkdir(parents=True)
+    (feature / "FeatureDescription.md").write_text("# Feature: Login\n", encoding="utf-8")
+    (feature / "FeatureTasks.md").write_text(TASKS, encoding="utf-8")
+    (feature / "Phases" / "phase-1-backend.md").write_text(phase_text, encoding="utf-8")
+    return QualityGateValidator(root, FeatureIndex(root))
+
+
+def findings_by_gate(report):
+    found = {}
+    for finding in report["findings"]:
+        found.setdefault(finding["gate"], []).append(finding)
+    return found
+
+
+def test_valid_phase_passes_every_gate(tmp_path):
+    report = make_validator(tmp_path, VALID_PHASE).validate_phase("FEAT-001", 1)
+    assert report["passed"], report["findings"]
+    assert report["gates"] == {gate: "pass" for gate in GATES}
+    assert report["commits"] == {"tasks": 1, "summary": 1, "declared": 1}
+
+
+def test_malformed_phase_reports_each_violation_with_its_line(tmp_path):
+    report = make_validator(tmp_path, MALFORMED_PHASE).validate_phase("FEAT-001", 1)
+    assert report["feature_id"] == "FEAT-001"
+    assert not report["passed"]
+    gates = report["gates"]
+    assert gates["phase-status"] == "pass"
+    assert gates["summary-agreement"] == "pass"
+    for gate in ("tasks", "skip-justification", "summary-commits", "checkpoint", "code-review"):
+        assert gates[gate] == "fail", gate
+
+    found = findings_by_gate(report)
+    lines = MALFORMED_PHASE.splitlines()
+    assert [finding["line"] for finding in found["tasks"]] == [lines.index("### Task 1.2: Add the migration") + 1]
+    assert "Task 1.3" in found["skip-justification"][0]["message"]
+    assert any(finding["message"].startswith("Commit abc1234 of Task 1.1") for finding in found["summary-commits"])
+    assert any("Total Commits in Phase" in finding["message"] for finding in found["summary-commits"])
+    assert found["checkpoint"][0]["line"] == lines.index("## Phase Checkpoint") + 3
+    assert "CHANGES_REQUESTED" in found["code-review"][0]["message"]
+    assert all(finding["path"].endswith(f"{FEATURE_DIR}/Phases/phase-1-backend.md") for finding in report["findings"])
+
+
+def test_phase_status_mismatch_and_missing_phase_file(tmp_path):
+    validator = make_validator(tmp_path, VALID_PHASE.replace("AWAITING_USER_ACCEPTANCE", "IN_PROGRESS", 1))
+    report = validator.validate_phase("FEAT-001", 1)
+    assert report["gates"]["phase-status"] == "fail"
+
+    missing = validator.validate_phase("FEAT-001", 2)
+    assert not missing["passed"]
+    assert missing["file"] is None
+    assert validator.validate_phase("FEAT-999", 1) is None
+
+
+def test_feature_completion_requires_every_phase(tmp_path):
+    report = make_validator(tmp_path, VALID_PHASE).validate_feature("FEAT-001")
+    assert not report["passed"]
+    assert [phase["phase"] for phase in report["phases"]] == [1, 2]
+
+
+@pytest.mark.parametrize("text", ["", "no headings at all\n| a | b |\n", "```\n**Status**: COMPLETED\n```\n"])
+def test_phase_document_tolerates_malformed_text(text):
+    document = PhaseDocument(text)
+    assert document.status == ""
+    assert document.tasks == []
+    assert document.checkpoint_line is None
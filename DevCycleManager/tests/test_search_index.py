@@ -0,0 +1,98 @@
+import os
+import json
+
+import pytest
+
+import search_index
+from search_index import SearchIndex, split_sections
+
+
+def write(root, path, text, mtime_ns=None):
+    full_path = root / path
+    full_path.parent.mkdir(parents=True, exist_ok=True)
+    full_path.write_text(text, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(full_path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def bank(tmp_path):
+    root = tmp_path / "MemoryBank"
+    write(root, "CodeGuidelines/python.md", "# Python\n\n## Caching\n\nCache the parsed templates and invalidate the cache on mtime change.\n")
+    write(root, "CodeGuidelines/sql.md", "# SQL\n\n## Indexes\n\nAdd an index for every foreign key used in joins.\n")
+    write(root, "Features/FEAT-001/design.md", "# Design\n\n## Cache\n\nThe feature cache cache cache keeps rendered pages.\n\n## Other\n\nUnrelated notes about deployment.\n")
+    return root
+
+
+def paths(results):
+    return [result["path"].split("/", 1)[1] for result in results]
+
+
+def test_split_sections_uses_heading_paths_and_skips_code_fences():
+    sections = split_sections("a.md", "# Top\n\nintro text\n\n## Child Part\n\n```\n# not a heading\n```\nbody\n")
+    assert [section.id for section in sections] == ["top", "top/child-part"]
+    assert sections[1].line == 5
+    assert "heading" in sections[1].terms
+
+
+def test_bm25_ranks_higher_term_frequency_first(bank):
+    index = SearchIndex(bank, snapshot_path=None)
+    results = index.search("cache")
+    assert paths(results) == ["Features/FEAT-001/design.md", "CodeGuidelines/python.md"]
+    assert results[0]["section_id"] == "design/cache"
+    assert results[0]["score"] > results[1]["score"] > 0
+    assert index.search("the and of") == []
+
+
+def test_search_prefix_filters(bank):
+    index = SearchIndex(bank, snapshot_path=None)
+    assert paths(index.search("cache", path_prefix="CodeGuidelines/")) == ["CodeGuidelines/python.md"]
+    assert paths(index.search("cache", exclude_prefix="Features/FEAT-001/")) == ["CodeGuidelines/python.md"]
+    assert index.search("cache", path_prefix="Lessons/") == []
+    assert len(index.search("cache index", limit=1)) == 1
+
+
+def test_refresh_reindexes_modified_and_drops_deleted_files(bank):
+    index = SearchIndex(bank, snapshot_path=None)
+    generation = index.generation
+    write(bank, "CodeGuidelines/sql.md", "# SQL\n\n## Caching\n\nCache query plans.\n", mtime_ns=1)
+    (bank / "Features/FEAT-001/design.md").unlink()
+    assert index.refresh() == ["CodeGuidelines/sql.md", "Features/FEAT-001/design.md"]
+    assert index.generation == generation + 1
+    assert sorted(paths(index.search("cache"))) == ["CodeGuidelines/python.md", "CodeGuidelines/sql.md"]
+    assert index.refresh() == []
+
+
+def test_snapshot_round_trip_skips_unchanged_files(bank, tmp_path, monkeypatch):
+    snapshot_path = tmp_path / "snapshot.json"
+    first = SearchIndex(bank, snapshot_path=str(snapshot_path))
+    assert snapshot_path.exists()
+
+    def fail(path, text):
+        raise AssertionError(f"{path} was re-tokenized")
+
+    monkeypatch.setattr(search_index, "split_sections", fail)
+    restored = SearchIndex(bank, snapshot_path=str(snapshot_path))
+    assert restored.stats()["sections"] == first.stats()["sections"]
+    assert restored.stats()["generation"] == 0
+    assert restored.search("cache") == first.search("cache")
+
+
+def test_snapshot_ignored_on_root_or_version_mismatch(bank, tmp_path, monkeypatch):
+    snapshot_path = tmp_path / "snapshot.json"
+    SearchIndex(bank, snapshot_path=str(snapshot_path))
+    snapshot = json.loads(snapshot_path.read_text(encoding="utf-8"))
+
+    # A snapshot of another MemoryBank must not leak its sections into this one
+    other = tmp_path / "Other"
+    write(other, "notes.md", "# Notes\n\nNothing relevant here.\n")
+    index = SearchIndex(other, snapshot_path=str(snapshot_path))
+    assert index.stats()["files"] == 1
+    assert index.search("cache") == []
+
+    snapshot["version"] = search_index.SNAPSHOT_VERSION + 1
+    snapshot["files"]["ghost.md"] = [0, [["ghost", "Ghost", 1, 1, "", {"phantom": 1}]]]
+    snapshot_path.write_text(json.dumps(snapshot), encoding="utf-8")
+    index = SearchIndex(bank, snapshot_path=str(snapshot_path))
+    assert index.search("phantom") == []
+    assert index.stats()["files"] == 3
@@ -0,0 +1,152 @@
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import subprocess
+import threading
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork") or not Path("/proc").is_dir(), reason="pre-fork mode needs fork() and /proc")
+
+APP_DIR = Path(__file__).resolve().parent.parent
+FEATURE_DIR = "Features/03_IN_PROGRESS/FEAT-001-login"
+
+# Starts a pre-fork server with 2 workers on an ephemeral port and reports the port it bound
+LAUNCHER = """
+import sys
+import serve
+server = serve.PreforkServer("127.0.0.1", 0, workers=2, log_level="warning", index_reload_interval=1.0)
+print("PORT", server.port, flush=True)
+sys.exit(server.run())
+"""
+
+
+def write_feature(root, status):
+    directory = root / FEATURE_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "FeatureDescription.md").write_text(f"# Feature: Login\n\n**Status**: {status}\n", encoding="utf-8")
+
+
+def children(pid):
+    try:
+        return {int(child) for child in Path(f"/proc/{pid}/task/{pid}/children").read_text().split()}
+    except FileNotFoundError:
+        return set()
+
+
+def exists(pid):
+    """True while the process exists, zombies included (an unreaped child stays in /proc)."""
+    return Path(f"/proc/{pid}").exists()
+
+
+def wait_for(predicate, timeout=20.0, interval=0.1):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = predicate()
+        if value:
+            return value
+        time.sleep(interval)
+    raise AssertionError("timed out")
+
+
+class Server:
+    def __init__(self, process):
+        self.process = process
+        self.lines = []
+        self.port = None
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            if line.startswith("PORT "):
+                self.port = int(line.split()[1])
+            self.lines.append(line)
+
+    @property
+    def reloads(self):
+        return sum("re-forking" in line for line in self.lines)
+
+    def get(self, path):
+        with urllib.request.urlopen(f"http://127.0.0.1:{self.port}{path}", timeout=5) as response:
+            return json.load(response)
+
+    def call(self, method, params=None):
+        body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}}).encode()
+        request = urllib.request.Request(f"http://127.0.0.1:{self.port}/", body, {"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.read().decode()
+
+    def workers(self):
+        return children(self.process.pid)
+
+
+@pytest.fixture
+def server(tmp_path):
+    app = tmp_path / "app"
+    shutil.copytree(APP_DIR, app, ignore=shutil.ignore_patterns("tests", "__pycache__", "*.pickle"))
+    memory_bank = tmp_path / "MemoryBank"
+    write_feature(memory_bank, "IN_PROGRESS")
+    env = dict(
+        os.environ,
+        DEVCYCLE_MEMORY_BANK_DIR=str(memory_bank),
+        DEVCYCLE_MEMORY_BANK_REFRESH_INTERVAL="0.2",
+        DEVCYCLE_SEARCH_REFRESH_INTERVAL="0.2",
+        DEVCYCLE_LESSONS_REFRESH_INTERVAL="0.2",
+        PROMPTS_RELOAD_INTERVAL="0.2",
+        DEVCYCLE_SEARCH_SNAPSHOT=str(tmp_path / "search.json"),
+        DEVCYCLE_METADATA_DB=str(tmp_path / "metadata.db"),
+        DEVCYCLE_GIT_REPO_DIR="",
+        DEVCYCLE_PROFILING="0",
+        PYTHONUNBUFFERED="1",
+    )
+    process = subprocess.Popen([sys.executable, "-c", LAUNCHER], cwd=app, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    running = Server(process)
+    running.app, running.memory_bank = app, memory_bank
+    try:
+        wait_for(lambda: running.port is not None and len(running.workers()) == 2)
+        wait_for(lambda: running.get("/health")["status"] == "ok")
+        yield running
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def feature_status(server):
+    return json.loads(server.call("tools/call", {"name": "feature-status", "input": {"feature_id": "FEAT-001"}, "responseMode": "structured"}))
+
+
+def test_prefork_reload_and_shutdown(server):
+    first_workers = server.workers()
+    assert server.get("/health")["pid"] in first_workers
+    assert "IN_PROGRESS" in json.dumps(feature_status(server))
+
+    # MemoryBank edits: no re-fork per refresh; a burst of edits is rolled out by one batched re-fork
+    write_feature(server.memory_bank, "ON_HOLD")
+    write_feature(server.memory_bank, "BLOCKED")
+    wait_for(lambda: "BLOCKED" in json.dumps(feature_status(server)))
+    assert server.reloads == 1
+    time.sleep(1.5)
+    assert server.reloads == 1
+    second_workers = wait_for(lambda: (lambda workers: workers if len(workers) == 2 and not workers & first_workers else None)(server.workers()))
+    # Retired workers are reaped by the parent (an unreaped child would linger in /proc as a zombie)
+    wait_for(lambda: not any(exists(pid) for pid in first_workers))
+
+    # Template edit: the workers are re-forked at once
+    template = next((server.app / "Prompts").glob("*.md"))
+    with open(template, "a", encoding="utf-8") as f:
+        f.write("\nEdited.\n")
+    wait_for(lambda: server.reloads == 2, timeout=5.0)
+    wait_for(lambda: (lambda workers: len(workers) == 2 and not workers & second_workers)(server.workers()))
+    wait_for(lambda: not any(exists(pid) for pid in second_workers))
+
+    # Shutdown retires and reaps every worker before the parent exits
+    last_workers = server.workers()
+    server.process.send_signal(signal.SIGTERM)
+    assert server.process.wait(timeout=30) == 0
+    assert not any(exists(pid) for pid in last_workers)
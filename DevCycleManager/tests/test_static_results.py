@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+import pytest
+
+import main
+from main import CONDITIONAL_HEADER, STATIC_RESULTS, JsonRpcRequest, StaticResult
+
+
+def dispatch(method, request_id=1, headers=None):
+    request = JsonRpcRequest(jsonrpc="2.0", method=method, id=request_id)
+    return asyncio.run(main.dispatch_observed(request, headers or {}))
+
+
+@pytest.mark.parametrize("method", sorted(STATIC_RESULTS))
+def test_matching_etag_without_opt_in_still_gets_the_body(method):
+    etag = STATIC_RESULTS[method].etag
+    for headers in ({"if-none-match": etag}, {"if-none-match": etag, CONDITIONAL_HEADER: "0"}):
+        response = dispatch(method, headers=headers)
+        assert response.status_code == 200
+        assert json.loads(response.body)["id"] == 1
+        assert response.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("method", sorted(STATIC_RESULTS))
+@pytest.mark.parametrize("if_none_match", ["{etag}", "W/{etag}", '"other", {etag}', "*"])
+def test_opted_in_request_with_matching_etag_gets_304(method, if_none_match):
+    etag = STATIC_RESULTS[method].etag
+    response = dispatch(method, headers={CONDITIONAL_HEADER: "1", "if-none-match": if_none_match.format(etag=etag)})
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == etag
+
+
+def test_opted_in_request_with_another_etag_gets_the_body():
+    response = dispatch("initialize", headers={CONDITIONAL_HEADER: "1", "if-none-match": '"stale"'})
+    assert response.status_code == 200
+    assert json.loads(response.body)["result"] == main.INITIALIZE_RESULT
+
+
+def test_batched_static_calls_never_get_304():
+    etag = STATIC_RESULTS["initialize"].etag
+    batch = [{"jsonrpc": "2.0", "id": 1, "method": "initialize"}]
+    response = asyncio.run(main.dispatch_batch(batch, {CONDITIONAL_HEADER: "1", "if-none-match": etag}))
+    assert response.status_code == 200
+    assert json.loads(response.body)[0]["result"] == main.INITIALIZE_RESULT
+
+
+@pytest.mark.parametrize("request_id", [0, 42, "abc", 'quote " and é', None])
+def test_request_id_is_substituted(request_id):
+    static_result = StaticResult({"value": [1, "two"]})
+    body = json.loads(static_result.respond(request_id).body)
+    assert body == {"jsonrpc": "2.0", "result": {"value": [1, "two"]}, "id": request_id}
+
+
+@pytest.mark.parametrize("request_id", [7, "abc"])
+def test_static_response_matches_the_generic_response(request_id):
+    response = dispatch("tools/list", request_id=request_id)
+    expected = main.encode_rpc_response(main.JsonRpcResponse(id=request_id, result={"tools": main.TOOLS.definitions()}))
+    assert json.loads(response.body) == json.loads(expected)
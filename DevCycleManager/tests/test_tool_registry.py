@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+import pytest
+
+import main
+from main import JsonRpcRequest
+from tool_registry import Tool, ToolArgumentError, ToolParameter, ToolRegistry
+
+
+def make_tool():
+    return Tool(
+        name="accept",
+        description="Accept a phase",
+        parameters=[
+            ToolParameter("feature_id", "string", "The feature ID", required=True),
+            ToolParameter("phase_number", "integer", "The phase number", required=True),
+            ToolParameter("notes", "string", "Optional notes", default="[none]"),
+        ],
+    )
+
+
+def call_tool(params):
+    request = JsonRpcRequest(jsonrpc="2.0", method="tools/call", id=1, params=params)
+    response = asyncio.run(main.dispatch_observed(request, {}))
+    return json.loads(response.body)
+
+
+def test_validate_arguments_coerces_integer_strings():
+    assert make_tool().validate_arguments({"feature_id": "FEAT-001", "phase_number": "2", "extra": 1}) == {
+        "feature_id": "FEAT-001",
+        "phase_number": 2,
+    }
+
+
+def test_validate_arguments_rejects_a_missing_required_argument():
+    with pytest.raises(ToolArgumentError, match="Missing required argument 'phase_number'"):
+        make_tool().validate_arguments({"feature_id": "FEAT-001"})
+
+
+@pytest.mark.parametrize("value", ["two", "2.5", "", True, 2.0])
+def test_validate_arguments_rejects_non_integers(value):
+    with pytest.raises(ToolArgumentError, match="'phase_number' must be of type integer"):
+        make_tool().validate_arguments({"feature_id": "FEAT-001", "phase_number": value})
+
+
+@pytest.mark.parametrize("arguments", [[], "FEAT-001", 1])
+def test_validate_arguments_rejects_non_object_arguments(arguments):
+    with pytest.raises(ToolArgumentError, match="must be an object"):
+        make_tool().validate_arguments(arguments)
+
+
+def test_registry_generates_definitions_and_rejects_duplicates():
+    registry = ToolRegistry()
+    tool = registry.register(make_tool())
+    assert registry.get("accept") is tool
+    assert registry.get("missing") is None
+    assert registry.definitions() == [{
+        "name": "accept",
+        "description": "Accept a phase",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "feature_id": {"type": "string", "description": "The feature ID"},
+                "phase_number": {"type": "integer", "description": "The phase number"},
+                "notes": {"type": "string", "description": "Optional notes"},
+            },
+            "required": ["feature_id", "phase_number"],
+        },
+    }]
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register(make_tool())
+
+
+def test_tools_list_is_generated_from_the_registry():
+    request = JsonRpcRequest(jsonrpc="2.0", method="tools/list", id=1)
+    body = json.loads(asyncio.run(main.dispatch_observed(request, {})).body)
+    assert body["result"]["tools"] == main.TOOLS.definitions()
+    assert [tool["name"] for tool in body["result"]["tools"]] == main.TOOLS.names()
+
+
+def test_tools_call_reports_a_missing_required_argument():
+    body = call_tool({"name": "accept-phase", "input": {"feature_id": "FEAT-001"}})
+    assert body["error"] == {"code": -32602, "message": "Invalid params: Missing required argument 'phase_number'"}
+
+
+def test_tools_call_reports_a_non_integer_string():
+    body = call_tool({"name": "accept-phase", "input": {"feature_id": "FEAT-001", "phase_number": "two"}})
+    assert body["error"] == {"code": -32602, "message": "Invalid params: Argument 'phase_number' must be of type integer"}
+
+
+@pytest.mark.parametrize("params", [None, [], ["accept-phase"]])
+def test_tools_call_rejects_non_object_params(params):
+    body = call_tool(params)
+    assert body["error"]["code"] == -32602
+    assert "params must be an object" in body["error"]["message"]
+
+
+def test_tools_call_reports_an_unknown_tool():
+    body = call_tool({"name": "no-such-tool", "input": {}})
+    assert body["id"] == 1
+    assert body["error"]["code"] == -32603
+    assert body["error"]["message"] == "Unknown tool: no-such-tool"
@@ -0,0 +1,210 @@
+from typing import Optional, List, Any, Dict, Callable, Awaitable
+
+# JSON Schema type name -> accepted Python types
+SCHEMA_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list,),
+}
+
+
+class ToolArgumentError(ValueError):
+    """Raised when `tools/call` arguments do not satisfy the tool's input schema."""
+
+
+# `sectionDelivery` values: every section, or only those relevant to the arguments
+SECTION_DELIVERY_MODES = ("full", "relevant")
+
+
+# `includeDelivery` values: shared fragments expanded in place, or left as `{{> name}}` markers
+INCLUDE_DELIVERY_MODES = ("inline", "reference")
+
+
+class CallOptions:
+    """
+    Per-call protocol options taken from `tools/call` params, outside the
+    tool's input schema (e.g. `knownTemplateHash`, `sectionDelivery`, `includeDelivery`).
+    """
+
+    def __init__(self, known_template_hash: Optional[str] = None, section_delivery: str = "full", include_delivery: str = "inline"):
+        self.known_template_hash = known_template_hash
+        self.section_delivery = section_delivery
+        self.include_delivery = include_delivery
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> "CallOptions":
+        section_delivery = params.get("sectionDelivery") or "full"
+        if section_delivery not in SECTION_DELIVERY_MODES:
+            raise ToolArgumentError(f"sectionDelivery must be one of: {', '.join(SECTION_DELIVERY_MODES)}")
+        include_delivery = params.get("includeDelivery") or "inline"
+        if include_delivery not in INCLUDE_DELIVERY_MODES:
+            raise ToolArgumentError(f"includeDelivery must be one of: {', '.join(INCLUDE_DELIVERY_MODES)}")
+        return cls(known_template_hash=params.get("knownTemplateHash"), section_delivery=section_delivery, include_delivery=include_delivery)
+
+
+class ToolParameter:
+    """
+    One input argument of a tool.
+    `default` is substituted into the procedure template when the argument is
+    omitted or empty; it is never advertised in the input schema.
+    """
+
+    def __init__(self, name: str, type: str, description: str, required: bool = False, default: Optional[str] = None, items: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.type = type
+        self.description = description
+        self.required = required
+        self.default = default
+        self.items = items
+
+    def schema(self) -> Dict[str, Any]:
+        schema: Dict[str, Any] = {"type": self.type, "description": self.description}
+        if self.items is not None:
+            schema["items"] = self.items
+        return schema
+
+    def validate(self, value: Any) -> Any:
+        """Returns the value coerced to the schema type, or raises ToolArgumentError."""
+        if self.type == "integer" and isinstance(value, str):
+            # Lenient: some clients send numeric arguments as strings
+            try:
+                return int(value)
+            except ValueError:
+                raise ToolArgumentError(f"Argument '{self.name}' must be of type {self.type}")
+        accepted = SCHEMA_TYPES.get(self.type, (object,))
+        # bool is an int subclass, but true/false are not valid integers
+        if not isinstance(value, accepted) or (isinstance(value, bool) and self.type in ("integer", "number")):
+            raise ToolArgumentError(f"Argument '{self.name}' must be of type {self.type}")
+        return value
+
+
+class Tool:
+    """
+    Declarative definition of an MCP tool.
+    Procedure tools render `template` with their arguments (or parameter
+    defaults) and return it with the context hints below; tools with custom
+    behavior provide a `handler` coroutine taking (tool, arguments, options).
+    `omit_sections` maps template section ids to predicates over the arguments;
+    with `sectionDelivery=relevant` a section is left out when its predicate is true.
+    With `search_context`, the result also lists the MemoryBank sections that
+    best match the item being worked on, so the client can read those first.
+    With `context_pack`, an indexed `feature_id` gets a ranked list of the
+    files to read in place of the Features/CodeGuidelines/LessonsLearned folders.
+    With `dependency_graph`, the result carries the server-computed dependency
+    graph of the `epic_id` argument (order, critical path, cycles, ready features).
+    With `quality_gates`, the result carries the server-side gate report of the
+    `phase_number` phase (or, without one, of every phase) of an indexed `feature_id`.
+    With `lessons`, the result carries the LessonsLearned items (from any
+    feature) most relevant to the feature and its current phase.
+    `indexes` names the server indexes a call reads (`features` always, plus
+    `search`, `lessons` or `git` as implied by the options above or listed
+    for a handler); a call waits only for those to be warmed up.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        parameters: Optional[List[ToolParameter]] = None,
+        template: Optional[str] = None,
+        context_folders: Optional[List[str]] = None,
+        context_files: Optional[List[str]] = None,
+        outputs: Optional[List[str]] = None,
+        message: str = "",
+        handler: Optional[Callable[["Tool", Dict[str, Any], CallOptions], Awaitable[dict]]] = None,
+        omit_sections: Optional[Dict[str, Callable[[Dict[str, Any]], bool]]] = None,
+        search_context: bool = False,
+        context_pack: bool = False,
+        dependency_graph: bool = False,
+        quality_gates: bool = False,
+        lessons: bool = False,
+        indexes: Optional[List[str]] = None,
+    ):
+        self.name = name
+        self.description = description
+        self.parameters = parameters or []
+        self.template = template
+        self.context_folders = context_folders or []
+        self.context_files = context_files or []
+        self.outputs = outputs
+        self.message = message
+        self.handler = handler
+        self.omit_sections = omit_sections or {}
+        self.search_context = search_context
+        self.context_pack = context_pack
+        self.dependency_graph = dependency_graph
+        self.quality_gates = quality_gates
+        self.lessons = lessons
+        implied = [name for name, flag in (("search", search_context or context_pack), ("lessons", lessons), ("git", quality_gates)) if flag]
+        self.indexes = list(dict.fromkeys(["features", *implied, *(indexes or [])]))
+        self._parameters_by_name = {parameter.name: parameter for parameter in self.parameters}
+
+    def has_parameter(self, name: str) -> bool:
+        return name in self._parameters_by_name
+
+    def definition(self) -> Dict[str, Any]:
+        """The tool entry advertised by `tools/list`."""
+        input_schema: Dict[str, Any] = {
+            "type": "object",
+            "properties": {parameter.name: parameter.schema() for parameter in self.parameters},
+        }
+        required = [parameter.name for parameter in self.parameters if parameter.required]
+        if required:
+            input_schema["required"] = required
+        return {"name": self.name, "description": self.description, "inputSchema": input_schema}
+
+    def validate_arguments(self, arguments: Any) -> Dict[str, Any]:
+        """
+        Checks `arguments` against the input schema before dispatch.
+        Unknown arguments are ignored (the schema allows additional properties).
+        """
+        if arguments is None:
+            arguments = {}
+        if not isinstance(arguments, dict):
+            raise ToolArgumentError("Tool arguments must be an object")
+
+        validated = {}
+        for name, parameter in self._parameters_by_name.items():
+            value = arguments.get(name)
+            if value is None:
+                if parameter.required:
+                    raise ToolArgumentError(f"Missing required argument '{name}'")
+                continue
+            validated[name] = parameter.validate(value)
+        return validated
+
+    def placeholder_values(self, arguments: Dict[str, Any]) -> Dict[str, str]:
+        """Template values for every parameter, falling back to the declared default."""
+        values = {}
+        for parameter in self.parameters:
+            value = arguments.get(parameter.name)
+            if value is None or value == "":
+                values[parameter.name] = parameter.default if parameter.default is not None else ""
+            else:
+                values[parameter.name] = str(value)
+        return values
+
+
+class ToolRegistry:
+    """Name -> Tool map giving O(1) `tools/call` dispatch and a generated `tools/list`."""
+
+    def __init__(self):
+        self._tools: Dict[str, Tool] = {}
+
+    def register(self, tool: Tool) -> Tool:
+        if tool.name in self._tools:
+            raise ValueError(f"Tool already registered: {tool.name}")
+        self._tools[tool.name] = tool
+        return tool
+
+    def get(self, name: str) -> Optional[Tool]:
+        return self._tools.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    def definitions(self) -> List[Dict[str, Any]]:
+        return [tool.definition() for tool in self._tools.values()]